@@ -4,50 +4,16 @@ import numpy as np
 from scipy.integrate import solve_ivp
 import matplotlib.pyplot as plt
 
+from three_body_simulation.kernel import make_equations_of_motion
+
 # Gravitational constant (set to 1 for simplicity)
 G = 1.0
 
 # Masses of the three bodies (all equal)
 m1 = m2 = m3 = 1.0
 
-def equations_of_motion(t, state):
-    """
-    Computes the derivatives of the state vector.
-    """
-    # Unpack the state vector
-    x1, y1, x2, y2, x3, y3, vx1, vy1, vx2, vy2, vx3, vy3 = state
-
-    # Positions
-    r1 = np.array([x1, y1])
-    r2 = np.array([x2, y2])
-    r3 = np.array([x3, y3])
-
-    # Compute pairwise distance vectors
-    r12 = r2 - r1
-    r13 = r3 - r1
-    r23 = r3 - r2
-
-    # Compute magnitudes of distance vectors
-    r12_norm = np.linalg.norm(r12)
-    r13_norm = np.linalg.norm(r13)
-    r23_norm = np.linalg.norm(r23)
-
-    # Compute accelerations
-    a1 = G * m2 * r12 / r12_norm**3 + G * m3 * r13 / r13_norm**3
-    a2 = G * m1 * -r12 / r12_norm**3 + G * m3 * r23 / r23_norm**3
-    a3 = G * m1 * -r13 / r13_norm**3 + G * m2 * -r23 / r23_norm**3
-
-    # Flatten the derivatives
-    derivatives = np.array([
-        vx1, vy1,
-        vx2, vy2,
-        vx3, vy3,
-        a1[0], a1[1],
-        a2[0], a2[1],
-        a3[0], a3[1]
-    ])
-
-    return derivatives
+# Shared N-body kernel: three bodies in the plane
+equations_of_motion = make_equations_of_motion([m1, m2, m3], ndim=2, G=G)
 
 def main():
     # Initial positions and velocities for the figure-eight solution
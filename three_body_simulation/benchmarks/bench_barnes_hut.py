@@ -0,0 +1,48 @@
+# benchmarks/bench_barnes_hut.py
+# Accuracy against speed: Barnes-Hut accelerations compared with direct summation.
+# Run from the three_body_simulation directory: python benchmarks/bench_barnes_hut.py
+
+import time
+
+import numpy as np
+
+from three_body_simulation.barnes_hut import BarnesHutKernel
+from three_body_simulation.kernel import GravityKernel
+from three_body_simulation.presets import get_cluster_initial_conditions
+
+
+def best_time(function, repeats: int = 3) -> float:
+    # Fastest of a few runs, after one warm-up call
+    function()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(sizes=(500, 1000, 2000, 4000), thetas=(0.3, 0.5, 0.7, 1.0), softening: float = 0.01):
+    print(f"{'N':>6} {'theta':>6} {'time [s]':>9} {'speed-up':>9} {'median err':>11} {'99% err':>9}")
+    for n_bodies in sizes:
+        initial_state, _ = get_cluster_initial_conditions(n_bodies)
+        positions = initial_state[:3 * n_bodies].reshape(n_bodies, 3)
+        masses = np.full(n_bodies, 1.0 / n_bodies)
+
+        direct = GravityKernel(masses, ndim=3, softening=softening)
+        exact = direct.accelerations(positions)
+        direct_time = best_time(lambda: direct.accelerations(positions))
+        print(f"{n_bodies:>6} {'direct':>6} {direct_time:>9.4f} {1.0:>9.1f}")
+
+        # Errors relative to the RMS acceleration, so near-cancelling forces do not dominate
+        scale = np.sqrt(np.mean(np.sum(exact ** 2, axis=1)))
+        for theta in thetas:
+            tree = BarnesHutKernel(masses, ndim=3, softening=softening, theta=theta)
+            error = np.linalg.norm(tree.accelerations(positions) - exact, axis=1) / scale
+            tree_time = best_time(lambda: tree.accelerations(positions))
+            print(f"{n_bodies:>6} {theta:>6.2f} {tree_time:>9.4f} {direct_time / tree_time:>9.1f} "
+                  f"{np.median(error):>11.1e} {np.percentile(error, 99):>9.1e}")
+
+
+if __name__ == '__main__':
+    main()
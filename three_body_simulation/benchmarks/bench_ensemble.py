@@ -0,0 +1,42 @@
+# benchmarks/bench_ensemble.py
+# Trajectories per second: integrate_ensemble against a loop over solve_ivp.
+# Run from the three_body_simulation directory: python benchmarks/bench_ensemble.py
+
+import time
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from three_body_simulation.ensemble import integrate_ensemble, SUCCESS
+from three_body_simulation.kernel import GravityKernel
+from three_body_simulation.presets import get_figure_eight_initial_conditions
+
+# Figure-eight initial state and period
+FIGURE_EIGHT, PERIOD = get_figure_eight_initial_conditions()
+
+
+def main(n_members: int = 200, n_loop: int = 20, n_samples: int = 500):
+    rng = np.random.default_rng(0)
+    batch = FIGURE_EIGHT + 1e-3 * rng.standard_normal((n_members, len(FIGURE_EIGHT)))
+    t_eval = np.linspace(0, PERIOD, n_samples)
+
+    start = time.perf_counter()
+    result = integrate_ensemble(batch, PERIOD, t_eval=t_eval)
+    ensemble_time = time.perf_counter() - start
+
+    rhs = GravityKernel([1.0, 1.0, 1.0])
+    start = time.perf_counter()
+    for state in batch[:n_loop]:
+        solve_ivp(rhs, (0, PERIOD), state, t_eval=t_eval, rtol=1e-10, atol=1e-10)
+    loop_time = time.perf_counter() - start
+
+    ensemble_rate = n_members / ensemble_time
+    loop_rate = n_loop / loop_time
+    print(f"integrate_ensemble: {n_members} orbits in {ensemble_time:.2f} s "
+          f"({ensemble_rate:.1f}/s, {np.count_nonzero(result.status == SUCCESS)} succeeded)")
+    print(f"solve_ivp loop:     {n_loop} orbits in {loop_time:.2f} s ({loop_rate:.1f}/s)")
+    print(f"Speed-up: {ensemble_rate / loop_rate:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
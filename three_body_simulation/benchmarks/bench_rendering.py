@@ -0,0 +1,77 @@
+# benchmarks/bench_rendering.py
+# Frame drawing cost: per-body projection with a whole-layer trail fade against
+# screen_coordinates() and TrailRenderer's tiled NumPy fade.
+# Run from the three_body_simulation directory: python benchmarks/bench_rendering.py
+
+import os
+import time
+
+import numpy as np
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+import pygame
+
+from three_body_simulation.rendering import TrailRenderer, body_colors, body_radius, screen_coordinates
+
+SIZE = (800, 800)
+
+
+class WholeLayerTrails:
+    """
+    The previous trail layer: one SDL alpha-subtracting fill over the whole layer per frame.
+    """
+
+    def __init__(self, size, trail_length: int = 100, radius: int = 4):
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        self.radius = radius
+        self.fade_step = max(1, 255 // trail_length)
+
+    def update(self, points, colors):
+        self.surface.fill((0, 0, 0, self.fade_step), special_flags=pygame.BLEND_RGBA_SUB)
+        for point, color in zip(points, colors):
+            pygame.draw.circle(self.surface, (*color, 255), point, self.radius)
+
+
+def per_body(surface, trails, positions, colors, radius, scale):
+    # The loop the viewer used to run: a to_screen call per body
+    def to_screen(x, y):
+        return int(SIZE[0] // 2 + x * scale), int(SIZE[1] // 2 - y * scale)
+
+    points = [to_screen(x, y) for x, y in positions]
+    for point, color in zip(points, colors):
+        pygame.draw.circle(surface, color, point, radius)
+    trails.update(points, colors)
+
+
+def vectorized(surface, trails, positions, colors, radius, scale):
+    points = screen_coordinates(positions, SIZE, scale).tolist()
+    for point, color in zip(points, colors):
+        pygame.draw.circle(surface, color, point, radius)
+    trails.update(points, colors)
+
+
+def main(n_frames: int = 300, body_counts=(3, 64, 1000)):
+    rng = np.random.default_rng(0)
+    surface = pygame.Surface(SIZE)
+    for n_bodies in body_counts:
+        # Bodies on circles of different radii, so the trails spread as in playback
+        phases = rng.uniform(0, 2 * np.pi, n_bodies)
+        radii = rng.uniform(0.1, 1.0, n_bodies)
+        colors = body_colors(n_bodies)
+        radius = body_radius(n_bodies)
+        timings = {}
+        for draw, layer in ((per_body, WholeLayerTrails), (vectorized, TrailRenderer)):
+            trails = layer(SIZE, trail_length=100, radius=max(1, radius // 2))
+            start = time.perf_counter()
+            for frame in range(n_frames):
+                angles = phases + 0.02 * frame
+                positions = np.column_stack([radii * np.cos(angles), radii * np.sin(angles)])
+                draw(surface, trails, positions, colors, radius, scale=350.0)
+            timings[draw.__name__] = (time.perf_counter() - start) / n_frames * 1e3
+        print(f"{n_bodies:>5} bodies: per-body {timings['per_body']:.2f} ms/frame, "
+              f"vectorized {timings['vectorized']:.2f} ms/frame "
+              f"({timings['per_body'] / timings['vectorized']:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
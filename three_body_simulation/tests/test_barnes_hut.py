@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from three_body_simulation.barnes_hut import BarnesHutKernel
+from three_body_simulation.compiled import make_kernel
+from three_body_simulation.integrators import integrate
+from three_body_simulation.kernel import GravityKernel
+from three_body_simulation.presets import get_cluster_initial_conditions, get_preset
+
+
+def cluster(n_bodies=300):
+    initial_state, _ = get_cluster_initial_conditions(n_bodies)
+    return initial_state[:3 * n_bodies].reshape(n_bodies, 3), np.full(n_bodies, 1.0 / n_bodies)
+
+
+def test_theta_zero_is_exact_1():
+    # Test case 1: With theta = 0 every node is opened, matching direct summation in 2D and 3D
+    positions, masses = cluster()
+    for ndim in (2, 3):
+        x = np.ascontiguousarray(positions[:, :ndim])
+        direct = GravityKernel(masses, ndim=ndim, softening=0.01).accelerations(x)
+        for leaf_size in (1, 8):
+            tree = BarnesHutKernel(masses, ndim=ndim, softening=0.01, theta=0.0, leaf_size=leaf_size)
+            np.testing.assert_allclose(tree.accelerations(x), direct, rtol=1e-10, atol=1e-12)
+
+
+def test_opening_angle_accuracy_2():
+    # Test case 2: theta = 0.5 stays within about a percent of the RMS force
+    positions, masses = cluster(1000)
+    direct = GravityKernel(masses, ndim=3, softening=0.01).accelerations(positions)
+    tree = BarnesHutKernel(masses, ndim=3, softening=0.01, theta=0.5).accelerations(positions)
+    scale = np.sqrt(np.mean(np.sum(direct ** 2, axis=1)))
+    error = np.linalg.norm(tree - direct, axis=1) / scale
+    assert np.median(error) < 1e-2
+    assert np.percentile(error, 99) < 5e-2
+
+
+def test_node_arrays_reused_3():
+    # Test case 3: Rebuilding for moved bodies reuses the preallocated node arrays
+    positions, masses = cluster()
+    tree = BarnesHutKernel(masses, ndim=3, softening=0.01)
+    tree.accelerations(positions)
+    buffers = tree._node_start, tree._node_com
+    tree.accelerations(positions * 1.1 + 0.3)
+    assert tree._node_start is buffers[0] and tree._node_com is buffers[1]
+
+
+def test_integrate_with_tree_4():
+    # Test case 4: integrate() can use the tree code in place of direct summation
+    preset = get_preset('cluster')
+    initial_state, _ = preset.initial_conditions()
+    direct = integrate(initial_state, 0.2, n_samples=3, method='leapfrog', dt=1e-2, **preset.system)
+    tree = integrate(initial_state, 0.2, n_samples=3, method='leapfrog', dt=1e-2, force='barnes_hut',
+                     theta=0.3, **preset.system)
+    np.testing.assert_allclose(tree.y, direct.y, atol=1e-4)
+    with pytest.raises(ValueError):
+        make_kernel(preset.masses, ndim=3, force='fmm')
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from three_body_simulation.cache import OrbitCache
+from three_body_simulation.presets import PRESETS, get_preset
+
+
+def test_registry_lists_all_presets_1():
+    # Test case 1: The preset solutions are registered with distinct keys and consistent state sizes
+    assert len(PRESETS) == 10
+    assert len({preset.key for preset in PRESETS.values()}) == 10
+    for preset in PRESETS.values():
+        initial_state, total_time = preset.initial_conditions()
+        assert initial_state.shape == (2 * preset.n_bodies * preset.ndim,)
+        assert total_time > 0
+
+
+def test_unknown_preset_2():
+    # Test case 2: Unknown preset ids raise KeyError
+    with pytest.raises(KeyError):
+        get_preset('pentagon')
+
+
+def test_memory_hit_3():
+    # Test case 3: A second request is served from memory
+    cache = OrbitCache(directory=None)
+    first = cache.get('figure_eight', 1e-8, 50)
+    second = cache.get('figure_eight', 1e-8, 50)
+    assert second is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lru_eviction_4():
+    # Test case 4: The least recently used trajectory is evicted
+    cache = OrbitCache(maxsize=2, directory=None)
+    cache.get('figure_eight', 1e-8, 20)
+    cache.get('lagrange', 1e-8, 20)
+    cache.get('figure_eight', 1e-8, 20)
+    cache.get('mobius', 1e-8, 20)
+    assert ('figure_eight', 1e-8, 20, 'RK45') in cache
+    assert ('lagrange', 1e-8, 20, 'RK45') not in cache
+
+
+def test_disk_store_5(tmp_path):
+    # Test case 5: A new cache instance loads trajectories from disk
+    first = OrbitCache(directory=tmp_path).get('figure_eight', 1e-8, 30, 'yoshida4')
+    cache = OrbitCache(directory=tmp_path)
+    second = cache.get('figure_eight', 1e-8, 30, 'yoshida4')
+    assert (cache.hits, cache.misses) == (1, 0)
+    np.testing.assert_array_equal(second.y, first.y)
+
+
+def test_prewarm_6(tmp_path):
+    # Test case 6: Prewarming computes every registered preset
+    cache = OrbitCache(directory=tmp_path)
+    cache.prewarm(1e-6, 20)
+    assert cache.misses == len(PRESETS)
+    assert len(list(tmp_path.glob('*.npz'))) == len(PRESETS)
+
+
+def test_adaptive_sampling_7(tmp_path):
+    # Test case 7: With a sample_tolerance, stored trajectories are thinned
+    from three_body_simulation.integrators import integrate
+
+    cache = OrbitCache(directory=tmp_path, sample_tolerance=1e-4)
+    initial_state, total_time = get_preset('figure_eight').initial_conditions()
+    uniform = integrate(initial_state, total_time, n_samples=2000, rtol=1e-8, atol=1e-8)
+    cache.put('figure_eight', 1e-8, 2000, 'RK45', uniform)
+    stored = OrbitCache(directory=tmp_path, sample_tolerance=1e-4).get('figure_eight', 1e-8, 2000, 'RK45')
+    assert len(stored.t) < len(uniform.t) // 10
+    # A cache without thinning does not pick up the thinned file
+    assert OrbitCache(directory=tmp_path).lookup('figure_eight', 1e-8, 2000, 'RK45') is None
@@ -0,0 +1,44 @@
+import numpy as np
+
+from three_body_simulation.chaos import chaos_indicators
+from three_body_simulation.ensemble import SUCCESS
+from three_body_simulation.presets import get_euler_colinear_initial_conditions, get_figure_eight_initial_conditions
+
+FAST = {'rtol': 1e-9, 'atol': 1e-9}
+
+
+def test_regular_and_chaotic_1():
+    # Test case 1: The figure-eight is regular (<Y> near 2), Euler's colinear setup is chaotic
+    regular, _ = get_figure_eight_initial_conditions()
+    chaotic, _ = get_euler_colinear_initial_conditions()
+    result = chaos_indicators([regular, chaotic], 20.0, **FAST)
+    assert np.all(result.status == SUCCESS)
+    np.testing.assert_allclose(result.t_final, 20.0)
+    assert abs(result.mean_megno[0] - 2) < 0.5
+    assert result.mean_megno[1] > 10
+    assert result.lyapunov[1] > 5 * result.lyapunov[0]
+    assert result.fli[1] > result.fli[0] > 0
+
+
+def test_grid_matches_single_runs_2():
+    # Test case 2: A sweep grid is processed in one pass and matches runs done one at a time
+    initial_state, _ = get_figure_eight_initial_conditions()
+    grid = np.tile(initial_state, (2, 2, 1))
+    grid[..., 0] += np.array([[0.0, 0.01], [0.02, 0.03]])
+    result = chaos_indicators(grid, 3.0, renormalize_every=0.5, **FAST)
+    assert result.mean_megno.shape == (2, 2)
+    single = chaos_indicators(grid[1, 0], 3.0, renormalize_every=0.5, **FAST)
+    for field in ('lyapunov', 'megno', 'mean_megno', 'fli'):
+        np.testing.assert_allclose(getattr(result, field)[1, 0], getattr(single, field), rtol=1e-6)
+
+
+def test_renormalization_invariant_3():
+    # Test case 3: Renormalizing more often leaves the indicators unchanged
+    initial_state, _ = get_euler_colinear_initial_conditions()
+    coarse = chaos_indicators(initial_state, 4.0, renormalize_every=4.0, **FAST)
+    fine = chaos_indicators(initial_state, 4.0, renormalize_every=0.25, **FAST)
+    np.testing.assert_allclose(fine.lyapunov, coarse.lyapunov, rtol=1e-4)
+    np.testing.assert_allclose(fine.mean_megno, coarse.mean_megno, rtol=1e-4)
+    # Without renormalization the deviation vector of a long chaotic run overflows
+    long = chaos_indicators(initial_state, 60.0, renormalize_every=1.0, **FAST)
+    assert np.isfinite(long.lyapunov) and long.status == SUCCESS
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from three_body_simulation import compiled
+from three_body_simulation.compiled import make_kernel, resolve_backend, NUMBA_AVAILABLE
+from three_body_simulation.integrators import integrate
+
+FIGURE_EIGHT = np.array([
+    0.97000436, -0.24308753, -0.97000436, 0.24308753, 0.0, 0.0,
+    0.4662036850, 0.4323657300, 0.4662036850, 0.4323657300, -0.93240737, -0.86473146
+])
+PERIOD = 6.3259
+
+
+def test_rhs_backends_match_1():
+    # Test case 1: Compiled and NumPy right-hand sides agree
+    rng = np.random.default_rng(1)
+    masses = rng.uniform(0.5, 2.0, size=7)
+    numpy_kernel = make_kernel(masses, ndim=3, backend='numpy')
+    numba_kernel = make_kernel(masses, ndim=3, backend='numba')
+    state = rng.normal(size=numpy_kernel.state_size)
+    np.testing.assert_allclose(numba_kernel(0.0, state), numpy_kernel(0.0, state), rtol=1e-12)
+
+
+@pytest.mark.parametrize('method', ['RK45', 'leapfrog', 'yoshida4', 'yoshida6'])
+def test_trajectories_match_2(method):
+    # Test case 2: Both backends produce the same trajectory
+    numpy_result = integrate(FIGURE_EIGHT, PERIOD, n_samples=20, method=method, dt=1e-2, backend='numpy')
+    numba_result = integrate(FIGURE_EIGHT, PERIOD, n_samples=20, method=method, dt=1e-2, backend='numba')
+    np.testing.assert_allclose(numba_result.y, numpy_result.y, atol=1e-9)
+
+
+def test_fallback_3(monkeypatch):
+    # Test case 3: The numba backend falls back to NumPy when numba is missing
+    assert resolve_backend('numba') == ('numba' if NUMBA_AVAILABLE else 'numpy')
+    monkeypatch.setattr(compiled, 'NUMBA_AVAILABLE', False)
+    assert resolve_backend('numba') == 'numpy'
+    result = integrate(FIGURE_EIGHT, 1.0, n_samples=5, method='leapfrog', backend='numba')
+    assert result.y.shape == (12, 5)
+    with pytest.raises(ValueError):
+        resolve_backend('cuda')
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from scipy.integrate import solve_ivp
+from three_body_simulation.ensemble import integrate_ensemble, SUCCESS, TERMINATED, FAILED
+from three_body_simulation.kernel import GravityKernel
+
+FIGURE_EIGHT = np.array([
+    0.97000436, -0.24308753, -0.97000436, 0.24308753, 0.0, 0.0,
+    0.4662036850, 0.4323657300, 0.4662036850, 0.4323657300, -0.93240737, -0.86473146
+])
+PERIOD = 6.3259
+
+
+def test_matches_solve_ivp_1():
+    # Test case 1: Every member agrees with an individual solve_ivp run, to the integration tolerance,
+    # also between steps (both use the Dormand-Prince dense output)
+    rng = np.random.default_rng(1)
+    batch = FIGURE_EIGHT + 1e-3 * rng.standard_normal((8, 12))
+    t_eval = np.linspace(0, PERIOD, 50)
+    result = integrate_ensemble(batch, PERIOD, t_eval=t_eval)
+    assert np.all(result.status == SUCCESS)
+    rhs = GravityKernel([1.0, 1.0, 1.0])
+    for state, samples in zip(batch, result.y):
+        reference = solve_ivp(rhs, (0, PERIOD), state, t_eval=t_eval, rtol=1e-10, atol=1e-10)
+        np.testing.assert_allclose(samples, reference.y.T, rtol=1e-10, atol=1e-10)
+
+
+def test_returns_to_start_2():
+    # Test case 2: The figure-eight orbit closes after one period
+    result = integrate_ensemble(FIGURE_EIGHT[np.newaxis], PERIOD)
+    np.testing.assert_allclose(result.y_final[0], FIGURE_EIGHT, atol=1e-4)
+    np.testing.assert_allclose(result.y[0, -1], result.y_final[0])
+
+
+def test_bad_member_does_not_stop_batch_3():
+    # Test case 3: A non-finite member fails on its own
+    batch = np.array([FIGURE_EIGHT, FIGURE_EIGHT])
+    batch[1, 0] = np.nan
+    result = integrate_ensemble(batch, PERIOD)
+    assert list(result.status) == [SUCCESS, FAILED]
+    assert np.all(np.isnan(result.y[1, -1]))
+
+
+def test_member_termination_4():
+    # Test case 4: Members stop individually when the terminate predicate fires
+    batch = np.array([FIGURE_EIGHT, FIGURE_EIGHT])
+    batch[1, 6:] *= 1.5
+    result = integrate_ensemble(batch, PERIOD,
+                                terminate=lambda t, y: np.abs(y[:, 0]) > 1.2)
+    assert list(result.status) == [SUCCESS, TERMINATED]
+    assert result.t_final[1] < PERIOD
+
+
+def test_invalid_arguments_5():
+    # Test case 5: Bad t_eval, negative time and mismatched state sizes are rejected
+    with pytest.raises(ValueError):
+        integrate_ensemble(FIGURE_EIGHT, PERIOD, t_eval=[0.5, 0.2])
+    with pytest.raises(ValueError):
+        integrate_ensemble(FIGURE_EIGHT, PERIOD, t_eval=[0.0, PERIOD + 1.0])
+    with pytest.raises(ValueError):
+        integrate_ensemble(FIGURE_EIGHT, -1.0)
+    with pytest.raises(ValueError):
+        integrate_ensemble(np.zeros((2, 18)), PERIOD)
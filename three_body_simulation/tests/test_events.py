@@ -0,0 +1,55 @@
+import pickle
+
+import numpy as np
+
+from three_body_simulation.events import CloseApproach, Escape, ReturnToStart
+from three_body_simulation.integrators import integrate
+from three_body_simulation.presets import get_butterfly_initial_conditions, get_figure_eight_initial_conditions
+
+
+def test_close_approach_terminates_1():
+    # Test case 1: A terminal close approach stops both engines early, at the same time
+    initial_state, _ = get_butterfly_initial_conditions()
+    event = CloseApproach(0.05)
+    full = integrate(initial_state, 0.9, n_samples=91, rtol=1e-10, atol=1e-10)
+    adaptive = integrate(initial_state, 0.9, n_samples=91, rtol=1e-10, atol=1e-10, events=[event])
+    fixed = integrate(initial_state, 0.9, n_samples=91, method='yoshida4', dt=1e-4, events=[event])
+    assert adaptive.t[-1] < 0.84 and fixed.t[-1] < 0.84
+    assert adaptive.nfev < full.nfev
+    assert len(adaptive.t_events[0]) == 1
+    np.testing.assert_allclose(fixed.t_events[0], adaptive.t_events[0], atol=1e-4)
+    # The trajectory ends at the last sample before the event
+    assert fixed.t[-1] <= fixed.t_events[0][0] < fixed.t[-1] + 0.01
+    assert abs(event(0.0, adaptive.y_events[0][0])) < 1e-6
+
+
+def test_escape_2():
+    # Test case 2: A body launched faster than escape speed fires the escape event
+    state = np.array([-1.0, 0.0, 1.0, 0.0, 0.0, 0.0, 3.0, 0.0])
+    event = Escape(5.0, masses=(1.0, 1.0))
+    assert event(0.0, state) < 0
+    result = integrate(state, 10.0, n_samples=11, masses=(1.0, 1.0), events=[event])
+    assert len(result.t_events[0]) == 1
+    assert result.t[-1] < 10.0
+    # A bound binary never escapes, however far apart it gets
+    bound = Escape(1.5, masses=(1.0, 1.0))
+    assert bound(0.0, np.array([-1.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 0.1])) < 0
+
+
+def test_return_to_start_3():
+    # Test case 3: The figure-eight returns once per period, without stopping the integration
+    initial_state, period = get_figure_eight_initial_conditions()
+    result = integrate(initial_state, 2.2 * period, n_samples=50, method='yoshida4', dt=1e-3,
+                       events=[ReturnToStart(initial_state, 0.01)])
+    np.testing.assert_allclose(result.t_events[0], [period, 2 * period], atol=1e-2)
+    assert result.y_events[0].shape == (2, 12)
+    assert len(result.t) == 50
+
+
+def test_events_pickle_4():
+    # Test case 4: Events survive pickling, so they can be sent to worker processes
+    state, _ = get_figure_eight_initial_conditions()
+    for event in (CloseApproach(0.1), Escape(10.0), ReturnToStart(state, 0.01)):
+        copy = pickle.loads(pickle.dumps(event))
+        assert copy(0.0, state) == event(0.0, state)
+        assert copy.terminal == event.terminal and copy.direction == event.direction
@@ -0,0 +1,45 @@
+import numpy as np
+
+from three_body_simulation.headless import frame_positions, render_frames, write_frame_sequence, write_raw_video
+from three_body_simulation.integrators import integrate
+from three_body_simulation.presets import get_figure_eight_initial_conditions
+
+
+def figure_eight(n_samples=200):
+    initial_state, total_time = get_figure_eight_initial_conditions()
+    return integrate(initial_state, total_time, n_samples=n_samples, method='yoshida4', dt=1e-2)
+
+
+def test_frame_positions_1():
+    # Test case 1: Frame times follow fps and speed, interpolating between samples
+    t = np.array([0.0, 1.0, 2.0])
+    # Uniform motion: positions (t, -t), velocities (1, -1)
+    y = np.array([[0.0, 1.0, 2.0], [0.0, -1.0, -2.0], [1.0, 1.0, 1.0], [-1.0, -1.0, -1.0]])
+    frames = frame_positions(t, y, fps=4, speed=1.0)
+    assert frames.shape == (9, 1, 2)
+    np.testing.assert_allclose(frames[1, 0], [0.25, -0.25])
+    np.testing.assert_allclose(frames[6, 0], [1.5, -1.5])
+
+
+def test_render_frames_2():
+    # Test case 2: Frames have the requested resolution and show the bodies
+    solution = figure_eight()
+    frames = list(render_frames(solution.t, solution.y, size=(120, 80), fps=10, n_frames=5))
+    assert len(frames) == 5
+    assert frames[0].shape == (80, 120, 3)
+    assert frames[0].dtype == np.uint8
+    # Red, green and blue bodies are all visible
+    assert all(frames[-1][..., channel].max() == 255 for channel in range(3))
+
+
+def test_writers_3(tmp_path):
+    # Test case 3: Raw video has width * height * 3 bytes per frame, PNG frames are numbered
+    solution = figure_eight()
+    frames = list(render_frames(solution.t, solution.y, size=(64, 48), n_frames=3))
+    with open(tmp_path / 'orbit.rgb', 'wb') as stream:
+        assert write_raw_video(frames, stream) == 3
+    assert (tmp_path / 'orbit.rgb').stat().st_size == 3 * 64 * 48 * 3
+    assert write_frame_sequence(frames, tmp_path / 'frames') == 3
+    assert sorted(p.name for p in (tmp_path / 'frames').iterdir()) == [
+        'frame_00000.png', 'frame_00001.png', 'frame_00002.png'
+    ]
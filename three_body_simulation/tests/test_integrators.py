@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+from three_body_simulation.integrators import (
+    integrate, integrate_regularized, integrate_symplectic, REGULARIZED_METHODS, SYMPLECTIC_METHODS
+)
+from three_body_simulation.kernel import GravityKernel
+
+FIGURE_EIGHT = np.array([
+    0.97000436, -0.24308753, -0.97000436, 0.24308753, 0.0, 0.0,
+    0.4662036850, 0.4323657300, 0.4662036850, 0.4323657300, -0.93240737, -0.86473146
+])
+PERIOD = 6.3259
+
+
+def energy(y):
+    # Total energy of three unit masses for states of shape (12, T)
+    x = y[:6].reshape(3, 2, -1)
+    v = y[6:].reshape(3, 2, -1)
+    kinetic = 0.5 * np.sum(v ** 2, axis=(0, 1))
+    potential = 0.0
+    for i, j in [(0, 1), (0, 2), (1, 2)]:
+        potential -= 1.0 / np.linalg.norm(x[i] - x[j], axis=0)
+    return kinetic + potential
+
+
+@pytest.mark.parametrize('method', list(SYMPLECTIC_METHODS))
+def test_symplectic_closes_orbit_1(method):
+    # Test case 1: Every scheme follows the figure-eight for one period
+    result = integrate(FIGURE_EIGHT, PERIOD, n_samples=11, method=method, dt=1e-3)
+    assert result.y.shape == (12, 11)
+    np.testing.assert_allclose(result.y[:, -1], FIGURE_EIGHT, atol=1e-3)
+
+
+def test_matches_rk45_2():
+    # Test case 2: Sixth-order Yoshida agrees with the adaptive solver on the same grid
+    reference = integrate(FIGURE_EIGHT, PERIOD, n_samples=50, method='RK45')
+    result = integrate(FIGURE_EIGHT, PERIOD, n_samples=50, method='yoshida6', dt=1e-2)
+    np.testing.assert_allclose(result.t, reference.t)
+    np.testing.assert_allclose(result.y, reference.y, atol=1e-6)
+
+
+@pytest.mark.parametrize('method, order', [('leapfrog', 2), ('yoshida4', 4), ('yoshida6', 6)])
+def test_convergence_order_3(method, order):
+    # Test case 3: Halving the step reduces the error by about 2**order
+    reference = integrate(FIGURE_EIGHT, 1.0, n_samples=2, method='DOP853', rtol=1e-13, atol=1e-13)
+    errors = [
+        np.max(np.abs(integrate(FIGURE_EIGHT, 1.0, n_samples=2, method=method, dt=dt).y[:, -1]
+                      - reference.y[:, -1]))
+        for dt in (0.1, 0.05)
+    ]
+    assert np.log2(errors[0] / errors[1]) > order - 0.5
+
+
+def test_energy_bounded_4():
+    # Test case 4: Energy error stays bounded over many periods
+    result = integrate(FIGURE_EIGHT, 20 * PERIOD, n_samples=400, method='yoshida4', dt=1e-2)
+    drift = np.abs(energy(result.y) - energy(result.y[:, :1]))
+    assert drift.max() < 1e-6
+
+
+def test_writes_into_preallocated_array_5():
+    # Test case 5: Samples go straight into the caller's array
+    out = np.zeros((12, 5))
+    result = integrate_symplectic(FIGURE_EIGHT, 1.0, 5, out=out, kernel=GravityKernel([1.0, 1.0, 1.0]))
+    assert result.y is out
+    np.testing.assert_allclose(out[:, 0], FIGURE_EIGHT)
+
+
+def test_unknown_method_6():
+    # Test case 6: Unknown method names are rejected
+    with pytest.raises(ValueError):
+        integrate(FIGURE_EIGHT, 1.0, method='euler')
+
+
+@pytest.mark.parametrize('method', list(REGULARIZED_METHODS))
+def test_regularized_follows_orbit_7(method):
+    # Test case 7: The regularized schemes follow the figure-eight on the uniform grid
+    reference = integrate(FIGURE_EIGHT, PERIOD, n_samples=50, method='DOP853', rtol=1e-12, atol=1e-12)
+    result = integrate(FIGURE_EIGHT, PERIOD, n_samples=50, method=method, dt=2e-3)
+    np.testing.assert_allclose(result.t, reference.t)
+    np.testing.assert_allclose(result.y, reference.y, atol=1e-4)
+
+
+def test_regularized_near_collision_8():
+    # Test case 8: A near-collision binary costs the same number of steps at any eccentricity
+    masses = (1.0, 1.0)
+    period = 2 * np.pi / np.sqrt(2)
+    nfev = []
+    for e in (0.9, 0.99999):
+        # Equal-mass binary with semi-major axis 1, started at apocentre
+        apocentre = 1 + e
+        speed = np.sqrt(2 * (1 - e) / apocentre) / 2
+        state = np.array([-apocentre / 2, 0.0, apocentre / 2, 0.0, 0.0, -speed, 0.0, speed])
+        result = integrate_regularized(state, period, 2, dt=0.05, kernel=GravityKernel(masses))
+        np.testing.assert_allclose(result.y[:, -1], state, atol=1e-3)
+        nfev.append(result.nfev)
+    assert nfev[1] < 1.2 * nfev[0]
@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+from three_body_simulation.kernel import GravityKernel, make_equations_of_motion
+
+
+def scalar_equations_of_motion(t, state, G=1.0, m1=1.0, m2=1.0, m3=1.0):
+    # Reference: the original three-body right-hand side
+    x1, y1, x2, y2, x3, y3, vx1, vy1, vx2, vy2, vx3, vy3 = state
+    r1 = np.array([x1, y1])
+    r2 = np.array([x2, y2])
+    r3 = np.array([x3, y3])
+    r12 = r2 - r1
+    r13 = r3 - r1
+    r23 = r3 - r2
+    r12_norm = np.linalg.norm(r12)
+    r13_norm = np.linalg.norm(r13)
+    r23_norm = np.linalg.norm(r23)
+    a1 = G * m2 * r12 / r12_norm**3 + G * m3 * r13 / r13_norm**3
+    a2 = G * m1 * -r12 / r12_norm**3 + G * m3 * r23 / r23_norm**3
+    a3 = G * m1 * -r13 / r13_norm**3 + G * m2 * -r23 / r23_norm**3
+    return np.array([vx1, vy1, vx2, vy2, vx3, vy3, *a1, *a2, *a3])
+
+
+def test_matches_scalar_three_body_1():
+    # Test case 1: Same derivatives as the original equations_of_motion
+    rng = np.random.default_rng(1)
+    rhs = make_equations_of_motion([1.0, 1.0, 1.0])
+    for _ in range(10):
+        state = rng.normal(size=12)
+        np.testing.assert_allclose(rhs(0.0, state), scalar_equations_of_motion(0.0, state), rtol=1e-12)
+
+
+def test_unequal_masses_2():
+    # Test case 2: Per-body masses
+    rng = np.random.default_rng(2)
+    masses = [1.0, 2.5, 0.3]
+    rhs = make_equations_of_motion(masses, G=2.0)
+    state = rng.normal(size=12)
+    expected = scalar_equations_of_motion(0.0, state, G=2.0, m1=1.0, m2=2.5, m3=0.3)
+    np.testing.assert_allclose(rhs(0.0, state), expected, rtol=1e-12)
+
+
+def test_momentum_conserved_3d_3():
+    # Test case 3: Newton's third law for many bodies in 3D
+    rng = np.random.default_rng(3)
+    masses = rng.uniform(0.1, 2.0, size=50)
+    kernel = GravityKernel(masses, ndim=3)
+    accelerations = kernel.accelerations(rng.normal(size=(50, 3)))
+    np.testing.assert_allclose(masses @ accelerations, 0.0, atol=1e-9)
+
+
+def test_batched_matches_single_4():
+    # Test case 4: A stacked batch gives the same result as one system at a time
+    rng = np.random.default_rng(4)
+    kernel = GravityKernel([1.0, 1.0, 1.0])
+    states = rng.normal(size=(5, 12))
+    batched = kernel.derivatives(0.0, states)
+    for state, row in zip(states, batched):
+        np.testing.assert_allclose(row, kernel.derivatives(0.0, state), rtol=1e-12)
+
+
+def test_writes_into_output_buffer_5():
+    # Test case 5: The output buffer is filled in place
+    kernel = GravityKernel([1.0, 1.0, 1.0])
+    out = np.zeros(12)
+    result = kernel.derivatives(0.0, np.arange(12, dtype=float), out=out)
+    assert result is out
+    assert np.all(out[:6] == np.arange(6, 12))
+
+
+def test_invalid_dimension_6():
+    # Test case 6: Only 2D and 3D are supported
+    with pytest.raises(ValueError):
+        GravityKernel([1.0, 1.0], ndim=4)
+
+
+def test_integer_state_7():
+    # Test case 7: Integer inputs produce float derivatives
+    kernel = GravityKernel([1.0, 1.0, 1.0])
+    state = np.arange(12)
+    derivatives = kernel.derivatives(0.0, state)
+    np.testing.assert_allclose(derivatives, kernel.derivatives(0.0, state.astype(float)))
+
+
+def test_potential_energy_8():
+    # Test case 8: Pairwise potential energy, also for batches and unequal masses
+    kernel = GravityKernel([1.0, 2.0, 3.0], G=2.0)
+    positions = np.array([[0.0, 0.0], [1.0, 0.0], [0.0, 2.0]])
+    expected = -2.0 * (1 * 2 / 1.0 + 1 * 3 / 2.0 + 2 * 3 / np.sqrt(5.0))
+    assert np.isclose(kernel.potential_energy(positions), expected)
+    batched = kernel.potential_energy(np.stack([positions, 2 * positions]))
+    np.testing.assert_allclose(batched, [expected, expected / 2])
+
+
+def test_potential_reuses_pairwise_terms_9():
+    # Test case 9: After accelerations(), the potential comes from the cached pairwise terms
+    kernel = GravityKernel([1.0, 2.0, 3.0], softening=0.1)
+    positions = np.random.default_rng(9).normal(size=(3, 2))
+    fresh = GravityKernel([1.0, 2.0, 3.0], softening=0.1).potential_energy(positions)
+    kernel.accelerations(positions)
+    assert kernel._cached
+    assert np.isclose(kernel.potential_energy(positions), fresh)
+    # Moved positions are recomputed, not served from the cache
+    assert np.isclose(kernel.potential_energy(2 * positions), fresh / 2, rtol=0.05)
+    assert not kernel._cached
+
+
+def test_force_jacobian_10():
+    # Test case 10: The analytic force Jacobian matches finite differences, with softening in 3D
+    kernel = GravityKernel([1.0, 2.0, 3.0], ndim=3, softening=0.1)
+    positions = np.random.default_rng(10).normal(size=(2, 3, 3))
+    jacobian = kernel.force_jacobian(positions)
+    assert jacobian.shape == (2, 9, 9)
+    numeric = np.empty_like(jacobian)
+    for k in range(9):
+        offset = np.zeros(9)
+        offset[k] = 1e-6
+        offset = offset.reshape(3, 3)
+        plus = kernel.accelerations(positions + offset).reshape(2, 9)
+        minus = kernel.accelerations(positions - offset).reshape(2, 9)
+        numeric[:, :, k] = (plus - minus) / 2e-6
+    np.testing.assert_allclose(jacobian, numeric, atol=1e-7)
+    np.testing.assert_allclose(kernel.force_jacobian(positions[1]), jacobian[1])
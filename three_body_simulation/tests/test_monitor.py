@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from three_body_simulation.integrators import integrate
+from three_body_simulation.kernel import GravityKernel
+from three_body_simulation.monitor import QUANTITIES, ConservationMonitor
+from three_body_simulation.presets import get_cluster_initial_conditions, get_figure_eight_initial_conditions
+
+
+@pytest.mark.parametrize('method, options', [
+    ('RK45', {'rtol': 1e-10, 'atol': 1e-10}),
+    ('yoshida4', {'dt': 1e-2}),
+    ('logh', {'dt': 1e-2}),
+])
+def test_records_every_step_1(method, options):
+    # Test case 1: Every engine reports small drifts, one record per step
+    initial_state, period = get_figure_eight_initial_conditions()
+    monitor = ConservationMonitor()
+    result = integrate(initial_state, period, n_samples=20, method=method, monitor=monitor, **options)
+    assert len(result.t) == 20
+    assert len(monitor.t) > 20 and np.all(np.diff(monitor.t) > 0)
+    assert monitor.t[-1] >= period * (1 - 1e-12)
+    drift = monitor.drift
+    assert set(drift) == set(QUANTITIES)
+    assert drift['energy'] < 1e-4
+    assert max(drift['momentum'], drift['angular_momentum'], drift['center_of_mass']) < 1e-9
+    assert not monitor.exceeded
+
+
+def test_matches_direct_evaluation_2():
+    # Test case 2: The recorded series match the quantities computed from scratch, also in 3D
+    initial_state, total_time = get_cluster_initial_conditions(8)
+    masses = np.full(8, 1 / 8)
+    monitor = ConservationMonitor()
+    integrate(initial_state, 0.5, n_samples=5, method='leapfrog', dt=1e-2, masses=masses, ndim=3,
+              softening=0.05, monitor=monitor)
+    kernel = GravityKernel(masses, ndim=3, softening=0.05)
+    x = initial_state[:24].reshape(8, 3)
+    v = initial_state[24:].reshape(8, 3)
+    energy = 0.5 * np.sum(masses[:, np.newaxis] * v * v) + kernel.potential_energy(x)
+    assert np.isclose(monitor.series('energy')[0], energy)
+    np.testing.assert_allclose(monitor.series('angular_momentum')[0], masses @ np.cross(x, v))
+    assert monitor.series('momentum').shape == (len(monitor.t), 3)
+
+
+def test_aborts_on_drift_3():
+    # Test case 3: A loose run stops as soon as the energy drift passes the threshold
+    initial_state, period = get_figure_eight_initial_conditions()
+    monitor = ConservationMonitor(max_drift=1e-6)
+    result = integrate(initial_state, 10 * period, n_samples=100, rtol=1e-5, atol=1e-5, monitor=monitor)
+    assert monitor.exceeded
+    assert len(result.t_events[0]) == 1
+    assert result.t[-1] < result.t_events[0][0] < 10 * period
+
+
+@pytest.mark.parametrize('method, options', [
+    ('RK45', {'backend': 'numba', 'rtol': 1e-9, 'atol': 1e-9}),
+    ('leapfrog', {'backend': 'numba', 'dt': 1e-3}),
+    ('leapfrog', {'force': 'barnes_hut', 'theta': 0.5, 'dt': 1e-3}),
+])
+def test_compiled_and_tree_kernels_4(method, options):
+    # Test case 4: The compiled and tree-code force passes supply the potential energy themselves,
+    # so the monitor never falls back to the N x N pairwise buffers of the NumPy kernel
+    initial_state, _ = get_cluster_initial_conditions(64)
+    masses = np.full(64, 1 / 64)
+    monitor = ConservationMonitor()
+    integrate(initial_state, 0.05, n_samples=5, method=method, masses=masses, ndim=3, softening=0.05,
+              monitor=monitor, **options)
+    assert monitor.kernel._shape is None
+    kernel = GravityKernel(masses, ndim=3, softening=0.05)
+    x = initial_state[:192].reshape(64, 3)
+    v = initial_state[192:].reshape(64, 3)
+    energy = 0.5 * np.sum(masses[:, np.newaxis] * v * v) + kernel.potential_energy(x)
+    assert np.isclose(monitor.series('energy')[0], energy, rtol=1e-3)
+    assert monitor.drift['energy'] < 1e-3
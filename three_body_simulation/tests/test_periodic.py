@@ -0,0 +1,33 @@
+import numpy as np
+
+from three_body_simulation.integrators import integrate
+from three_body_simulation.periodic import refine_periodic_orbits, refine_preset
+from three_body_simulation.presets import get_figure_eight_initial_conditions
+
+# Looser than the defaults, to keep the tests quick
+FAST = {'rtol': 1e-10, 'atol': 1e-10, 'tolerance': 1e-8}
+
+
+def test_refines_figure_eight_1():
+    # Test case 1: The preset's rounded initial conditions converge to an exactly closing orbit
+    result = refine_preset('figure_eight', **FAST)
+    assert result.converged[0] and result.iterations[0] <= 3
+    assert abs(result.periods[0] - 6.3259) < 1e-3
+    state = result.initial_states[0]
+    orbit = integrate(state, result.periods[0], n_samples=2, method='DOP853', rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(orbit.y[:, -1], state, atol=1e-7)
+    # One Floquet multiplier of a periodic orbit is 1 (the flow direction)
+    assert np.min(np.abs(np.linalg.eigvals(result.monodromy[0]) - 1)) < 1e-4
+
+
+def test_batch_2():
+    # Test case 2: Orbits of a batch converge independently, and a bad guess does not converge
+    initial_state, period = get_figure_eight_initial_conditions()
+    states = np.tile(initial_state, (3, 1))
+    # Opposite velocity changes keep the total momentum zero, as a periodic orbit needs
+    states[1, [6, 8]] += [1e-3, -1e-3]
+    periods = np.array([period, period, 0.5 * period])
+    result = refine_periodic_orbits(states, periods, max_iterations=4, **FAST)
+    assert result.converged.tolist() == [True, True, False]
+    assert result.residuals[2] > 1e-8
+    assert not np.allclose(result.initial_states[0], result.initial_states[1])
@@ -0,0 +1,43 @@
+import numpy as np
+
+from three_body_simulation.integrators import integrate
+from three_body_simulation.playback import HermiteTrajectory, Playback
+from three_body_simulation.presets import get_figure_eight_initial_conditions
+
+
+def test_sparse_interpolation_1():
+    # Test case 1: 200 samples of the figure-eight reproduce a dense trajectory closely
+    initial_state, total_time = get_figure_eight_initial_conditions()
+    sparse = integrate(initial_state, total_time, n_samples=200)
+    dense = integrate(initial_state, total_time, n_samples=2001)
+    positions = HermiteTrajectory(sparse.t, sparse.y).positions(dense.t)
+    assert np.max(np.abs(positions - dense.y[:6])) < 1e-5
+
+
+def test_exact_at_samples_2():
+    # Test case 2: Interpolation passes through the samples; scalar times give flat vectors
+    t = np.array([0.0, 0.5, 1.0])
+    y = np.array([[0.0, 0.25, 1.0], [0.0, 1.0, 2.0]])
+    trajectory = HermiteTrajectory(t, y)
+    np.testing.assert_allclose(trajectory.positions(t), y[:1])
+    assert trajectory.positions(0.5).shape == (1,)
+    # x = t^2 is a cubic, so it is reproduced exactly between samples
+    np.testing.assert_allclose(trajectory.positions(0.3), [0.09])
+
+
+def test_slow_speed_moves_3():
+    # Test case 3: Speeds below 1 still advance playback, and it loops at the end
+    t = np.linspace(0.0, 1.0, 11)
+    y = np.stack([t, np.ones_like(t)])
+    playback = Playback(HermiteTrajectory(t, y), rate=1.0)
+    first = playback.advance(1 / 60, speed=0.3)
+    second = playback.advance(1 / 60, speed=0.3)
+    assert 0 < first[0] < second[0]
+    playback.advance(1.0, speed=1.0)
+    np.testing.assert_allclose(playback.time, 0.01, atol=1e-12)
+
+
+def test_no_trajectory_4():
+    # Test case 4: Without a trajectory there is nothing to draw
+    playback = Playback(rate=1.0)
+    assert playback.advance(0.1) is None
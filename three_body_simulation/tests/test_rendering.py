@@ -0,0 +1,115 @@
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+
+from three_body_simulation.rendering import TextCache, TrailRenderer, screen_coordinates
+
+
+def test_trail_fades_out_1():
+    # Test case 1: A dot drawn once is fully transparent after trail_length frames
+    trails = TrailRenderer((20, 20), trail_length=10, radius=2)
+    trails.update([(10, 10)], [(255, 0, 0)])
+    assert trails.surface.get_at((10, 10)).a == 255
+    for _ in range(9):
+        trails.update([], [])
+    assert 0 < trails.surface.get_at((10, 10)).a < 255
+    for _ in range(200):
+        trails.update([], [])
+    assert trails.surface.get_at((10, 10)).a == 0
+
+
+def test_clear_and_draw_2():
+    # Test case 2: clear() empties the layer and draw() blits it onto the target
+    trails = TrailRenderer((20, 20), trail_length=10, radius=2)
+    trails.update([(5, 5)], [(0, 255, 0)])
+    target = pygame.Surface((20, 20))
+    trails.draw(target)
+    assert target.get_at((5, 5))[:3] == (0, 255, 0)
+    trails.clear()
+    assert trails.surface.get_at((5, 5)).a == 0
+
+
+def test_dirty_rects_match_full_redraw_3():
+    # Test case 3: Redrawing only the dirty rectangles gives the same frames as full redraws
+    trails = TrailRenderer((200, 120), trail_length=20, radius=3, tile_size=16)
+    full = pygame.Surface((200, 120))
+    partial = pygame.Surface((200, 120))
+    for frame in range(60):
+        points = [(5 + 3 * frame, 60 + (frame % 7)), (190 - 2 * frame, 10 + frame)]
+        trails.update(points, [(255, 0, 0), (0, 0, 255)])
+        full.fill((0, 0, 0))
+        trails.draw(full)
+        trails.draw(partial, trails.dirty_rects(), background=(0, 0, 0))
+        assert pygame.image.tobytes(full, 'RGB') == pygame.image.tobytes(partial, 'RGB')
+
+
+def test_dirty_rects_expire_4():
+    # Test case 4: Dirty rectangles cover the visible dots and vanish once they have faded out
+    trails = TrailRenderer((100, 100), trail_length=10, radius=2, tile_size=16)
+    trails.update([(40, 40), (-50, 10)], [(255, 0, 0), (0, 255, 0)])
+    rects = trails.dirty_rects()
+    assert len(rects) == 1 and rects[0].collidepoint(40, 40)
+    for _ in range(11):  # fade_step 25: 255 -> 5 after 10 frames, 0 after 11
+        trails.update([], [])
+    assert trails.dirty_rects() == rects
+    assert trails.surface.get_at((40, 40)).a == 0
+    trails.update([], [])
+    assert trails.dirty_rects() == []
+
+
+def test_text_cache_renders_once_5():
+    # Test case 5: Text is rendered once per (text, color) and reused afterwards
+    pygame.font.init()
+    texts = TextCache(pygame.font.Font(None, 18), max_size=2)
+    surface = texts.render("Figure-Eight", (255, 255, 255))
+    assert texts.render("Figure-Eight", (255, 255, 255)) is surface
+    assert texts.render("Figure-Eight", (200, 200, 200)) is not surface
+    texts.render("Butterfly", (255, 255, 255))
+    assert texts.render("Figure-Eight", (255, 255, 255)) is not surface
+
+
+def test_screen_coordinates_6():
+    # Test case 6: Every body in every frame is converted at once, origin at the center and y up
+    frames = np.array([[[0.0, 0.0], [1.0, 1.0]], [[-0.5, 0.25], [2.0, -1.0]]])
+    pixels = screen_coordinates(frames, (200, 100), scale=10.0)
+    assert pixels.shape == (2, 2, 2) and pixels.dtype.kind == 'i'
+    np.testing.assert_array_equal(pixels[0], [[100, 50], [110, 40]])
+    np.testing.assert_array_equal(pixels[1], [[95, 47], [120, 60]])
+
+
+def test_dots_larger_than_tiles_7():
+    # Test case 7: Dots spanning several tiles are faded and redrawn whole
+    trails = TrailRenderer((64, 64), trail_length=5, radius=10, tile_size=8)
+    full = pygame.Surface((64, 64))
+    partial = pygame.Surface((64, 64))
+    for frame in range(12):
+        trails.update([(4 * frame, 30)] if frame < 6 else [], [(255, 255, 0)])
+        full.fill((0, 0, 0))
+        trails.draw(full)
+        trails.draw(partial, trails.dirty_rects(), background=(0, 0, 0))
+        assert pygame.image.tobytes(full, 'RGB') == pygame.image.tobytes(partial, 'RGB')
+    assert trails.dirty_rects() == []
+    assert pygame.surfarray.array_alpha(trails.surface).max() == 0
+
+
+def test_set_trail_length_8():
+    # Test case 8: Trails shortened and lengthened mid-run still fade out completely in the dirty tiles
+    trails = TrailRenderer((64, 64), trail_length=20, radius=3, tile_size=16)
+    full = pygame.Surface((64, 64))
+    partial = pygame.Surface((64, 64))
+    for frame in range(80):
+        if frame == 10:
+            trails.set_trail_length(5)
+        elif frame == 12:
+            trails.set_trail_length(40)
+        trails.update([(5 * frame % 64, 20)] if frame < 20 else [], [(255, 0, 255)])
+        full.fill((0, 0, 0))
+        trails.draw(full)
+        trails.draw(partial, trails.dirty_rects(), background=(0, 0, 0))
+        assert pygame.image.tobytes(full, 'RGB') == pygame.image.tobytes(partial, 'RGB')
+    assert trails.fade_step == 6
+    assert trails.dirty_rects() == []
+    assert pygame.surfarray.array_alpha(trails.surface).max() == 0
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from three_body_simulation.integrators import integrate
+from three_body_simulation.playback import HermiteTrajectory
+from three_body_simulation.presets import get_broucke_henon_initial_conditions, get_figure_eight_initial_conditions
+from three_body_simulation.sampling import thin_trajectory
+
+
+def test_thin_within_tolerance_1():
+    # Test case 1: Dropped samples are reproduced within tolerance by the kept ones
+    initial_state, total_time = get_figure_eight_initial_conditions()
+    uniform = integrate(initial_state, total_time, n_samples=5000)
+    t, y = thin_trajectory(uniform.t, uniform.y, tolerance=1e-4)
+    assert len(t) < len(uniform.t) // 10
+    assert t[0] == uniform.t[0] and t[-1] == uniform.t[-1]
+    positions = HermiteTrajectory(t, y).positions(uniform.t)
+    assert np.max(np.abs(positions - uniform.y[:6])) <= 1e-4
+
+
+def test_adaptive_sampling_2():
+    # Test case 2: Adaptive sampling keeps far fewer samples, concentrated where the orbit is fast
+    initial_state, total_time = get_broucke_henon_initial_conditions()
+    uniform = integrate(initial_state, total_time, n_samples=10000)
+    adaptive = integrate(initial_state, total_time, sampling='adaptive', sample_tolerance=1e-4)
+    assert len(adaptive.t) < len(uniform.t) // 5
+    positions = HermiteTrajectory(adaptive.t, adaptive.y).positions(uniform.t)
+    assert np.max(np.abs(positions - uniform.y[:6])) < 1e-3
+    # Sample spacing varies with the speed of the bodies
+    spacing = np.diff(adaptive.t)
+    assert spacing.max() > 5 * spacing.min()
+
+
+def test_symplectic_adaptive_3():
+    # Test case 3: Symplectic methods thin their uniform samples
+    initial_state, total_time = get_figure_eight_initial_conditions()
+    result = integrate(initial_state, total_time, n_samples=1001, method='yoshida4', dt=1e-2,
+                       sampling='adaptive')
+    assert 2 < len(result.t) < 200
+
+
+def test_unknown_sampling_4():
+    # Test case 4: Unknown sampling modes are rejected
+    initial_state, total_time = get_figure_eight_initial_conditions()
+    with pytest.raises(ValueError):
+        integrate(initial_state, total_time, sampling='curvature')
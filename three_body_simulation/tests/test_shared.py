@@ -0,0 +1,52 @@
+import pickle
+
+import numpy as np
+
+from three_body_simulation.integrators import integrate
+from three_body_simulation.presets import get_figure_eight_initial_conditions
+from three_body_simulation.shared import SharedArray, TrajectorySink, run_batch
+
+
+def batch(n_jobs=4):
+    initial_state, total_time = get_figure_eight_initial_conditions()
+    offsets = np.linspace(0.0, 1e-3, n_jobs)[:, np.newaxis]
+    return initial_state + offsets, total_time
+
+
+def test_shared_array_attach_1():
+    # Test case 1: An attached array sees writes made through the owner, and the spec pickles
+    with SharedArray((2, 3), fill=0.0) as owner:
+        spec = pickle.loads(pickle.dumps(owner.spec))
+        attached = SharedArray.attach(spec)
+        owner.array[1, 2] = 5.0
+        assert attached.array[1, 2] == 5.0
+        attached.array[0, 0] = -1.0
+        assert owner.array[0, 0] == -1.0
+        attached.close()
+
+
+def test_run_batch_in_place_2():
+    # Test case 2: Pool workers write trajectories into the sink, matching integrate()
+    states, total_time = batch()
+    for method, kwargs in (('yoshida4', {'dt': 1e-2}), ('RK45', {'rtol': 1e-8, 'atol': 1e-8})):
+        with run_batch(states, total_time, 50, processes=2, method=method, **kwargs) as sink:
+            assert sink.y.shape == (4, 12, 50)
+            np.testing.assert_array_equal(sink.n_valid, 50)
+            assert np.all(sink.nfev > 0)
+            expected = integrate(states[3], total_time, n_samples=50, method=method, **kwargs)
+            np.testing.assert_allclose(sink.y[3], expected.y, atol=1e-12)
+            np.testing.assert_allclose(sink.t, expected.t)
+
+
+def test_integrate_into_out_3():
+    # Test case 3: integrate(out=...) fills the given slot and returns a view of it
+    states, total_time = batch(1)
+    sink = TrajectorySink(1, 12, 20)
+    try:
+        result = integrate(states[0], total_time, n_samples=20, method='leapfrog', dt=1e-2, out=sink.out(0))
+        assert np.shares_memory(result.y, sink.y)
+        sink.write(0, result)
+        assert sink.n_valid[0] == 20
+        assert not np.isnan(sink.y).any()
+    finally:
+        sink.close()
@@ -0,0 +1,31 @@
+import subprocess
+import sys
+
+
+def _imported_modules(module):
+    # Imports a module in a fresh interpreter and returns the names in sys.modules
+    code = f"import sys, {module}; print(' '.join(sys.modules))"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+def test_import_does_not_load_pygame_1():
+    # Test case 1: Importing the viewer leaves pygame (and its display) untouched until main() runs,
+    # and defers numba and scipy's solvers until an orbit is integrated
+    modules = _imported_modules('three_body_simulation.simulation')
+    assert 'three_body_simulation.simulation' in modules
+    assert not modules & {'pygame', 'numba', 'scipy.integrate', 'three_body_simulation.compiled'}
+
+
+def test_rendering_import_does_not_load_pygame_2():
+    # Test case 2: The drawing helpers only load pygame when a TrailRenderer is created
+    modules = _imported_modules('three_body_simulation.rendering')
+    assert 'pygame' not in modules
+
+
+def test_backend_falls_back_without_numba_3():
+    # Test case 3: Without numba the viewer integrates with the NumPy backend
+    code = ("import sys; sys.modules['numba'] = None; "
+            "import three_body_simulation.simulation as s; print(s.BACKEND)")
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ['numpy']
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from three_body_simulation.integrators import integrate
+from three_body_simulation.presets import get_preset
+from three_body_simulation.state import pack_state, split_state
+
+
+def test_split_and_pack_1():
+    # Test case 1: Positions and velocities are named views of the flat layout
+    positions = np.arange(12.0).reshape(4, 3)
+    velocities = -positions
+    state = pack_state(positions, velocities)
+    assert state.shape == (24,)
+    x, v = split_state(state, 4, 3)
+    np.testing.assert_array_equal(x, positions)
+    np.testing.assert_array_equal(v, velocities)
+    # Views write through to the state
+    v[0, 0] = 7.0
+    assert state[12] == 7.0
+
+
+def test_split_trajectory_2():
+    # Test case 2: Trajectories (S, T) split into (n_bodies, ndim, T)
+    y = np.arange(24.0 * 5).reshape(24, 5)
+    x, v = split_state(y, 4, 3)
+    assert x.shape == v.shape == (4, 3, 5)
+    np.testing.assert_array_equal(x[1, 2], y[5])
+    with pytest.raises(ValueError):
+        split_state(y, 3, 3)
+
+
+def test_ring_preset_3():
+    # Test case 3: The ring is a relative equilibrium: every body stays on the unit circle
+    preset = get_preset('ring')
+    initial_state, total_time = preset.initial_conditions()
+    result = integrate(initial_state, total_time, n_samples=50, **preset.system)
+    x, _ = split_state(result.y, preset.n_bodies, preset.ndim)
+    radii = np.linalg.norm(x, axis=1)
+    np.testing.assert_allclose(radii, 1.0, atol=1e-6)
+
+
+def test_cluster_preset_4():
+    # Test case 4: A 3D cluster integrates with per-body masses and softening
+    preset = get_preset('cluster')
+    initial_state, total_time = preset.initial_conditions()
+    result = integrate(initial_state, 0.5, n_samples=5, method='leapfrog', dt=1e-2, **preset.system)
+    x, v = split_state(result.y, preset.n_bodies, preset.ndim)
+    assert x.shape == (64, 3, 5)
+    # Momentum stays zero in the center-of-mass frame
+    momentum = np.einsum('i,ikt->kt', np.asarray(preset.masses), v)
+    np.testing.assert_allclose(momentum, 0.0, atol=1e-12)
+
+
+def test_state_size_mismatch_5():
+    # Test case 5: integrate() rejects a state that does not match the masses and ndim
+    initial_state, total_time = get_preset('figure_eight').initial_conditions()
+    with pytest.raises(ValueError):
+        integrate(initial_state, total_time, masses=(1.0, 1.0, 1.0, 1.0))
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from three_body_simulation.integrators import integrate
+from three_body_simulation.presets import PRESETS, get_figure_eight_initial_conditions
+from three_body_simulation.streaming import TrajectoryStream, stream_trajectory
+
+
+def test_blocks_match_full_trajectory_1():
+    # Test case 1: Concatenated blocks equal one integration over the whole grid
+    initial_state, total_time = get_figure_eight_initial_conditions()
+    blocks = list(stream_trajectory(initial_state, total_time, 101, block_samples=30,
+                                    method='leapfrog', dt=1e-2))
+    assert [len(t) for t, _ in blocks] == [30, 30, 30, 11]
+    expected = integrate(initial_state, total_time, n_samples=101, method='leapfrog', dt=1e-2)
+    np.testing.assert_allclose(np.concatenate([t for t, _ in blocks]), expected.t)
+    np.testing.assert_allclose(np.hstack([y for _, y in blocks]), expected.y, atol=1e-10)
+
+
+def test_unbounded_stream_2():
+    # Test case 2: An endless stream is consumed lazily
+    initial_state, _ = get_figure_eight_initial_conditions()
+    stream = TrajectoryStream(initial_state, 0.05, method='yoshida4', dt=1e-2)
+    for count, (t, y) in enumerate(stream.blocks(10)):
+        assert y.shape == (12, 10)
+        if count == 4:
+            break
+    assert stream.n_emitted == 50
+    assert stream.t == pytest.approx(49 * 0.05)
+
+
+def test_resume_from_checkpoint_3():
+    # Test case 3: A restored stream continues exactly where it stopped
+    initial_state, _ = get_figure_eight_initial_conditions()
+    stream = TrajectoryStream(initial_state, 0.1, method='yoshida4', dt=1e-2)
+    stream.next_block(5)
+    checkpoint = stream.checkpoint()
+    expected_t, expected_y = stream.next_block(5)
+    resumed_t, resumed_y = TrajectoryStream.from_checkpoint(checkpoint).next_block(5)
+    np.testing.assert_allclose(resumed_t, expected_t)
+    np.testing.assert_array_equal(resumed_y, expected_y)
+
+
+def test_invalid_interval_4():
+    # Test case 4: The sample interval must be positive
+    with pytest.raises(ValueError):
+        TrajectoryStream(np.zeros(12), 0.0)
+
+
+def test_stream_ends_where_integration_stops_5():
+    # Test case 5: Butterfly runs into a near triple collision that RK45 cannot pass at t ~ 0.84
+    preset = PRESETS['butterfly']
+    initial_state, total_time = preset.initial_conditions()
+    stream = TrajectoryStream(initial_state, total_time / 1999, method='RK45', rtol=1e-10, atol=1e-10)
+    blocks = list(stream.blocks(500, 2000))
+    assert len(blocks) == 1 and stream.stopped
+    t, y = blocks[0]
+    assert 1 < len(t) < 500 and y.shape == (12, len(t))
+    assert stream.n_emitted == len(t) and t[-1] < 0.85
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from three_body_simulation.presets import get_figure_eight_initial_conditions
+from three_body_simulation.sweep import METRICS, perturbation_grid, run_sweep
+
+# Cheap fixed-step integration for the tests
+FAST = {'method': 'yoshida4', 'dt': 2e-2}
+
+
+def small_grid(size=3):
+    initial_state, total_time = get_figure_eight_initial_conditions()
+    offsets = np.linspace(-0.01, 0.01, size)
+    return perturbation_grid(initial_state, 0, offsets, 7, offsets), total_time
+
+
+def test_perturbation_grid_1():
+    # Test case 1: Each axis perturbs one state component
+    initial_state, _ = get_figure_eight_initial_conditions()
+    states = perturbation_grid(initial_state, 0, [-0.1, 0.0, 0.1], 7, [0.0, 0.2])
+    assert states.shape == (3, 2, 12)
+    np.testing.assert_allclose(states[2, 1, [0, 7]], initial_state[[0, 7]] + [0.1, 0.2])
+    np.testing.assert_array_equal(states[1, 0], initial_state)
+
+
+def test_pool_matches_serial_2():
+    # Test case 2: The process pool fills the same map as a serial run
+    states, total_time = small_grid()
+    serial = run_sweep(states, total_time, processes=1, chunk_size=2, **FAST)
+    pooled = run_sweep(states, total_time, processes=2, chunk_size=2, **FAST)
+    for name in METRICS:
+        assert serial.metrics[name].shape == (3, 3)
+        np.testing.assert_array_equal(pooled.metrics[name], serial.metrics[name])
+    # The unperturbed center cell is the (nearly) periodic figure-eight
+    assert serial.metrics['return_distance'][1, 1] < 1e-2
+
+
+def test_resume_from_checkpoint_3(tmp_path):
+    # Test case 3: An interrupted sweep resumes from its checkpoint
+    states, total_time = small_grid()
+    checkpoint = tmp_path / 'sweep.npz'
+    reports = []
+
+    def interrupt(progress):
+        reports.append(progress)
+        if len(reports) == 2:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        run_sweep(states, total_time, processes=1, chunk_size=2, checkpoint=checkpoint,
+                  progress=interrupt, **FAST)
+    assert reports[-1].done == 4 and reports[-1].total == 9
+    assert reports[-1].cells_per_second > 0
+
+    resumed = run_sweep(states, total_time, processes=1, chunk_size=2, checkpoint=checkpoint, **FAST)
+    assert resumed.n_computed == 5
+    full = run_sweep(states, total_time, processes=1, chunk_size=2, **FAST)
+    np.testing.assert_array_equal(resumed.metrics['return_distance'], full.metrics['return_distance'])
+
+    # A different sweep does not reuse the checkpoint
+    other = run_sweep(states[:2], total_time, processes=1, chunk_size=2, checkpoint=checkpoint, **FAST)
+    assert other.n_computed == 6
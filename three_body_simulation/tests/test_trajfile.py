@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from three_body_simulation.trajfile import TrajectoryReader, TrajectoryWriter, save_trajectory, write_stream
+
+
+def random_trajectory(n_samples, n_bodies=3, ndim=2, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.arange(n_samples) * 0.01, rng.normal(size=(2 * n_bodies * ndim, n_samples))
+
+
+def test_round_trip_1(tmp_path):
+    # Test case 1: States, times and metadata survive a round trip
+    t, y = random_trajectory(1000)
+    path = tmp_path / 'orbit.traj'
+    save_trajectory(path, t, y, block_samples=64, masses=np.ones(3), G=1.0, preset='figure_eight',
+                    integrator='RK45', rtol=1e-10, atol=1e-10, dt=None)
+    reader = TrajectoryReader(path)
+    assert len(reader) == 1000
+    assert reader.metadata['preset'] == 'figure_eight'
+    assert reader.metadata['masses'] == [1.0, 1.0, 1.0]
+    np.testing.assert_array_equal(reader.times(), t)
+    np.testing.assert_array_equal(reader.states(), y)
+
+
+def test_random_access_2(tmp_path):
+    # Test case 2: Single samples, ranges and per-body slices across block boundaries
+    t, y = random_trajectory(500, n_bodies=4, ndim=3)
+    path = tmp_path / 'orbit.traj'
+    save_trajectory(path, t, y, n_bodies=4, ndim=3, block_samples=32)
+    reader = TrajectoryReader(path)
+    np.testing.assert_array_equal(reader[317], y[:, 317])
+    np.testing.assert_array_equal(reader[-1], y[:, -1])
+    np.testing.assert_array_equal(reader.states(30, 70), y[:, 30:70])
+    body = reader.body(2, 10, 100)
+    np.testing.assert_array_equal(body[:, :3], y[6:9, 10:100].T)
+    np.testing.assert_array_equal(body[:, 3:], y[18:21, 10:100].T)
+    with pytest.raises(IndexError):
+        reader[500]
+
+
+def test_streaming_append_3(tmp_path):
+    # Test case 3: Chunks appended while streaming are visible after each flush
+    t, y = random_trajectory(250)
+    path = tmp_path / 'orbit.traj'
+    writer = TrajectoryWriter(path, 3, 2, block_samples=40)
+    for start in range(0, 250, 70):
+        writer.append(t[start:start + 70], y[:, start:start + 70])
+        writer.flush()
+        reader = TrajectoryReader(path)
+        assert len(reader) == min(start + 70, 250)
+        np.testing.assert_array_equal(reader.states(), y[:, :len(reader)])
+    writer.close()
+
+
+def test_reopen_for_append_4(tmp_path):
+    # Test case 4: Appending to an existing file continues a partial block
+    t, y = random_trajectory(100)
+    path = tmp_path / 'orbit.traj'
+    save_trajectory(path, t[:45], y[:, :45], block_samples=20)
+    with TrajectoryWriter(path, mode='a') as writer:
+        writer.append(t[45:], y[:, 45:])
+    np.testing.assert_array_equal(TrajectoryReader(path).states(), y)
+
+
+def test_float32_5(tmp_path):
+    # Test case 5: Single precision halves the file size
+    t, y = random_trajectory(256)
+    save_trajectory(tmp_path / 'a.traj', t, y, block_samples=256)
+    save_trajectory(tmp_path / 'b.traj', t, y, block_samples=256, dtype='float32')
+    reader = TrajectoryReader(tmp_path / 'b.traj')
+    np.testing.assert_allclose(reader.states(), y, rtol=1e-6)
+    sizes = [(tmp_path / name).stat().st_size - 4096 for name in ('a.traj', 'b.traj')]
+    assert sizes[1] * 2 == sizes[0]
+
+
+def test_bad_file_6(tmp_path):
+    # Test case 6: Files without the magic number are rejected
+    path = tmp_path / 'bad.traj'
+    path.write_bytes(b'x' * 100)
+    with pytest.raises(ValueError):
+        TrajectoryReader(path)
+
+
+def test_write_stream_7(tmp_path):
+    # Test case 7: A trajectory stream is written block by block
+    from three_body_simulation.presets import get_figure_eight_initial_conditions
+    from three_body_simulation.streaming import stream_trajectory
+    initial_state, total_time = get_figure_eight_initial_conditions()
+    blocks = stream_trajectory(initial_state, total_time, 101, block_samples=30, method='leapfrog', dt=1e-2)
+    count = write_stream(tmp_path / 'orbit.traj', blocks, integrator='leapfrog', dt=1e-2)
+    reader = TrajectoryReader(tmp_path / 'orbit.traj')
+    assert count == len(reader) == 101
+    np.testing.assert_allclose(reader[0], initial_state)
+    assert reader.times()[-1] == pytest.approx(total_time)
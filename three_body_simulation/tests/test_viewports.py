@@ -0,0 +1,112 @@
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+import pytest
+
+from three_body_simulation.cache import OrbitCache
+from three_body_simulation.integrators import integrate
+from three_body_simulation.presets import PRESETS
+from three_body_simulation.viewports import (
+    DETAIL_LEVELS, BudgetScheduler, FrameScheduler, OrbitSource, Viewport, tile_layout,
+)
+
+
+class FakeTimer:
+    # Stands in for time.perf_counter: only moves when a fake viewport renders
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeViewport:
+    # Stands in for a Viewport: takes a fixed time to render and remembers the detail
+    def __init__(self, name, timer, seconds=0.0):
+        self.name = name
+        self.timer = timer
+        self.seconds = seconds
+        self.details = []
+
+    def render(self, speed=1.0, detail=1.0):
+        self.timer.now += self.seconds
+        self.details.append(detail)
+        return [pygame.Rect(0, 0, 1, 1)]
+
+
+def test_tile_layout_1():
+    # Test case 1: Tiles fill a grid row by row, without overlapping
+    rects = [pygame.Rect(rect) for rect in tile_layout(3, (800, 800), gap=2)]
+    assert [rect.topleft for rect in rects] == [(0, 0), (401, 0), (0, 401)]
+    assert all(rect.size == (399, 399) for rect in rects)
+    assert not any(a.colliderect(b) for k, a in enumerate(rects) for b in rects[k + 1:])
+    assert len(tile_layout(1, (800, 600))) == 1 and tile_layout(1, (800, 600))[0] == (0, 0, 800, 600)
+
+
+def test_every_frame_scheduler_2():
+    # Test case 2: The base scheduler renders every tile every frame and reports their times
+    timer = FakeTimer()
+    scheduler = FrameScheduler(timer=timer)
+    tiles = [FakeViewport('a', timer), FakeViewport('b', timer, 0.002)]
+    for _ in range(3):
+        assert len(scheduler.run_frame(tiles, 1 / 60)) == 2
+    report = scheduler.report()
+    assert report['a']['rendered'] == report['b']['rendered'] == 3
+    assert report['b']['skipped'] == 0 and report['b']['render_ms'] == pytest.approx(2.0)
+    assert report['a']['render_ms'] == 0.0
+
+
+def test_budget_scheduler_shares_frames_3():
+    # Test case 3: Tiles that do not fit in the budget wait, and the longest-waiting render first
+    timer = FakeTimer()
+    scheduler = BudgetScheduler(budget=0.01, render_share=1.0, hold=1000, timer=timer)
+    tiles = [FakeViewport(name, timer, 0.006) for name in 'abc']
+    rendered = [len(scheduler.run_frame(tiles, 0.01)) for _ in range(6)]
+    # Unknown times fit until the clock passes 10 ms; after that only one 6 ms tile fits per frame
+    assert rendered == [2, 1, 1, 1, 1, 1]
+    report = scheduler.report()
+    assert [report[name]['rendered'] for name in 'abc'] == [3, 2, 2]
+    assert [report[name]['skipped'] for name in 'abc'] == [3, 4, 4]
+
+
+def test_budget_scheduler_adapts_detail_4():
+    # Test case 4: Trail detail drops while frames run late and recovers when they are fast again
+    timer = FakeTimer()
+    scheduler = BudgetScheduler(budget=0.01, smoothing=1.0, hold=1, timer=timer)
+    tiles = [FakeViewport('a', timer)]
+    for level in DETAIL_LEVELS[1:]:
+        scheduler.run_frame(tiles, 0.05)
+        assert scheduler.detail == level
+    scheduler.run_frame(tiles, 0.05)
+    assert scheduler.detail == DETAIL_LEVELS[-1]
+    for level in reversed(DETAIL_LEVELS[:-1]):
+        scheduler.run_frame(tiles, 0.01)
+        assert scheduler.detail == level
+    assert tiles[0].details[:2] == [1.0, 0.5]
+
+
+def test_viewport_draws_inside_its_tile_5():
+    # Test case 5: A viewport plays a cached orbit into its own region of the window only
+    preset = PRESETS['figure_eight']
+    initial_state, total_time = preset.initial_conditions()
+    cache = OrbitCache(directory=None)
+    cache.put('figure_eight', 1e-10, 200, 'yoshida4',
+              integrate(initial_state, total_time, n_samples=200, method='yoshida4', dt=1e-2))
+    source = OrbitSource('figure_eight', cache, integrator='yoshida4', n_samples=200)
+    assert source.job is None and source.trajectory is not None
+
+    screen = pygame.Surface((400, 200))
+    viewport = Viewport(source, (200, 0, 200, 200), trail_length=10)
+    viewport.attach(screen)
+    viewport.elapse(0.1)
+    assert viewport.render() == [pygame.Rect(200, 0, 200, 200)]
+    viewport.elapse(0.1)
+    rects = viewport.render(detail=0.5)
+    assert rects and all(pygame.Rect(200, 0, 200, 200).contains(rect) for rect in rects)
+    assert viewport.trails.trail_length == 5
+
+    pixels = pygame.surfarray.array3d(screen)
+    assert pixels[:200].max() == 0
+    assert all(pixels[200:, :, channel].max() == 255 for channel in range(3))
@@ -0,0 +1,66 @@
+import numpy as np
+from three_body_simulation.integrators import integrate
+from three_body_simulation.presets import get_figure_eight_initial_conditions
+from three_body_simulation.worker import IntegrationQueue, IntegrationWorker
+
+
+def wait_for(job):
+    # Collect every chunk of a job
+    chunks = []
+    while not job.done:
+        chunks.extend(job.poll())
+        job.join(0.01)
+    chunks.extend(job.poll())
+    return chunks
+
+
+def test_streams_chunks_1():
+    # Test case 1: The trajectory arrives in chunks that assemble to the full orbit
+    initial_state, total_time = get_figure_eight_initial_conditions()
+    worker = IntegrationWorker(chunk_samples=25)
+    job = worker.submit(initial_state, total_time, 101, method='yoshida4', dt=1e-2)
+    chunks = wait_for(job)
+    assert len(chunks) == 5
+    result = job.result()
+    expected = integrate(initial_state, total_time, n_samples=101, method='yoshida4', dt=1e-2)
+    np.testing.assert_allclose(result.t, expected.t)
+    np.testing.assert_allclose(result.y, expected.y, atol=1e-9)
+
+
+def test_adaptive_chunks_2():
+    # Test case 2: Restarting the adaptive solver per chunk stays within tolerance
+    initial_state, total_time = get_figure_eight_initial_conditions()
+    job = IntegrationWorker(chunk_samples=50).submit(initial_state, total_time, 200)
+    wait_for(job)
+    expected = integrate(initial_state, total_time, n_samples=200)
+    np.testing.assert_allclose(job.result().y, expected.y, atol=1e-7)
+
+
+def test_submit_cancels_previous_job_3():
+    # Test case 3: A new submission cancels the job in flight
+    initial_state, total_time = get_figure_eight_initial_conditions()
+    worker = IntegrationWorker(chunk_samples=10)
+    first = worker.submit(initial_state, 100 * total_time, 10000)
+    second = worker.submit(initial_state, total_time, 21)
+    assert first.cancelled
+    first.join(10)
+    wait_for(second)
+    assert first.result().y.shape[1] < 10000
+    assert second.result().y.shape == (12, 21)
+    assert second.error is None
+
+
+def test_queue_shares_one_thread_4():
+    # Test case 4: Queued jobs take turns in one thread; cancelling one leaves the others running
+    initial_state, total_time = get_figure_eight_initial_conditions()
+    jobs = IntegrationQueue(chunk_samples=10)
+    dropped = jobs.submit(initial_state, 100 * total_time, 10000, method='leapfrog', dt=1e-2)
+    first = jobs.submit(initial_state, total_time, 41, method='yoshida4', dt=1e-2)
+    second = jobs.submit(initial_state, total_time, 21, method='leapfrog', dt=1e-2)
+    dropped.cancel()
+    assert len(wait_for(first)) == 5 and len(wait_for(second)) == 3
+    wait_for(dropped)
+    assert dropped.cancelled and dropped.result().y.shape[1] < 10000
+    expected = integrate(initial_state, total_time, n_samples=41, method='yoshida4', dt=1e-2)
+    np.testing.assert_allclose(first.result().y, expected.y, atol=1e-9)
+    assert second.result().y.shape == (12, 21) and second.error is None
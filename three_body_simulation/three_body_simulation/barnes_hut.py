@@ -0,0 +1,236 @@
+# three_body_simulation/barnes_hut.py
+#
+# Barnes-Hut tree code: O(N log N) approximate gravity for large N.
+#
+# The tree is a quadtree (2D) or octree (3D) built from Morton (Z-order)
+# codes: after sorting the bodies by code, every node is a contiguous range
+# of the sorted bodies, and the children of a node split its range where the
+# next level's code prefix changes. Nodes are stored level by level in flat
+# arrays that are allocated once and reused for every rebuild.
+#
+# The traversal is vectorized over (body, node) pairs: a pair is accepted as
+# a monopole when the distance d to the node's center of mass satisfies
+# d > s / theta + delta (Barnes 1994), with s the cell size and delta the
+# offset of the center of mass from the cell center, and the node does not
+# contain the body. Otherwise leaves are summed directly and other nodes are
+# replaced by the body's pairs with the node's children.
+
+import numpy as np
+
+from three_body_simulation.kernel import GravityKernel
+
+# Default opening angle: ~0.1-1% force error for typical clusters
+DEFAULT_THETA = 0.5
+
+
+class BarnesHutKernel(GravityKernel):
+    """
+    GravityKernel that evaluates forces with a Barnes-Hut tree.
+
+    theta = 0 opens every node and reproduces direct summation; larger values
+    trade accuracy for speed. The tree is rebuilt on every evaluation, into
+    preallocated node arrays that only grow when a rebuild needs more nodes.
+    The traversal also sums the potential energy with the same approximation,
+    which potential_energy() returns for the same positions without another
+    pass. Batched calls (leading dimensions) use direct summation.
+    """
+
+    def __init__(self, masses, ndim: int = 2, G: float = 1.0, softening: float = 0.0,
+                 theta: float = DEFAULT_THETA, leaf_size: int = 8):
+        """
+        Parameters:
+        masses (array_like): Mass of each body, shape (N,).
+        ndim (int): Number of spatial dimensions (2 or 3).
+        G (float): Gravitational constant.
+        softening (float): Plummer softening length.
+        theta (float): Opening angle.
+        leaf_size (int): Largest number of bodies in a leaf (summed directly).
+        """
+        super().__init__(masses, ndim=ndim, G=G, softening=softening)
+        if theta < 0:
+            raise ValueError(f"theta must be non-negative, got {theta}")
+        if leaf_size < 1:
+            raise ValueError(f"leaf_size must be at least 1, got {leaf_size}")
+        self.theta = theta
+        self.leaf_size = leaf_size
+        # Quantization depth: ndim * levels bits must fit in an int64 Morton code
+        self.levels = 62 // ndim
+        self.n_nodes = 0
+        self._allocate_nodes(max(1, 2 * self.n_bodies))
+        # Positions of the last single-system force pass and their potential energy
+        self._pass_x = np.empty((self.n_bodies, ndim))
+        self._pass_potential = None
+
+    def _allocate_nodes(self, capacity: int) -> None:
+        # Flat node arrays, filled level by level on every rebuild
+        self._node_start = np.empty(capacity, dtype=np.int64)
+        self._node_end = np.empty(capacity, dtype=np.int64)
+        self._node_first_child = np.empty(capacity, dtype=np.int64)
+        self._node_n_children = np.empty(capacity, dtype=np.int64)
+        self._node_mass = np.empty(capacity)
+        self._node_com = np.empty((capacity, self.ndim))
+        self._node_open2 = np.empty(capacity)
+
+    def _morton_codes(self, positions: np.ndarray) -> tuple:
+        # Quantize to a 2^levels grid over the bounding cube and interleave the bits
+        lo = positions.min(axis=0)
+        box = float(np.max(positions.max(axis=0) - lo)) or 1.0
+        box *= 1 + 1e-9
+        cells = 1 << self.levels
+        q = np.minimum(((positions - lo) / box * cells).astype(np.int64), cells - 1)
+        codes = np.zeros(len(positions), dtype=np.int64)
+        for bit in range(self.levels):
+            for k in range(self.ndim):
+                codes |= ((q[:, k] >> bit) & 1) << (bit * self.ndim + k)
+        return codes, q, lo, box
+
+    def build(self, positions: np.ndarray) -> None:
+        """
+        Rebuilds the tree for the given positions.
+
+        Parameters:
+        positions (np.ndarray): Body positions, shape (N, ndim).
+        """
+        n = self.n_bodies
+        codes, cells, lo, box = self._morton_codes(positions)
+        self._order = np.argsort(codes, kind='stable')
+        codes = codes[self._order]
+        cells = cells[self._order]
+        self._sorted_positions = positions[self._order]
+        sorted_masses = self.masses[self._order]
+
+        # Prefix sums give the mass and first moment of any contiguous range
+        mass_sum = np.concatenate([[0.0], np.cumsum(sorted_masses)])
+        moment_sum = np.concatenate([np.zeros((1, self.ndim)),
+                                     np.cumsum(sorted_masses[:, np.newaxis] * self._sorted_positions, axis=0)])
+
+        starts = np.array([0])
+        ends = np.array([n])
+        level = 0
+        self.n_nodes = 0
+        while len(starts):
+            first = self.n_nodes
+            count = len(starts)
+            if first + count > len(self._node_start):
+                self._grow(first + count)
+            nodes = slice(first, first + count)
+            self._node_start[nodes] = starts
+            self._node_end[nodes] = ends
+            mass = mass_sum[ends] - mass_sum[starts]
+            self._node_mass[nodes] = mass
+            safe = np.where(mass > 0, mass, 1.0)[:, np.newaxis]
+            com = (moment_sum[ends] - moment_sum[starts]) / safe
+            self._node_com[nodes] = com
+
+            # Squared opening distance (s / theta + delta)^2, infinite for theta = 0
+            size = box / (1 << level)
+            center = lo + ((cells[starts] >> (self.levels - level)) + 0.5) * size
+            delta = np.sqrt(np.einsum('ij,ij->i', com - center, com - center))
+            with np.errstate(divide='ignore'):
+                self._node_open2[nodes] = (size / self.theta + delta) ** 2 if self.theta > 0 else np.inf
+            self._node_n_children[nodes] = 0
+            self.n_nodes += count
+
+            # Split the crowded nodes where the next level's code prefix changes
+            split = (ends - starts > self.leaf_size) & (level < self.levels)
+            if not np.any(split):
+                break
+            prefix = codes >> (self.ndim * (self.levels - level - 1))
+            cover = np.zeros(n + 1, dtype=np.int64)
+            cover[starts[split]] += 1
+            cover[ends[split]] -= 1
+            member = np.cumsum(cover[:n]) > 0
+            change = np.ones(n, dtype=bool)
+            change[1:] = prefix[1:] != prefix[:-1]
+            child_starts = np.flatnonzero(member & change)
+            boundaries = np.union1d(child_starts, ends[split])
+            child_ends = boundaries[np.searchsorted(boundaries, child_starts, side='right')]
+
+            first_child = np.searchsorted(child_starts, starts[split])
+            last_child = np.searchsorted(child_starts, ends[split])
+            parents = first + np.flatnonzero(split)
+            self._node_first_child[parents] = first + count + first_child
+            self._node_n_children[parents] = last_child - first_child
+
+            starts, ends = child_starts, child_ends
+            level += 1
+
+    def _grow(self, needed: int) -> None:
+        # Keep the nodes built so far and at least double the capacity
+        old = (self._node_start, self._node_end, self._node_first_child, self._node_n_children,
+               self._node_mass, self._node_com, self._node_open2)
+        self._allocate_nodes(max(needed, 2 * len(self._node_start)))
+        new = (self._node_start, self._node_end, self._node_first_child, self._node_n_children,
+               self._node_mass, self._node_com, self._node_open2)
+        for src, dst in zip(old, new):
+            dst[:self.n_nodes] = src[:self.n_nodes]
+
+    def accelerations(self, positions: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        if positions.ndim != 2:
+            return super().accelerations(positions, out=out)
+        if out is None:
+            out = np.empty(positions.shape)
+
+        self.build(np.asarray(positions, dtype=float))
+        x = self._sorted_positions
+        n = self.n_bodies
+        softening2 = self.softening ** 2
+        acc = np.zeros((n, self.ndim))
+        # Gravitational potential at each body, -sum G m / r
+        phi = np.zeros(n)
+
+        def accumulate(body, gm, d, r2):
+            # acc[body] += G m d / r^3 and phi[body] -= G m / r, summed per body with bincount
+            weight = gm / (r2 * np.sqrt(r2))
+            for k in range(self.ndim):
+                acc[:, k] += np.bincount(body, weights=weight * d[:, k], minlength=n)
+            phi[:] -= np.bincount(body, weights=weight * r2, minlength=n)
+
+        # Frontier of (sorted body index, node) pairs, starting at the root
+        body = np.arange(n)
+        node = np.zeros(n, dtype=np.int64)
+        while len(body):
+            start = self._node_start[node]
+            end = self._node_end[node]
+            d = self._node_com[node] - x[body]
+            r2 = np.einsum('ij,ij->i', d, d)
+            contains = (start <= body) & (body < end)
+            far = ~contains & (self._node_open2[node] < r2)
+            accumulate(body[far], self.G * self._node_mass[node[far]], d[far], r2[far] + softening2)
+
+            near = ~far
+            leaf = near & (self._node_n_children[node] == 0)
+            opened = near & ~leaf
+
+            # Leaves: direct summation over their bodies, skipping self-interaction
+            if np.any(leaf):
+                pair_body, other = _expand(body[leaf], start[leaf], end[leaf] - start[leaf])
+                keep = pair_body != other
+                pair_body, other = pair_body[keep], other[keep]
+                d = x[other] - x[pair_body]
+                r2 = np.einsum('ij,ij->i', d, d) + softening2
+                accumulate(pair_body, self._gm[self._order[other]], d, r2)
+
+            # Opened nodes: continue with their children
+            body, node = _expand(body[opened], self._node_first_child[node[opened]],
+                                 self._node_n_children[node[opened]])
+
+        out[self._order] = acc
+        np.copyto(self._pass_x, positions)
+        # Every pair is seen from both bodies, so halve the sum
+        self._pass_potential = 0.5 * float(self.masses[self._order] @ phi)
+        return out
+
+    def potential_energy(self, positions: np.ndarray) -> np.ndarray:
+        if positions.ndim != 2:
+            return super().potential_energy(positions)
+        if self._pass_potential is None or not np.array_equal(positions, self._pass_x):
+            self.accelerations(positions)
+        return self._pass_potential
+
+
+def _expand(owners: np.ndarray, first: np.ndarray, counts: np.ndarray) -> tuple:
+    # Pairs (owner, first + k) for k in range(count), for every owner
+    repeated = np.repeat(owners, counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return repeated, np.repeat(first, counts) + offsets
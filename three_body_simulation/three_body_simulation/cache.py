@@ -0,0 +1,178 @@
+# three_body_simulation/cache.py
+
+import hashlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from three_body_simulation.integrators import integrate, IntegrationResult
+from three_body_simulation.presets import PRESETS, get_preset
+from three_body_simulation.sampling import thin_trajectory
+
+# Default on-disk location, overridable with THREE_BODY_CACHE_DIR
+DEFAULT_CACHE_DIR = Path(os.environ.get(
+    'THREE_BODY_CACHE_DIR', Path.home() / '.cache' / 'three_body_simulation'
+))
+
+
+class OrbitCache:
+    """
+    Trajectory cache for the preset solutions.
+
+    Trajectories are keyed by (preset, tolerance, sample count, integrator)
+    and kept in an in-memory LRU, backed by .npz files on disk so they also
+    survive restarts. The disk file name includes a hash of the preset's
+    initial conditions and masses, so editing a preset never serves a stale orbit.
+
+    With a sample_tolerance, trajectories are stored adaptively sampled (see
+    thin_trajectory), which shrinks them many-fold for Hermite playback.
+    """
+
+    def __init__(self, maxsize: int = 16, directory=DEFAULT_CACHE_DIR, backend: str = 'numpy',
+                 sample_tolerance: float = None):
+        """
+        Parameters:
+        maxsize (int): Number of trajectories kept in memory.
+        directory (str or Path): On-disk store, or None to keep the cache in memory only.
+        backend (str): Backend passed to integrate() on a cache miss.
+        sample_tolerance (float): Position error of adaptive sampling, or None to store
+            the uniform samples.
+        """
+        self.maxsize = maxsize
+        self.directory = Path(directory) if directory is not None else None
+        self.backend = backend
+        self.sample_tolerance = sample_tolerance
+        self._memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key) -> Path:
+        preset_id, tolerance, n_samples, integrator = key
+        preset = get_preset(preset_id)
+        initial_state, total_time = preset.initial_conditions()
+        physics = np.concatenate([initial_state, [total_time, preset.softening], preset.masses])
+        digest = hashlib.sha1(physics.tobytes()).hexdigest()[:12]
+        sampling = f"-a{self.sample_tolerance:g}" if self.sample_tolerance is not None else ''
+        return self.directory / f"{preset_id}-{integrator}-{n_samples}-{tolerance:g}{sampling}-{digest}.npz"
+
+    def get(self, preset_id: str, tolerance: float = 1e-10, n_samples: int = 10000,
+            integrator: str = 'RK45') -> IntegrationResult:
+        """
+        Returns the trajectory of a preset, computing and storing it on a miss.
+
+        Parameters:
+        preset_id (str): Registry id, e.g. 'figure_eight'.
+        tolerance (float): rtol and atol for adaptive integrators.
+        n_samples (int): Number of uniformly spaced samples.
+        integrator (str): Integration method passed to integrate().
+
+        Returns:
+        IntegrationResult: The cached or freshly computed trajectory.
+        """
+        key = (preset_id, tolerance, n_samples, integrator)
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+
+        path = self._path(key) if self.directory is not None else None
+        if path is not None and path.exists():
+            with np.load(path) as data:
+                result = IntegrationResult(data['t'], data['y'], integrator, int(data['nfev']))
+            self.hits += 1
+            self._remember(key, result)
+            return result
+
+        if self.sample_tolerance is not None:
+            # Adaptive methods then thin their accepted steps, which resolve close encounters
+            sampling = {'sampling': 'adaptive', 'sample_tolerance': self.sample_tolerance}
+        else:
+            sampling = {}
+        preset = get_preset(preset_id)
+        initial_state, total_time = preset.initial_conditions()
+        result = integrate(initial_state, total_time, n_samples=n_samples, method=integrator,
+                           rtol=tolerance, atol=tolerance, backend=self.backend, **preset.system, **sampling)
+        self.misses += 1
+        self._store(key, result)
+        return result
+
+    def lookup(self, preset_id: str, tolerance: float = 1e-10, n_samples: int = 10000,
+               integrator: str = 'RK45') -> IntegrationResult:
+        """
+        Returns a cached trajectory without ever integrating.
+
+        Parameters:
+        preset_id (str): Registry id, e.g. 'figure_eight'.
+        tolerance (float): rtol and atol for adaptive integrators.
+        n_samples (int): Number of uniformly spaced samples.
+        integrator (str): Integration method.
+
+        Returns:
+        IntegrationResult: The trajectory, or None on a miss.
+        """
+        key = (preset_id, tolerance, n_samples, integrator)
+        if key in self._memory:
+            return self.get(*key)
+        if self.directory is not None and self._path(key).exists():
+            return self.get(*key)
+        return None
+
+    def put(self, preset_id: str, tolerance: float, n_samples: int, integrator: str,
+            result: IntegrationResult) -> None:
+        """
+        Stores a trajectory computed elsewhere, e.g. by a background worker.
+
+        Parameters:
+        preset_id (str): Registry id.
+        tolerance (float): rtol and atol it was computed with.
+        n_samples (int): Number of samples.
+        integrator (str): Integration method.
+        result (IntegrationResult): The trajectory, thinned first if the cache has a sample_tolerance.
+        """
+        if self.sample_tolerance is not None:
+            t, y = thin_trajectory(result.t, result.y, self.sample_tolerance)
+            result = IntegrationResult(t, y, result.method, result.nfev)
+        self._store((preset_id, tolerance, n_samples, integrator), result)
+
+    def _store(self, key, result) -> None:
+        # Write to disk (if enabled) and insert into the LRU
+        if self.directory is not None:
+            path = self._path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so readers never see a partial file
+            tmp_path = path.with_suffix('.tmp.npz')
+            np.savez(tmp_path, t=result.t, y=result.y, nfev=result.nfev)
+            os.replace(tmp_path, path)
+        self._remember(key, result)
+
+    def _remember(self, key, result) -> None:
+        # Insert into the LRU, evicting the least recently used entry
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def __contains__(self, key) -> bool:
+        return key in self._memory
+
+    def prewarm(self, tolerance: float = 1e-10, n_samples: int = 10000, integrator: str = 'RK45',
+                preset_ids=None) -> None:
+        """
+        Computes (or loads) the trajectories of all registered presets.
+
+        Parameters:
+        tolerance (float): rtol and atol for adaptive integrators.
+        n_samples (int): Number of uniformly spaced samples.
+        integrator (str): Integration method.
+        preset_ids (iterable): Presets to warm, defaults to the whole registry.
+        """
+        for preset_id in (preset_ids if preset_ids is not None else PRESETS):
+            self.get(preset_id, tolerance, n_samples, integrator)
+
+    def clear(self) -> None:
+        """
+        Empties the in-memory LRU (the disk store is left untouched).
+        """
+        self._memory.clear()
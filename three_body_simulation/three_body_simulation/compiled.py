@@ -0,0 +1,197 @@
+# three_body_simulation/compiled.py
+# Optional Numba backend. Install numba to enable it, e.g. with the package's
+# 'numba' extra (pip install "three-body-simulation[numba]"); without it every
+# function here falls back to the NumPy GravityKernel.
+
+import threading
+from importlib.util import find_spec
+
+import numpy as np
+
+from three_body_simulation.barnes_hut import DEFAULT_THETA, BarnesHutKernel
+from three_body_simulation.kernel import GravityKernel
+
+# Importing numba takes most of a second, so only look it up here; the loops
+# below are compiled by _compile() when the numba backend is first used
+NUMBA_AVAILABLE = find_spec('numba') is not None
+
+# Guards _compile(), which may first run in an integration worker thread
+_compile_lock = threading.Lock()
+_compiled = False
+
+BACKENDS = ('numpy', 'numba')
+
+# Force evaluation engines: exact pairwise summation or the Barnes-Hut tree code
+FORCES = ('direct', 'barnes_hut')
+
+
+def resolve_backend(backend: str) -> str:
+    """
+    Returns the backend that will actually run.
+
+    Parameters:
+    backend (str): Requested backend, 'numpy' or 'numba'.
+
+    Returns:
+    str: 'numba' if it was requested and is installed, otherwise 'numpy'.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+    if backend == 'numba' and not NUMBA_AVAILABLE:
+        return 'numpy'
+    return backend
+
+
+def _accelerations(x, gm, m, softening2, out):
+    # Direct pairwise summation, visiting every pair once; returns the potential energy
+    n, ndim = x.shape
+    out[:] = 0.0
+    potential = 0.0
+    for i in range(n):
+        for j in range(i + 1, n):
+            r2 = softening2
+            for k in range(ndim):
+                d = x[j, k] - x[i, k]
+                r2 += d * d
+            inv_r3 = 1.0 / (r2 * np.sqrt(r2))
+            potential -= gm[j] * m[i] * r2 * inv_r3
+            for k in range(ndim):
+                d = (x[j, k] - x[i, k]) * inv_r3
+                out[i, k] += gm[j] * d
+                out[j, k] -= gm[i] * d
+    return potential
+
+
+def _derivatives(state, n_bodies, ndim, gm, m, softening2):
+    half = n_bodies * ndim
+    out = np.empty(state.shape[0])
+    out[:half] = state[half:]
+    acc = np.empty((n_bodies, ndim))
+    potential = _accelerations(state[:half].copy().reshape((n_bodies, ndim)), gm, m, softening2, acc)
+    out[half:] = acc.ravel()
+    return out, potential
+
+
+def _symplectic_loop(x, v, gm, m, softening2, weights, h, steps_per_sample, out):
+    # Kick-drift-kick substeps, storing positions and velocities after every sample
+    n, ndim = x.shape
+    half = n * ndim
+    a = np.empty((n, ndim))
+    _accelerations(x, gm, m, softening2, a)
+    for sample in range(1, out.shape[1]):
+        for _ in range(steps_per_sample):
+            for w in weights:
+                v += 0.5 * w * h * a
+                x += w * h * v
+                _accelerations(x, gm, m, softening2, a)
+                v += 0.5 * w * h * a
+        for i in range(n):
+            for k in range(ndim):
+                out[i * ndim + k, sample] = x[i, k]
+                out[half + i * ndim + k, sample] = v[i, k]
+
+
+def _compile() -> None:
+    # Replaces the loops above with their compiled versions, importing numba on first use.
+    # nogil lets the loops run in a worker thread while the render loop keeps the GIL.
+    global _compiled, _accelerations, _derivatives, _symplectic_loop
+    with _compile_lock:
+        if _compiled:
+            return
+        from numba import njit
+        _accelerations = njit(cache=True, nogil=True)(_accelerations)
+        _derivatives = njit(cache=True)(_derivatives)
+        _symplectic_loop = njit(cache=True, nogil=True)(_symplectic_loop)
+        _compiled = True
+
+
+class CompiledKernel(GravityKernel):
+    """
+    GravityKernel whose single-system evaluation runs as compiled Numba code.
+
+    The compiled force pass also sums the potential energy, which
+    potential_energy() returns for the same positions without recomputing it.
+    Batched calls (leading dimensions) use the NumPy implementation.
+    """
+
+    def __init__(self, masses, ndim: int = 2, G: float = 1.0, softening: float = 0.0):
+        super().__init__(masses, ndim=ndim, G=G, softening=softening)
+        _compile()
+        # Positions of the last single-system force pass and their potential energy
+        self._pass_x = np.empty((self.n_bodies, ndim))
+        self._pass_potential = None
+
+    def accelerations(self, positions: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        if positions.ndim != 2:
+            return super().accelerations(positions, out=out)
+        if out is None:
+            out = np.empty(positions.shape)
+        np.copyto(self._pass_x, positions)
+        self._pass_potential = _accelerations(self._pass_x, self._gm, self.masses, self.softening ** 2, out)
+        return out
+
+    def potential_energy(self, positions: np.ndarray) -> np.ndarray:
+        if positions.ndim != 2:
+            return super().potential_energy(positions)
+        if self._pass_potential is None or not np.array_equal(positions, self._pass_x):
+            self.accelerations(positions)
+        return self._pass_potential
+
+    def derivatives(self, t: float, state: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        if state.ndim != 1 or out is not None:
+            return super().derivatives(t, state, out=out)
+        state = np.asarray(state, dtype=float)
+        out, self._pass_potential = _derivatives(state, self.n_bodies, self.ndim, self._gm, self.masses,
+                                                 self.softening ** 2)
+        self._pass_x.flat = state[:self.n_bodies * self.ndim]
+        return out
+
+    __call__ = derivatives
+
+
+def make_kernel(masses, ndim: int = 2, G: float = 1.0, softening: float = 0.0,
+                backend: str = 'numpy', force: str = 'direct', theta: float = DEFAULT_THETA) -> GravityKernel:
+    """
+    Builds the force kernel for the requested backend.
+
+    Parameters:
+    masses (array_like): Mass of each body.
+    ndim (int): Number of spatial dimensions.
+    G (float): Gravitational constant.
+    softening (float): Plummer softening length.
+    backend (str): 'numpy' or 'numba' (falls back to 'numpy' if numba is not installed).
+    force (str): 'direct' summation or the 'barnes_hut' tree code (NumPy only).
+    theta (float): Barnes-Hut opening angle.
+
+    Returns:
+    GravityKernel: The kernel, callable as fun(t, state).
+    """
+    if force not in FORCES:
+        raise ValueError(f"Unknown force '{force}', expected one of {FORCES}")
+    if force == 'barnes_hut':
+        return BarnesHutKernel(masses, ndim=ndim, G=G, softening=softening, theta=theta)
+    if resolve_backend(backend) == 'numba':
+        return CompiledKernel(masses, ndim=ndim, G=G, softening=softening)
+    return GravityKernel(masses, ndim=ndim, G=G, softening=softening)
+
+
+def run_symplectic_loop(kernel: GravityKernel, state: np.ndarray, weights, h: float,
+                        steps_per_sample: int, out: np.ndarray) -> None:
+    """
+    Runs the compiled fixed-step loop, filling out[:, 1:] from the state in out[:, 0].
+
+    Parameters:
+    kernel (GravityKernel): Supplies masses, dimensions and softening.
+    state (np.ndarray): Flat initial state.
+    weights (tuple): Substep weights of the symplectic composition.
+    h (float): Step size.
+    steps_per_sample (int): Steps between consecutive samples.
+    out (np.ndarray): Trajectory array of shape (S, n_samples).
+    """
+    _compile()
+    half = kernel.n_bodies * kernel.ndim
+    shape = (kernel.n_bodies, kernel.ndim)
+    x = state[:half].reshape(shape).copy()
+    v = state[half:].reshape(shape).copy()
+    _symplectic_loop(x, v, kernel._gm, kernel.masses, kernel.softening ** 2,
+                     np.asarray(weights, dtype=float), h, steps_per_sample, out)
@@ -0,0 +1,237 @@
+# three_body_simulation/ensemble.py
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from three_body_simulation.kernel import GravityKernel
+
+# Member status codes (same meaning as solve_ivp's status)
+RUNNING = 2
+TERMINATED = 1
+SUCCESS = 0
+FAILED = -1
+
+# Dormand-Prince 5(4) tableau, as used by scipy's RK45
+_C = np.array([0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1])
+_A = [
+    np.array([]),
+    np.array([1 / 5]),
+    np.array([3 / 40, 9 / 40]),
+    np.array([44 / 45, -56 / 15, 32 / 9]),
+    np.array([19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729]),
+    np.array([9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656]),
+]
+_B = np.array([35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84])
+_E = np.array([-71 / 57600, 0, 71 / 16695, -71 / 1920, 17253 / 339200, -22 / 525, 1 / 40])
+# Dense output: y(t0 + theta h) = y0 + h sum_s k_s (P_s . [theta, theta^2, theta^3, theta^4]),
+# the fourth-order continuous extension of the same stages (Shampine 1986, as in scipy's RK45)
+_P = np.array([
+    [1, -8048581381 / 2820520608, 8663915743 / 2820520608, -12715105075 / 11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200 / 32700410799, -68118460800 / 10900136933, 87487479700 / 32700410799],
+    [0, -1754552775 / 470086768, 14199869525 / 1410260304, -10690763975 / 1880347072],
+    [0, 127303824393 / 49829197408, -318862633887 / 49829197408, 701980252875 / 199316789632],
+    [0, -282668133 / 205662961, 2019193451 / 616988883, -1453857185 / 822651844],
+    [0, 40617522 / 29380423, -110615467 / 29380423, 69997945 / 29380423],
+])
+
+# Step size controller settings
+_SAFETY = 0.9
+_MIN_FACTOR = 0.2
+_MAX_FACTOR = 10.0
+
+
+@dataclass
+class EnsembleResult:
+    """
+    Output of integrate_ensemble.
+
+    t: Shared output times, shape (T,).
+    y: Sampled states, shape (B, T, S). Samples after a member stopped are NaN.
+    t_final: Time each member stopped at, shape (B,).
+    y_final: State of each member when it stopped, shape (B, S).
+    status: SUCCESS, TERMINATED or FAILED for each member, shape (B,).
+    n_steps: Accepted steps per member, shape (B,).
+    nfev: Total number of (batched) right-hand side evaluations.
+    """
+    t: np.ndarray
+    y: np.ndarray
+    t_final: np.ndarray
+    y_final: np.ndarray
+    status: np.ndarray
+    n_steps: np.ndarray
+    nfev: int
+
+
+def _rms_norm(x: np.ndarray) -> np.ndarray:
+    # Root mean square over the state axis
+    return np.sqrt(np.mean(x * x, axis=-1))
+
+
+def _initial_step(rhs, t0, y0, f0, rtol, atol):
+    """
+    Per-member initial step size (Hairer, Norsett & Wanner, II.4).
+    """
+    scale = atol + np.abs(y0) * rtol
+    d0 = _rms_norm(y0 / scale)
+    d1 = _rms_norm(f0 / scale)
+    h0 = np.where((d0 < 1e-5) | (d1 < 1e-5), 1e-6, 0.01 * d0 / np.maximum(d1, 1e-300))
+
+    f1 = rhs(t0 + h0, y0 + h0[:, np.newaxis] * f0)
+    d2 = _rms_norm((f1 - f0) / scale) / h0
+    h1 = np.where(
+        (d1 <= 1e-15) & (d2 <= 1e-15),
+        np.maximum(1e-6, h0 * 1e-3),
+        (0.01 / np.maximum(np.maximum(d1, d2), 1e-300)) ** (1 / 5),
+    )
+    return np.minimum(100 * h0, h1)
+
+
+def integrate_ensemble(initial_states, total_time: float, t_eval=None, rhs=None,
+                       masses=(1.0, 1.0, 1.0), ndim: int = 2, G: float = 1.0,
+                       rtol: float = 1e-10, atol: float = 1e-10,
+                       terminate=None, max_steps: int = 1_000_000) -> EnsembleResult:
+    """
+    Integrates a batch of initial states at once with an adaptive Dormand-Prince 5(4) scheme.
+
+    Every member keeps its own time, step size and error control, and all
+    members advance together as one stacked (B, S) state. Members that finish,
+    fail or are terminated drop out of the stacked state, so a stiff or
+    diverging trajectory only costs its own steps.
+
+    Parameters:
+    initial_states (array_like): Initial states, shape (B, S), e.g. (B, 12) for three bodies in 2D.
+    total_time (float): Integration end time (all members start at t = 0).
+    t_eval (array_like): Shared output times in [0, total_time]. Defaults to [0, total_time].
+    rhs (callable): Batched right-hand side rhs(t, y) for t of shape (b,) and y of shape (b, S).
+        Defaults to the gravitational kernel for masses/ndim/G.
+    masses (array_like): Body masses, used when rhs is not given.
+    ndim (int): Number of spatial dimensions, used when rhs is not given.
+    G (float): Gravitational constant, used when rhs is not given.
+    rtol (float): Relative tolerance.
+    atol (float): Absolute tolerance.
+    terminate (callable): Optional terminate(t, y) -> bool array evaluated after each
+        accepted step on the active members; members flagged True stop with status TERMINATED.
+    max_steps (int): Maximum number of accepted steps per member before it is marked FAILED.
+
+    Returns:
+    EnsembleResult: Sampled trajectories and per-member status.
+    """
+    if total_time < 0:
+        raise ValueError(f"total_time must be non-negative, got {total_time}")
+
+    y0 = np.array(initial_states, dtype=float, ndmin=2)
+    n_members, size = y0.shape
+    if rhs is None:
+        rhs = GravityKernel(masses, ndim=ndim, G=G)
+        if size != rhs.state_size:
+            raise ValueError(
+                f"initial_states have {size} components, but {len(rhs.masses)} bodies "
+                f"in {ndim}D need {rhs.state_size}"
+            )
+
+    if t_eval is None:
+        t_eval = np.array([0.0, total_time])
+    t_eval = np.asarray(t_eval, dtype=float)
+    if np.any(np.diff(t_eval) < 0):
+        raise ValueError("t_eval must be sorted in increasing order")
+    if len(t_eval) and (t_eval[0] < 0 or t_eval[-1] > total_time):
+        raise ValueError("t_eval must lie within [0, total_time]")
+
+    # Per-member integration state
+    t = np.zeros(n_members)
+    y = y0.copy()
+    f = rhs(t, y)
+    h = _initial_step(rhs, t, y, f, rtol, atol)
+    status = np.full(n_members, RUNNING)
+    n_steps = np.zeros(n_members, dtype=int)
+    nfev = 2
+
+    # Output samples, with the next output index for each member
+    samples = np.full((n_members, len(t_eval), size), np.nan)
+    at_start = t_eval <= 0.0
+    samples[:, at_start] = y0[:, np.newaxis, :]
+    next_out = np.full(n_members, np.count_nonzero(at_start))
+
+    stages = np.empty((7, n_members, size))
+    min_step = 10 * np.finfo(float).eps
+
+    while True:
+        active = np.flatnonzero(status == RUNNING)
+        if len(active) == 0:
+            break
+        b = len(active)
+        ta, ya, fa = t[active], y[active], f[active]
+        ha = np.minimum(h[active], total_time - ta)
+        hc = ha[:, np.newaxis]
+
+        # Runge-Kutta stages on the stacked active state
+        k = stages[:, :b]
+        k[0] = fa
+        for s in range(1, 6):
+            dy = np.tensordot(_A[s], k[:s], axes=(0, 0))
+            k[s] = rhs(ta + _C[s] * ha, ya + hc * dy)
+        y_new = ya + hc * np.tensordot(_B, k[:6], axes=(0, 0))
+        k[6] = f_new = rhs(ta + ha, y_new)
+        nfev += 6
+
+        # Per-member error estimate
+        scale = atol + np.maximum(np.abs(ya), np.abs(y_new)) * rtol
+        err = _rms_norm(hc * np.tensordot(_E, k, axes=(0, 0)) / scale)
+        finite = np.isfinite(err) & np.all(np.isfinite(y_new), axis=1)
+        accepted = finite & (err <= 1.0)
+
+        # Step size update (rejected steps never grow)
+        with np.errstate(divide='ignore'):
+            factor = np.clip(_SAFETY * err ** (-1 / 5), _MIN_FACTOR, _MAX_FACTOR)
+        factor = np.where(accepted, factor, np.minimum(factor, 1.0))
+        factor[~finite] = _MIN_FACTOR
+        h[active] = ha * factor
+
+        # Members whose step size collapsed (or became NaN) have failed
+        too_small = ~accepted & ~(h[active] >= min_step * np.maximum(np.abs(ta), 1.0))
+        status[active[too_small]] = FAILED
+
+        if np.any(accepted):
+            acc = active[accepted]
+            t0, y_old = ta[accepted], ya[accepted]
+            step = ha[accepted]
+            t1 = np.where(step >= total_time - t0, total_time, t0 + step)
+            y1, f1 = y_new[accepted], f_new[accepted]
+            dense = None
+
+            # Fill output samples crossed by this step from the Dormand-Prince dense output
+            while True:
+                k_out = next_out[acc]
+                valid = k_out < len(t_eval)
+                crossed = np.zeros(len(acc), dtype=bool)
+                crossed[valid] = t_eval[k_out[valid]] <= t1[valid]
+                if not np.any(crossed):
+                    break
+                if dense is None:
+                    # Polynomial coefficients of every accepted member, shape (4, n, S)
+                    dense = np.tensordot(_P, k[:, accepted], axes=(0, 0))
+                i = np.flatnonzero(crossed)
+                theta = (t_eval[k_out[i]] - t0[i]) / step[i]
+                powers = theta[:, np.newaxis] ** np.arange(1, 5)
+                samples[acc[i], k_out[i]] = y_old[i] + step[i][:, np.newaxis] * np.einsum(
+                    'ij,jis->is', powers, dense[:, i])
+                next_out[acc[i]] += 1
+
+            t[acc], y[acc], f[acc] = t1, y1, f1
+            n_steps[acc] += 1
+
+            # Member-level completion, termination and step limits
+            done = t1 >= total_time
+            status[acc[done]] = SUCCESS
+            if terminate is not None:
+                running = np.flatnonzero(~done)
+                if len(running):
+                    stop = np.asarray(terminate(t1[running], y1[running]), dtype=bool)
+                    status[acc[running[stop]]] = TERMINATED
+            exhausted = (status[acc] == RUNNING) & (n_steps[acc] >= max_steps)
+            status[acc[exhausted]] = FAILED
+
+    return EnsembleResult(t_eval, samples, t, y, status, n_steps, nfev)
+
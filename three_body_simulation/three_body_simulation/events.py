@@ -0,0 +1,171 @@
+# three_body_simulation/events.py
+#
+# Event functions for integrate(): close approaches, escapes and returns to
+# the initial configuration.
+#
+# Events follow solve_ivp's convention: a callable g(t, y) with attributes
+# terminal and direction, where an event occurs when g crosses zero in the
+# given direction. They are plain dataclasses rather than closures so they
+# can be pickled to process-pool workers (see sweep.py). The fixed-step
+# symplectic integrators locate events with EventTracker.
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from three_body_simulation.state import split_state
+
+
+@dataclass
+class CloseApproach:
+    """
+    Fires when the smallest distance between two bodies drops below a threshold.
+
+    distance: Threshold distance.
+    n_bodies: Number of bodies.
+    ndim: Number of spatial dimensions.
+    terminal: Stop the integration at the event.
+    """
+    distance: float
+    n_bodies: int = 3
+    ndim: int = 2
+    terminal: bool = True
+    direction: float = field(default=-1, init=False)
+
+    def __post_init__(self):
+        # Index pairs (i < j) of the pairwise distances
+        self._pairs = np.triu_indices(self.n_bodies, k=1)
+
+    def __call__(self, t: float, y: np.ndarray) -> float:
+        positions, _ = split_state(y, self.n_bodies, self.ndim)
+        i, j = self._pairs
+        dx = positions[j] - positions[i]
+        return float(np.sqrt(np.min(np.einsum('ij,ij->i', dx, dx)))) - self.distance
+
+
+@dataclass
+class Escape:
+    """
+    Fires when a body escapes from the rest of the system.
+
+    A body has escaped when it is farther than distance from the center of
+    mass of the other bodies and, with unbound=True, its two-body energy
+    relative to them is positive. The event function is the largest over the
+    bodies of min(separation - distance, energy), which is positive exactly
+    when some body has escaped.
+
+    distance: Smallest escape distance.
+    masses: Mass of each body.
+    ndim: Number of spatial dimensions.
+    G: Gravitational constant.
+    unbound: Also require a positive two-body energy.
+    terminal: Stop the integration at the event.
+    """
+    distance: float
+    masses: tuple = (1.0, 1.0, 1.0)
+    ndim: int = 2
+    G: float = 1.0
+    unbound: bool = True
+    terminal: bool = True
+    direction: float = field(default=1, init=False)
+
+    def __post_init__(self):
+        self._masses = np.asarray(self.masses, dtype=float)
+        self._total = self._masses.sum()
+
+    def __call__(self, t: float, y: np.ndarray) -> float:
+        m = self._masses[:, np.newaxis]
+        positions, velocities = split_state(y, len(self._masses), self.ndim)
+        # Position and velocity of each body relative to the center of mass of the others
+        rest = self._total - m
+        dx = positions - (self._masses @ positions - m * positions) / rest
+        dv = velocities - (self._masses @ velocities - m * velocities) / rest
+        separation = np.sqrt(np.einsum('ij,ij->i', dx, dx))
+        g = separation - self.distance
+        if self.unbound:
+            # A body at the others' center of mass (e.g. Euler's middle body) is deeply bound
+            with np.errstate(divide='ignore'):
+                energy = 0.5 * np.einsum('ij,ij->i', dv, dv) - self.G * self._total / separation
+            g = np.minimum(g, energy)
+        return float(np.max(g))
+
+
+@dataclass
+class ReturnToStart:
+    """
+    Fires when the state comes back within radius of the initial state.
+
+    The distance is measured in the full state space (positions and
+    velocities), so it only fires near a genuine recurrence of the orbit.
+
+    initial_state: Flat initial state.
+    radius: Return radius.
+    terminal: Stop the integration at the event.
+    """
+    initial_state: np.ndarray
+    radius: float
+    terminal: bool = False
+    direction: float = field(default=-1, init=False)
+
+    def __post_init__(self):
+        self.initial_state = np.array(self.initial_state, dtype=float)
+
+    def __call__(self, t: float, y: np.ndarray) -> float:
+        return float(np.linalg.norm(y - self.initial_state)) - self.radius
+
+
+class EventTracker:
+    """
+    Locates events along a trajectory advanced in discrete steps.
+
+    step() is called with every new state. When an event function changes
+    sign in its direction, the event time is found by linear interpolation
+    of the function between the two states, which matches solve_ivp's root
+    finding to the accuracy of the step.
+    """
+
+    def __init__(self, events, t0: float, y0: np.ndarray):
+        """
+        Parameters:
+        events (iterable): Event functions with terminal and direction attributes.
+        t0 (float): Initial time.
+        y0 (np.ndarray): Initial flat state.
+        """
+        self.events = list(events)
+        self.t_events = [[] for _ in self.events]
+        self.y_events = [[] for _ in self.events]
+        self._t = t0
+        self._y = np.array(y0, dtype=float)
+        self._g = [event(t0, self._y) for event in self.events]
+
+    def step(self, t: float, y: np.ndarray) -> bool:
+        """
+        Records the events between the previous state and this one.
+
+        Returns:
+        bool: True if a terminal event occurred.
+        """
+        terminal = False
+        for k, event in enumerate(self.events):
+            g0, g1 = self._g[k], event(t, y)
+            self._g[k] = g1
+            up = g0 <= 0 <= g1 and g0 != g1
+            down = g0 >= 0 >= g1 and g0 != g1
+            direction = getattr(event, 'direction', 0)
+            if (up and direction >= 0) or (down and direction <= 0):
+                fraction = g0 / (g0 - g1)
+                self.t_events[k].append(self._t + fraction * (t - self._t))
+                self.y_events[k].append(self._y + fraction * (y - self._y))
+                terminal |= bool(getattr(event, 'terminal', False))
+        self._t = t
+        self._y[:] = y
+        return terminal
+
+    def results(self) -> tuple:
+        """
+        Returns (t_events, y_events) in solve_ivp's layout: per event, times of shape (k,) and states of shape (k, S).
+        """
+        size = len(self._y)
+        t_events = [np.array(times) for times in self.t_events]
+        y_events = [np.array(states).reshape(-1, size) for states in self.y_events]
+        return t_events, y_events
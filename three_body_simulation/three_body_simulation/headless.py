@@ -0,0 +1,191 @@
+# three_body_simulation/headless.py
+# Offscreen rendering of orbits to frame sequences or raw video.
+#
+# Frames are drawn into plain pygame Surfaces, so no window, display driver or
+# event loop is needed and rendering runs as fast as the CPU allows. Example:
+#
+#   python -m three_body_simulation.headless --preset butterfly --fps 30 \
+#       --size 640x640 --raw - | ffmpeg -f rawvideo -pix_fmt rgb24 -s 640x640 -r 30 -i - out.mp4
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Keep stdout clean for raw video output
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+import pygame
+
+from three_body_simulation.integrators import integrate
+from three_body_simulation.playback import HermiteTrajectory
+from three_body_simulation.presets import PRESETS
+from three_body_simulation.rendering import (
+    TrailRenderer, body_colors, body_radius, fit_scale, project, screen_coordinates,
+)
+
+# Same look as the interactive animation
+BACKGROUND = (0, 0, 0)
+
+
+def frame_positions(t, y, fps: float = 60.0, speed: float = 1.0, n_frames: int = None,
+                    ndim: int = 2) -> np.ndarray:
+    """
+    Samples the positions at the video frame times.
+
+    Frame k shows simulation time t[0] + k * speed / fps, Hermite interpolated
+    between the stored samples; the animation loops once the trajectory ends.
+
+    Parameters:
+    t (array_like): Sample times, shape (k,).
+    y (np.ndarray): Flat states (positions followed by velocities), shape (S, k).
+    fps (float): Video frame rate.
+    speed (float): Simulation time units per second of video.
+    n_frames (int): Number of frames, defaults to one pass over the trajectory.
+    ndim (int): Number of spatial dimensions; 3D systems are viewed along z.
+
+    Returns:
+    np.ndarray: Plane positions of shape (n_frames, n_bodies, 2).
+    """
+    t = np.asarray(t, dtype=float)
+    if fps <= 0 or speed <= 0:
+        raise ValueError("fps and speed must be positive")
+    duration = t[-1] - t[0]
+    if n_frames is None:
+        n_frames = int(duration * fps / speed) + 1
+    frame_times = np.arange(n_frames) * (speed / fps)
+    if duration > 0:
+        frame_times = np.mod(frame_times, duration)
+    frame_times += t[0]
+
+    sampled = HermiteTrajectory(t, y).positions(frame_times)
+    return project(sampled, ndim).transpose(2, 0, 1)
+
+
+def render_frames(t, y, size=(800, 800), fps: float = 60.0, speed: float = 1.0,
+                  n_frames: int = None, trail_length: int = 100, ndim: int = 2, colors=None):
+    """
+    Renders an orbit offscreen, one frame at a time.
+
+    Parameters:
+    t (array_like): Sample times, shape (k,).
+    y (np.ndarray): Flat states (positions followed by velocities), shape (S, k).
+    size (tuple): (width, height) of the frames in pixels.
+    fps (float): Video frame rate.
+    speed (float): Simulation time units per second of video.
+    n_frames (int): Number of frames, defaults to one pass over the trajectory.
+    trail_length (int): Number of frames a trail dot stays visible.
+    ndim (int): Number of spatial dimensions; 3D systems are viewed along z.
+    colors (list): RGB color of each body, defaults to body_colors().
+
+    Yields:
+    np.ndarray: RGB frames of shape (height, width, 3), dtype uint8.
+    """
+    width, height = size
+    frames = frame_positions(t, y, fps=fps, speed=speed, n_frames=n_frames, ndim=ndim)
+    scale = fit_scale(project(y[:y.shape[0] // 2], ndim), size)
+    n_bodies = frames.shape[1]
+    colors = body_colors(n_bodies) if colors is None else colors
+    radius = body_radius(n_bodies)
+
+    # Screen coordinates of every body in every frame, computed in one pass
+    pixels = screen_coordinates(frames, size, scale)
+
+    screen = pygame.Surface(size)
+    trails = TrailRenderer(size, trail_length=trail_length, radius=max(1, radius // 2))
+    for points in pixels.tolist():
+        screen.fill(BACKGROUND)
+        for point, color in zip(points, colors):
+            pygame.draw.circle(screen, color, point, radius)
+        trails.update(points, colors)
+        trails.draw(screen)
+        yield np.frombuffer(pygame.image.tobytes(screen, 'RGB'), dtype=np.uint8).reshape(height, width, 3)
+
+
+def write_frame_sequence(frames, directory, pattern: str = 'frame_{:05d}.png') -> int:
+    """
+    Saves frames as numbered image files.
+
+    Parameters:
+    frames (iterable): RGB frames from render_frames().
+    directory (str or Path): Output directory, created if needed.
+    pattern (str): File name pattern; the extension selects the image format.
+
+    Returns:
+    int: Number of frames written.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    count = 0
+    for count, frame in enumerate(frames, start=1):
+        surface = pygame.image.frombuffer(frame.tobytes(), (frame.shape[1], frame.shape[0]), 'RGB')
+        pygame.image.save(surface, str(directory / pattern.format(count - 1)))
+    return count
+
+
+def write_raw_video(frames, stream) -> int:
+    """
+    Writes frames as a raw rgb24 video stream (e.g. for ffmpeg -f rawvideo).
+
+    Parameters:
+    frames (iterable): RGB frames from render_frames().
+    stream (file): Binary file object.
+
+    Returns:
+    int: Number of frames written.
+    """
+    count = 0
+    for frame in frames:
+        stream.write(frame.tobytes())
+        count += 1
+    stream.flush()
+    return count
+
+
+def parse_size(text: str) -> tuple:
+    """
+    Parses a WIDTHxHEIGHT resolution.
+    """
+    try:
+        width, height = (int(part) for part in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected WIDTHxHEIGHT, got '{text}'")
+    return width, height
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Render a preset orbit without a display.")
+    parser.add_argument('--preset', default='figure_eight', choices=sorted(PRESETS))
+    parser.add_argument('--integrator', default='RK45')
+    parser.add_argument('--samples', type=int, default=10000, help="trajectory samples to integrate")
+    parser.add_argument('--fps', type=float, default=60.0)
+    parser.add_argument('--size', type=parse_size, default=(800, 800), help="WIDTHxHEIGHT")
+    parser.add_argument('--speed', type=float, default=1.0, help="simulation time per second of video")
+    parser.add_argument('--frames', type=int, default=None, help="defaults to one pass over the orbit")
+    parser.add_argument('--trail-length', type=int, default=100)
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument('--output', help="directory for a PNG frame sequence")
+    output.add_argument('--raw', help="raw rgb24 video file, or '-' for stdout")
+    args = parser.parse_args(argv)
+
+    preset = PRESETS[args.preset]
+    initial_state, total_time = preset.initial_conditions()
+    solution = integrate(initial_state, total_time, n_samples=args.samples, method=args.integrator,
+                         **preset.system)
+    frames = render_frames(solution.t, solution.y, size=args.size, fps=args.fps, speed=args.speed,
+                           n_frames=args.frames, trail_length=args.trail_length, ndim=preset.ndim)
+
+    if args.output is not None:
+        count = write_frame_sequence(frames, args.output)
+    elif args.raw == '-':
+        count = write_raw_video(frames, sys.stdout.buffer)
+    else:
+        with open(args.raw, 'wb') as stream:
+            count = write_raw_video(frames, stream)
+    print(f"Rendered {count} frames at {args.size[0]}x{args.size[1]}, {args.fps:g} fps", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
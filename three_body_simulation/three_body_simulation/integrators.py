@@ -0,0 +1,336 @@
+# three_body_simulation/integrators.py
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+# scipy.integrate and the compiled backend are imported where they are used,
+# so importing this module (e.g. for the viewer) stays cheap
+from three_body_simulation.barnes_hut import DEFAULT_THETA, BarnesHutKernel
+from three_body_simulation.events import EventTracker
+from three_body_simulation.kernel import GravityKernel
+from three_body_simulation.playback import HermiteTrajectory
+from three_body_simulation.sampling import DEFAULT_SAMPLE_TOLERANCE, thin_trajectory
+
+# Substep weights of symplectic compositions of the velocity-Verlet (kick-drift-kick) step
+_CBRT2 = 2 ** (1 / 3)
+_Y4_W1 = 1 / (2 - _CBRT2)
+_Y4_W0 = -_CBRT2 / (2 - _CBRT2)
+
+# Yoshida (1990) sixth-order "solution A"
+_Y6_W1 = -1.17767998417887
+_Y6_W2 = 0.235573213359357
+_Y6_W3 = 0.784513610477560
+_Y6_W0 = 1 - 2 * (_Y6_W1 + _Y6_W2 + _Y6_W3)
+
+SYMPLECTIC_METHODS = {
+    'leapfrog': (1.0,),
+    'yoshida4': (_Y4_W1, _Y4_W0, _Y4_W1),
+    'yoshida6': (_Y6_W3, _Y6_W2, _Y6_W1, _Y6_W0, _Y6_W1, _Y6_W2, _Y6_W3),
+}
+
+# Algorithmically regularized (logH) versions of the same compositions
+REGULARIZED_METHODS = {
+    'logh': SYMPLECTIC_METHODS['leapfrog'],
+    'logh4': SYMPLECTIC_METHODS['yoshida4'],
+    'logh6': SYMPLECTIC_METHODS['yoshida6'],
+}
+
+# Adaptive methods handled by scipy's solve_ivp
+ADAPTIVE_METHODS = ('RK45', 'RK23', 'DOP853', 'Radau', 'BDF', 'LSODA')
+
+# Default fixed step for the symplectic methods
+DEFAULT_DT = 1e-3
+
+
+@dataclass
+class IntegrationResult:
+    """
+    Trajectory in the same layout as solve_ivp's result.
+
+    t: Sample times, shape (T,).
+    y: States at the sample times, shape (S, T).
+    method: Name of the integrator that produced the trajectory.
+    nfev: Number of right-hand side (force) evaluations.
+    t_events: Per event function, the times it fired (None without events).
+    y_events: Per event function, the states at those times, shape (k, S).
+    """
+    t: np.ndarray
+    y: np.ndarray
+    method: str
+    nfev: int
+    t_events: list = None
+    y_events: list = None
+
+
+def integrate_symplectic(initial_state, total_time: float, n_samples: int, method: str = 'leapfrog',
+                         dt: float = DEFAULT_DT, kernel: GravityKernel = None,
+                         out: np.ndarray = None, backend: str = 'numpy', events=None) -> IntegrationResult:
+    """
+    Integrates with a fixed-step symplectic scheme, writing samples into a preallocated array.
+
+    The step is shrunk slightly so that a whole number of steps falls between
+    consecutive samples, which keeps the samples on a uniform grid. Events
+    are checked after every step; a terminal event ends the trajectory at
+    the last sample before it, as solve_ivp does with t_eval.
+
+    Parameters:
+    initial_state (array_like): Flat state (positions followed by velocities).
+    total_time (float): Integration end time.
+    n_samples (int): Number of uniformly spaced samples, including t = 0 and t = total_time.
+    method (str): One of SYMPLECTIC_METHODS ('leapfrog', 'yoshida4', 'yoshida6').
+    dt (float): Largest allowed step size.
+    kernel (GravityKernel): Force kernel. Defaults to three unit masses in 2D.
+    out (np.ndarray): Optional trajectory array of shape (S, n_samples) to write into.
+    backend (str): 'numpy', or 'numba' to run the whole loop as compiled code
+        (falls back to 'numpy' if numba is not installed, or when events are given).
+    events (iterable): Event functions (see events.py).
+
+    Returns:
+    IntegrationResult: The sampled trajectory.
+    """
+    if method not in SYMPLECTIC_METHODS:
+        raise ValueError(f"Unknown symplectic method '{method}'")
+    if n_samples < 2:
+        raise ValueError("n_samples must be at least 2")
+    weights = SYMPLECTIC_METHODS[method]
+
+    if kernel is None:
+        kernel = GravityKernel([1.0, 1.0, 1.0])
+    shape = (kernel.n_bodies, kernel.ndim)
+    half = kernel.n_bodies * kernel.ndim
+
+    state = np.array(initial_state, dtype=float)
+    if out is None:
+        out = np.empty((len(state), n_samples))
+    t = np.linspace(0, total_time, n_samples)
+
+    # Steps between samples, with dt adjusted to land exactly on the sample grid
+    sample_interval = total_time / (n_samples - 1)
+    steps_per_sample = max(1, math.ceil(sample_interval / dt))
+    h = sample_interval / steps_per_sample
+
+    out[:, 0] = state
+    # The compiled loop sums forces directly and has no event checks, so those runs stay on the NumPy loop
+    tracker = EventTracker(events, 0.0, state) if events else None
+    from three_body_simulation.compiled import resolve_backend, run_symplectic_loop
+    if resolve_backend(backend) == 'numba' and not isinstance(kernel, BarnesHutKernel) and tracker is None:
+        run_symplectic_loop(kernel, state, weights, h, steps_per_sample, out)
+        nfev = 1 + (n_samples - 1) * steps_per_sample * len(weights)
+        return IntegrationResult(t, out, method, nfev)
+
+    # Views into the working state, plus the current acceleration
+    x = state[:half].reshape(shape)
+    v = state[half:].reshape(shape)
+    a = kernel.accelerations(x)
+    nfev = 1
+
+    n_valid = n_samples
+    for sample in range(1, n_samples):
+        for step in range(1, steps_per_sample + 1):
+            for w in weights:
+                # Kick-drift-kick; the closing acceleration is reused by the next substep
+                v += 0.5 * w * h * a
+                x += w * h * v
+                kernel.accelerations(x, out=a)
+                v += 0.5 * w * h * a
+            nfev += len(weights)
+            if tracker is not None and tracker.step(t[sample - 1] + step * h, state):
+                n_valid = sample
+                break
+        if n_valid < n_samples:
+            break
+        out[:, sample] = state
+
+    if tracker is None:
+        return IntegrationResult(t, out, method, nfev)
+    t_events, y_events = tracker.results()
+    return IntegrationResult(t[:n_valid], out[:, :n_valid], method, nfev, t_events, y_events)
+
+
+def integrate_regularized(initial_state, total_time: float, n_samples: int, method: str = 'logh',
+                          dt: float = DEFAULT_DT, kernel: GravityKernel = None,
+                          out: np.ndarray = None, events=None) -> IntegrationResult:
+    """
+    Integrates with the algorithmically regularized logH leapfrog (Mikkola & Tanikawa 1999,
+    Preto & Tremaine 1999), composed to higher order like the symplectic methods.
+
+    Steps are taken in a fictitious time s: kicks advance the time by ds / U
+    and drifts by ds / (T + B), with U = -potential energy, T the kinetic
+    energy and B = U0 - T0 the conserved binding energy. The time step thus
+    shrinks in proportion to the separation during a close encounter, with
+    no 1/r singularity left in the step: two-body collisions and near-
+    collisions are passed in a bounded number of steps, and Kepler orbits
+    keep their exact shape at any step size. The higher-order compositions
+    are more accurate for smooth orbits but lose that exactness, so the
+    plain 'logh' suits near-collisions best. The states are interpolated
+    onto the uniform sample grid with cubic Hermite interpolation of the
+    positions and velocities between steps, so samples inside an encounter
+    are only as fine as its steps.
+
+    Parameters:
+    initial_state (array_like): Flat state (positions followed by velocities).
+    total_time (float): Integration end time.
+    n_samples (int): Number of uniformly spaced samples, including t = 0 and t = total_time.
+    method (str): One of REGULARIZED_METHODS ('logh', 'logh4', 'logh6').
+    dt (float): Initial time step, which sets the fictitious step ds = dt * U0.
+    kernel (GravityKernel): Force kernel. Defaults to three unit masses in 2D.
+    out (np.ndarray): Optional trajectory array of shape (S, n_samples) to write into.
+    events (iterable): Event functions (see events.py), checked after every step.
+
+    Returns:
+    IntegrationResult: The sampled trajectory.
+    """
+    if method not in REGULARIZED_METHODS:
+        raise ValueError(f"Unknown regularized method '{method}'")
+    if n_samples < 2:
+        raise ValueError("n_samples must be at least 2")
+    weights = REGULARIZED_METHODS[method]
+
+    if kernel is None:
+        kernel = GravityKernel([1.0, 1.0, 1.0])
+    shape = (kernel.n_bodies, kernel.ndim)
+    half = kernel.n_bodies * kernel.ndim
+    m = kernel.masses[:, np.newaxis]
+
+    state = np.array(initial_state, dtype=float)
+    size = len(state)
+    if out is None:
+        out = np.empty((size, n_samples))
+    t = np.linspace(0, total_time, n_samples)
+    out[:, 0] = state
+
+    x = state[:half].reshape(shape)
+    v = state[half:].reshape(shape)
+    a = kernel.accelerations(x)
+    force_function = -kernel.potential_energy(x)
+    binding = force_function - 0.5 * np.sum(m * v * v)
+    ds = dt * force_function
+    nfev = 1
+    tracker = EventTracker(events, 0.0, state) if events else None
+
+    # Hermite data [x, v, v, a] at the two ends of a step, see HermiteTrajectory
+    ends = np.empty((2 * size, 2))
+    time = 0.0
+    sample = 1
+    n_valid = n_samples
+    while sample < n_samples:
+        ends[:size, 0] = state
+        ends[size:size + half, 0] = v.ravel()
+        ends[size + half:, 0] = a.ravel()
+        start = time
+        for w in weights:
+            v += 0.5 * w * ds / force_function * a
+            step_time = w * ds / (0.5 * np.sum(m * v * v) + binding)
+            x += step_time * v
+            time += step_time
+            kernel.accelerations(x, out=a)
+            force_function = -kernel.potential_energy(x)
+            v += 0.5 * w * ds / force_function * a
+        nfev += len(weights)
+        if tracker is not None and tracker.step(time, state):
+            n_valid = sample
+            break
+
+        # Interpolate the samples this step has passed
+        stop = np.searchsorted(t, time, side='right')
+        if stop > sample:
+            ends[:size, 1] = state
+            ends[size:size + half, 1] = v.ravel()
+            ends[size + half:, 1] = a.ravel()
+            out[:, sample:stop] = HermiteTrajectory([start, time], ends).positions(t[sample:stop])
+            sample = stop
+
+    if tracker is None:
+        return IntegrationResult(t, out, method, nfev)
+    t_events, y_events = tracker.results()
+    return IntegrationResult(t[:n_valid], out[:, :n_valid], method, nfev, t_events, y_events)
+
+
+def integrate(initial_state, total_time: float, n_samples: int = 500, method: str = 'RK45',
+              rtol: float = 1e-10, atol: float = 1e-10, dt: float = DEFAULT_DT,
+              masses=(1.0, 1.0, 1.0), ndim: int = 2, G: float = 1.0, softening: float = 0.0,
+              backend: str = 'numpy', sampling: str = 'uniform',
+              sample_tolerance: float = DEFAULT_SAMPLE_TOLERANCE, force: str = 'direct',
+              theta: float = DEFAULT_THETA, out: np.ndarray = None, events=None,
+              monitor=None) -> IntegrationResult:
+    """
+    Integrates the N-body equations with the chosen engine.
+
+    With sampling='uniform' the trajectory is sampled on a uniform grid. With
+    sampling='adaptive' it keeps only the samples needed to reproduce the
+    orbit within sample_tolerance by Hermite interpolation (see
+    thin_trajectory), starting from the solver's accepted steps for adaptive
+    methods and from the n_samples uniform samples for the others.
+
+    Parameters:
+    initial_state (array_like): Flat state (positions followed by velocities).
+    total_time (float): Integration end time.
+    n_samples (int): Number of uniformly spaced samples (candidate samples for
+        symplectic methods with adaptive sampling).
+    method (str): An adaptive solve_ivp method (e.g. 'RK45'), a symplectic one (e.g. 'yoshida4')
+        or a regularized one for close encounters (e.g. 'logh4').
+    rtol (float): Relative tolerance (adaptive methods only).
+    atol (float): Absolute tolerance (adaptive methods only).
+    dt (float): Largest step size (symplectic methods) or initial step size (regularized methods).
+    masses (array_like): Body masses.
+    ndim (int): Number of spatial dimensions.
+    G (float): Gravitational constant.
+    softening (float): Plummer softening length.
+    backend (str): 'numpy' or 'numba' (compiled right-hand side and fixed-step loop,
+        falls back to 'numpy' if numba is not installed).
+    sampling (str): 'uniform' or 'adaptive'.
+    sample_tolerance (float): Largest position error of adaptive sampling.
+    force (str): 'direct' summation or the 'barnes_hut' tree code for large N.
+    theta (float): Barnes-Hut opening angle.
+    out (np.ndarray): Optional (S, n_samples) array to write a uniformly sampled trajectory
+        into, e.g. a shared-memory slot; result.y is then a view of it.
+    events (iterable): Event functions such as CloseApproach, Escape and ReturnToStart
+        (see events.py). Terminal events end the integration early; the event times
+        and states are returned in result.t_events and result.y_events.
+    monitor (ConservationMonitor): Records conserved quantities after every step (see
+        monitor.py); it is bound to this integration's kernel and appended to the events.
+
+    Returns:
+    IntegrationResult: The sampled trajectory.
+    """
+    if sampling not in ('uniform', 'adaptive'):
+        raise ValueError(f"Unknown sampling '{sampling}', expected 'uniform' or 'adaptive'")
+    if out is not None and sampling != 'uniform':
+        raise ValueError("out requires uniform sampling")
+    from three_body_simulation.compiled import make_kernel
+    kernel = make_kernel(masses, ndim=ndim, G=G, softening=softening, backend=backend,
+                         force=force, theta=theta)
+    if len(initial_state) != kernel.state_size:
+        raise ValueError(f"initial_state has {len(initial_state)} elements, expected {kernel.state_size} "
+                         f"for {kernel.n_bodies} bodies in {ndim}D")
+    if monitor is not None:
+        monitor.bind(kernel)
+        events = [*(events or ()), monitor]
+
+    if method in SYMPLECTIC_METHODS:
+        result = integrate_symplectic(initial_state, total_time, n_samples, method=method, dt=dt,
+                                      kernel=kernel, out=out, backend=backend, events=events)
+    elif method in REGULARIZED_METHODS:
+        result = integrate_regularized(initial_state, total_time, n_samples, method=method, dt=dt,
+                                       kernel=kernel, out=out, events=events)
+    elif method in ADAPTIVE_METHODS:
+        # Without t_eval solve_ivp returns its accepted steps, which are dense where the orbit is fast
+        t_eval = np.linspace(0, total_time, n_samples) if sampling == 'uniform' else None
+        from scipy.integrate import solve_ivp
+        solution = solve_ivp(kernel, (0, total_time), initial_state, method=method,
+                             t_eval=t_eval, rtol=rtol, atol=atol, events=events)
+        y = solution.y
+        if out is not None:
+            # The solver may stop early, leaving the rest of out untouched
+            out[:, :y.shape[1]] = y
+            y = out[:, :y.shape[1]]
+        result = IntegrationResult(solution.t, y, method, solution.nfev,
+                                   solution.t_events, solution.y_events)
+    else:
+        raise ValueError(f"Unknown integration method '{method}'")
+
+    if sampling == 'adaptive':
+        result.t, result.y = thin_trajectory(result.t, result.y, sample_tolerance)
+    return result
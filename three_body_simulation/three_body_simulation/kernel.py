@@ -0,0 +1,198 @@
+# three_body_simulation/kernel.py
+
+import numpy as np
+
+
+class GravityKernel:
+    """
+    Newtonian gravitational accelerations for N bodies in 2D or 3D.
+
+    Pairwise separations are computed with broadcasting on an (..., N, ndim)
+    position array, so the same code path handles three bodies, N bodies and
+    stacked batches of systems. All intermediate arrays are allocated once and
+    reused for every call with the same shape.
+    """
+
+    def __init__(self, masses, ndim: int = 2, G: float = 1.0, softening: float = 0.0):
+        """
+        Parameters:
+        masses (array_like): Mass of each body, shape (N,).
+        ndim (int): Number of spatial dimensions (2 or 3).
+        G (float): Gravitational constant.
+        softening (float): Plummer softening length (0 for exact Newtonian gravity).
+        """
+        if ndim not in (2, 3):
+            raise ValueError(f"ndim must be 2 or 3, got {ndim}")
+
+        self.masses = np.asarray(masses, dtype=float)
+        self.n_bodies = len(self.masses)
+        self.ndim = ndim
+        self.G = G
+        self.softening = softening
+
+        # Gravitational parameter of each attracting body, shape (N,)
+        self._gm = G * self.masses
+        self._diag = np.arange(self.n_bodies)
+        self._shape = None
+        # Whether the work buffers hold the pairwise terms of the positions in _x
+        self._cached = False
+
+    @property
+    def state_size(self) -> int:
+        """
+        Length of the flat state vector: positions followed by velocities.
+        """
+        return 2 * self.n_bodies * self.ndim
+
+    def _ensure_buffers(self, batch_shape):
+        # Reallocate the work buffers only when the batch shape changes
+        if self._shape == batch_shape:
+            return
+        n = self.n_bodies
+        self._dx = np.empty(batch_shape + (n, n, self.ndim))
+        self._r2 = np.empty(batch_shape + (n, n))
+        self._w = np.empty(batch_shape + (n, n))
+        self._x = np.empty(batch_shape + (n, self.ndim))
+        self._shape = batch_shape
+        self._cached = False
+
+    def accelerations(self, positions: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Computes the acceleration of every body.
+
+        Parameters:
+        positions (np.ndarray): Body positions, shape (..., N, ndim).
+        out (np.ndarray): Optional output array with the same shape as positions.
+
+        Returns:
+        np.ndarray: Accelerations, shape (..., N, ndim).
+        """
+        self._ensure_buffers(positions.shape[:-2])
+        dx, r2, w = self._dx, self._r2, self._w
+        if out is None:
+            out = np.empty(positions.shape)
+
+        # dx[..., i, j, :] = r_j - r_i
+        np.subtract(positions[..., np.newaxis, :, :], positions[..., :, np.newaxis, :], out=dx)
+        np.einsum('...ijk,...ijk->...ij', dx, dx, out=r2)
+        if self.softening:
+            r2 += self.softening ** 2
+
+        # Keep the self-interaction finite, it is zeroed below
+        r2[..., self._diag, self._diag] = 1.0
+
+        # w[..., i, j] = G * m_j / |r_j - r_i|^3
+        np.sqrt(r2, out=w)
+        w *= r2
+        np.divide(self._gm, w, out=w)
+        w[..., self._diag, self._diag] = 0.0
+
+        np.einsum('...ij,...ijk->...ik', w, dx, out=out)
+        # Remember the positions, so potential_energy() can reuse the pairwise terms
+        np.copyto(self._x, positions)
+        self._cached = True
+        return out
+
+    def potential_energy(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Computes the total gravitational potential energy.
+
+        Right after accelerations() for the same positions, the pairwise terms
+        left in the work buffers are reused and no distances are recomputed.
+
+        Parameters:
+        positions (np.ndarray): Body positions, shape (..., N, ndim).
+
+        Returns:
+        np.ndarray: -sum over pairs of G m_i m_j / r_ij, shape (...) (a float for one system).
+        """
+        self._ensure_buffers(positions.shape[:-2])
+        dx, r2, w = self._dx, self._r2, self._w
+        if self._cached and np.array_equal(positions, self._x):
+            # w * r2 = G * m_j / |r_j - r_i| from the last accelerations() call
+            return -0.5 * np.einsum('...ij,...ij,i->...', w, r2, self.masses)
+
+        self._cached = False
+        np.subtract(positions[..., np.newaxis, :, :], positions[..., :, np.newaxis, :], out=dx)
+        np.einsum('...ijk,...ijk->...ij', dx, dx, out=r2)
+        if self.softening:
+            r2 += self.softening ** 2
+        r2[..., self._diag, self._diag] = 1.0
+
+        # w[..., i, j] = G * m_j / |r_j - r_i|, every pair counted twice
+        np.sqrt(r2, out=w)
+        np.divide(self._gm, w, out=w)
+        w[..., self._diag, self._diag] = 0.0
+        return -0.5 * np.einsum('...ij,i->...', w, self.masses)
+
+    def force_jacobian(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Computes the Jacobian da/dx of the accelerations, for variational equations.
+
+        Right after accelerations() for the same positions, the pairwise terms
+        left in the work buffers are reused.
+
+        Parameters:
+        positions (np.ndarray): Body positions, shape (..., N, ndim).
+
+        Returns:
+        np.ndarray: Jacobian of the flat accelerations, shape (..., N * ndim, N * ndim).
+        """
+        if not (self._cached and np.array_equal(positions, self._x)):
+            # Fill the buffers with the direct-summation terms, also for compiled or tree-code subclasses
+            GravityKernel.accelerations(self, positions)
+        n, ndim = self.n_bodies, self.ndim
+        dx, w = self._dx, self._w
+        w5 = 3 * w / self._r2
+
+        # Block (i, j) for i != j: G m_j (I / r^3 - 3 dx dx^T / r^5)
+        blocks = -w5[..., np.newaxis, np.newaxis] * dx[..., :, np.newaxis] * dx[..., np.newaxis, :]
+        blocks[..., np.arange(ndim), np.arange(ndim)] += w[..., np.newaxis]
+        jacobian = np.moveaxis(blocks, -3, -2).copy()
+        # Block (i, i) is minus the sum of the others in its row
+        jacobian[..., self._diag, :, self._diag, :] = -np.moveaxis(blocks.sum(axis=-3), -3, 0)
+        return jacobian.reshape(positions.shape[:-2] + (n * ndim, n * ndim))
+
+    def derivatives(self, t: float, state: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Computes the derivatives of a flat state vector.
+
+        The state holds all positions (body-major) followed by all velocities,
+        e.g. [x1, y1, x2, y2, x3, y3, vx1, vy1, vx2, vy2, vx3, vy3] for three
+        bodies in 2D. Leading batch dimensions are allowed.
+
+        Parameters:
+        t (float): Time (unused, the system is autonomous).
+        state (np.ndarray): State vector, shape (..., 2 * N * ndim).
+        out (np.ndarray): Optional output array with the same shape as state.
+
+        Returns:
+        np.ndarray: Time derivative of the state.
+        """
+        half = self.n_bodies * self.ndim
+        if out is None:
+            out = np.empty(state.shape)
+
+        batch_shape = state.shape[:-1]
+        positions = state[..., :half].reshape(batch_shape + (self.n_bodies, self.ndim))
+        out[..., :half] = state[..., half:]
+        accelerations = out[..., half:].reshape(batch_shape + (self.n_bodies, self.ndim))
+        self.accelerations(positions, out=accelerations)
+        return out
+
+    __call__ = derivatives
+
+
+def make_equations_of_motion(masses, ndim: int = 2, G: float = 1.0):
+    """
+    Builds a solve_ivp compatible right-hand side for the given bodies.
+
+    Parameters:
+    masses (array_like): Mass of each body.
+    ndim (int): Number of spatial dimensions.
+    G (float): Gravitational constant.
+
+    Returns:
+    GravityKernel: Callable as fun(t, state).
+    """
+    return GravityKernel(masses, ndim=ndim, G=G)
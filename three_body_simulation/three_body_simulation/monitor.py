@@ -0,0 +1,147 @@
+# three_body_simulation/monitor.py
+#
+# Conserved-quantity monitor: tracks energy, linear and angular momentum and
+# the center of mass along an integration, after every step.
+#
+# The monitor is an event function (see events.py), so every engine calls it
+# once per accepted step without a second pass over the trajectory. Pass it
+# to integrate(monitor=...), which binds it to the integration's own force
+# kernel: the potential energy then reuses the pairwise terms the kernel has
+# just computed for the step's forces (the compiled and Barnes-Hut kernels
+# sum it in their force pass instead). With max_drift set, it is a terminal
+# event that aborts the run once any quantity drifts too far.
+
+import numpy as np
+
+from three_body_simulation.kernel import GravityKernel
+from three_body_simulation.state import split_state
+
+# Monitored quantities, in the order of ConservationMonitor.drift
+QUANTITIES = ('energy', 'momentum', 'angular_momentum', 'center_of_mass')
+
+
+class ConservationMonitor:
+    """
+    Records conserved quantities after every integration step.
+
+    Drifts are relative to a scale of the initial state: |E0| for the energy
+    (or T0 - W0 if E0 is zero), sum m|v| for the momentum, sum m|x||v| for
+    the angular momentum and the largest distance from the center of mass
+    for the center of mass, whose reference moves uniformly with the
+    initial center-of-mass velocity.
+    """
+
+    direction = -1
+
+    def __init__(self, kernel: GravityKernel = None, max_drift: float = None):
+        """
+        Parameters:
+        kernel (GravityKernel): Kernel of the integrated system; integrate(monitor=...) binds its own.
+        max_drift (float): Relative drift of any quantity that aborts the run, or None to only record.
+        """
+        self.max_drift = max_drift
+        self.bind(kernel)
+
+    @property
+    def terminal(self) -> bool:
+        return self.max_drift is not None
+
+    def bind(self, kernel: GravityKernel) -> None:
+        """
+        Attaches the monitor to a kernel and clears the recorded series.
+        """
+        self.kernel = kernel
+        self._t = []
+        self._values = []
+        self._reference = None
+        self._max_drift = np.zeros(len(QUANTITIES))
+
+    def __call__(self, t: float, y: np.ndarray) -> float:
+        drift = self.record(t, y)
+        return self.max_drift - drift if self.max_drift is not None else 1.0
+
+    def _quantities(self, y: np.ndarray) -> tuple:
+        # Energy, momentum, angular momentum and center of mass of a state, plus the state's views
+        kernel = self.kernel
+        m = kernel.masses
+        x, v = split_state(y, kernel.n_bodies, kernel.ndim)
+        energy = 0.5 * np.einsum('i,ij,ij->', m, v, v) + float(kernel.potential_energy(x))
+        if kernel.ndim == 2:
+            angular_momentum = np.array([m @ (x[:, 0] * v[:, 1] - x[:, 1] * v[:, 0])])
+        else:
+            angular_momentum = m @ np.cross(x, v)
+        return energy, m @ v, angular_momentum, m @ x / m.sum(), x, v
+
+    def _set_reference(self, t: float, quantities: tuple) -> None:
+        energy, momentum, angular_momentum, center_of_mass, x, v = quantities
+        m = self.kernel.masses
+        kinetic = 0.5 * np.einsum('i,ij,ij->', m, v, v)
+        speed = np.sqrt(np.einsum('ij,ij->i', v, v))
+        radius = np.sqrt(np.einsum('ij,ij->i', x, x))
+        scales = np.array([
+            abs(energy) or 2 * kinetic - energy,
+            m @ speed,
+            m @ (radius * speed),
+            np.max(np.linalg.norm(x - center_of_mass, axis=1)),
+        ])
+        self._reference = (t, energy, momentum, angular_momentum, center_of_mass, momentum / m.sum())
+        # Dividing by 1 leaves absolute drifts where a scale is zero (e.g. a system at rest)
+        self._scales = np.where(scales > 0, scales, 1.0)
+
+    def record(self, t: float, y: np.ndarray) -> float:
+        """
+        Records the quantities of a state.
+
+        Calls at or before the last recorded time (e.g. from event root
+        finding inside a step) are evaluated but not recorded.
+
+        Returns:
+        float: Largest relative drift of the state.
+        """
+        quantities = self._quantities(y)
+        if self._reference is None:
+            self._set_reference(t, quantities)
+        energy, momentum, angular_momentum, center_of_mass, _, _ = quantities
+        t0, energy0, momentum0, angular_momentum0, center_of_mass0, velocity = self._reference
+        drift = np.array([
+            abs(energy - energy0),
+            np.linalg.norm(momentum - momentum0),
+            np.linalg.norm(angular_momentum - angular_momentum0),
+            np.linalg.norm(center_of_mass - center_of_mass0 - velocity * (t - t0)),
+        ]) / self._scales
+
+        if not self._t or t > self._t[-1]:
+            self._t.append(t)
+            self._values.append((energy, momentum, angular_momentum, center_of_mass))
+            np.maximum(self._max_drift, drift, out=self._max_drift)
+        return drift.max()
+
+    @property
+    def t(self) -> np.ndarray:
+        """
+        Times of the recorded steps, shape (k,).
+        """
+        return np.array(self._t)
+
+    def series(self, name: str) -> np.ndarray:
+        """
+        Returns the recorded values of one of QUANTITIES, shape (k,) for the energy or (k, d) for the others.
+        """
+        if name not in QUANTITIES:
+            raise ValueError(f"Unknown quantity '{name}', expected one of {QUANTITIES}")
+        k = QUANTITIES.index(name)
+        return np.array([values[k] for values in self._values])
+
+    @property
+    def drift(self) -> dict:
+        """
+        Largest relative drift of each of QUANTITIES over the recorded steps.
+        """
+        return dict(zip(QUANTITIES, self._max_drift.tolist()))
+
+    @property
+    def exceeded(self) -> bool:
+        """
+        Whether a drift has passed max_drift.
+        """
+        return self.max_drift is not None and self._max_drift.max() > self.max_drift
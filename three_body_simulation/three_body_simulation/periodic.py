@@ -0,0 +1,232 @@
+# three_body_simulation/periodic.py
+#
+# Periodic-orbit refinement by Newton shooting.
+#
+# The orbit and its state transition matrix (STM) are integrated together
+# from the variational equations, in the scaled time tau = t / T so that a
+# whole batch of orbits with different periods T ends at tau = 1 and runs
+# through integrate_ensemble as one stacked state [y, STM, T]. Each Newton
+# step solves
+#
+#     [STM - I, f(y(T))] [dy0, dT] = -(y(T) - y0)
+#
+# in the least-squares sense. The pseudo-inverse picks the smallest
+# correction, which copes with the directions the symmetries of the problem
+# (time shift, rotation, energy) leave undetermined. Example:
+#
+#   python -m three_body_simulation.periodic --preset figure_eight
+
+import argparse
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+from three_body_simulation.ensemble import SUCCESS, integrate_ensemble
+from three_body_simulation.kernel import GravityKernel
+from three_body_simulation.presets import PRESETS, get_preset
+
+# Default convergence threshold on |y(T) - y0| / (1 + |y0|)
+DEFAULT_TOLERANCE = 1e-10
+
+
+@dataclass
+class ShootingResult:
+    """
+    Output of refine_periodic_orbits, one entry per orbit.
+
+    initial_states: Refined initial states, shape (B, S).
+    periods: Refined periods, shape (B,).
+    residuals: Final relative residuals |y(T) - y0| / (1 + |y0|), shape (B,).
+    converged: Whether each residual reached the tolerance, shape (B,).
+    iterations: Newton iterations used by each orbit, shape (B,).
+    monodromy: State transition matrices over one period, shape (B, S, S).
+    """
+    initial_states: np.ndarray
+    periods: np.ndarray
+    residuals: np.ndarray
+    converged: np.ndarray
+    iterations: np.ndarray
+    monodromy: np.ndarray
+
+
+class VariationalEquations:
+    """
+    Batched right-hand side of the orbit, its STM and its period, in the scaled time tau = t / T.
+
+    The extended state of one orbit is [y (S), STM (S * S, row-major), T],
+    and its derivative is T * [f(y), J(y) STM, 0], where the Jacobian J has
+    the blocks [[0, I], [da/dx, 0]].
+    """
+
+    def __init__(self, masses, ndim: int = 2, G: float = 1.0, softening: float = 0.0):
+        """
+        Parameters:
+        masses (array_like): Body masses.
+        ndim (int): Number of spatial dimensions.
+        G (float): Gravitational constant.
+        softening (float): Plummer softening length.
+        """
+        self.kernel = GravityKernel(masses, ndim=ndim, G=G, softening=softening)
+        self.size = self.kernel.state_size
+        self.extended_size = self.size * (self.size + 1) + 1
+
+    def pack(self, states, periods) -> np.ndarray:
+        """
+        Builds extended states with identity STMs, shape (B, extended_size).
+        """
+        states = np.asarray(states, dtype=float)
+        stm = np.broadcast_to(np.eye(self.size).ravel(), (len(states), self.size * self.size))
+        return np.hstack([states, stm, np.asarray(periods, dtype=float)[:, np.newaxis]])
+
+    def unpack(self, z: np.ndarray) -> tuple:
+        """
+        Splits extended states into views (states (B, S), STMs (B, S, S), periods (B,)).
+        """
+        size = self.size
+        return z[:, :size], z[:, size:-1].reshape(-1, size, size), z[:, -1]
+
+    def __call__(self, tau, z: np.ndarray) -> np.ndarray:
+        kernel = self.kernel
+        half = kernel.n_bodies * kernel.ndim
+        y, stm, period = self.unpack(z)
+        scale = period[:, np.newaxis]
+
+        dz = np.empty(z.shape)
+        dy, dstm, dperiod = self.unpack(dz)
+        kernel.derivatives(0.0, y, out=dy)
+        dy *= scale
+        positions = y[:, :half].reshape(-1, kernel.n_bodies, kernel.ndim)
+        dstm[:, :half] = stm[:, half:]
+        np.matmul(kernel.force_jacobian(positions), stm[:, :half], out=dstm[:, half:])
+        dstm *= scale[:, :, np.newaxis]
+        dperiod[:] = 0.0
+        return dz
+
+
+def refine_periodic_orbits(initial_states, periods, masses=(1.0, 1.0, 1.0), ndim: int = 2, G: float = 1.0,
+                           softening: float = 0.0, tolerance: float = DEFAULT_TOLERANCE, max_iterations: int = 20,
+                           rtol: float = 1e-12, atol: float = 1e-12, rcond: float = 1e-8,
+                           max_steps: int = 100_000) -> ShootingResult:
+    """
+    Converges a batch of approximate periodic orbits with Newton shooting.
+
+    All orbits share the masses and are integrated together; converged
+    orbits drop out of later iterations.
+
+    Parameters:
+    initial_states (array_like): Approximate initial states, shape (B, S).
+    periods (array_like): Approximate periods, shape (B,).
+    masses (array_like): Body masses.
+    ndim (int): Number of spatial dimensions.
+    G (float): Gravitational constant.
+    softening (float): Plummer softening length.
+    tolerance (float): Relative residual at which an orbit counts as converged.
+    max_iterations (int): Newton iterations per orbit.
+    rtol (float): Relative tolerance of the orbit and STM integration.
+    atol (float): Absolute tolerance of the orbit and STM integration.
+    rcond (float): Cutoff of the pseudo-inverse, relative to the largest singular value.
+    max_steps (int): Integration steps per orbit and iteration before it is given up,
+        e.g. when a guess runs into a collision.
+
+    Returns:
+    ShootingResult: The refined orbits.
+    """
+    equations = VariationalEquations(masses, ndim=ndim, G=G, softening=softening)
+    states = np.array(initial_states, dtype=float, ndmin=2)
+    periods = np.array(periods, dtype=float, ndmin=1)
+    n_orbits, size = states.shape
+    if size != equations.size:
+        raise ValueError(f"initial_states have {size} components, expected {equations.size} "
+                         f"for {equations.kernel.n_bodies} bodies in {ndim}D")
+    if periods.shape != (n_orbits,):
+        raise ValueError(f"Expected {n_orbits} periods, got {periods.shape}")
+
+    residuals = np.full(n_orbits, np.inf)
+    converged = np.zeros(n_orbits, dtype=bool)
+    iterations = np.zeros(n_orbits, dtype=int)
+    monodromy = np.full((n_orbits, size, size), np.nan)
+    active = np.arange(n_orbits)
+    identity = np.eye(size)
+
+    for _ in range(max_iterations + 1):
+        if not len(active):
+            break
+        result = integrate_ensemble(equations.pack(states[active], periods[active]), 1.0,
+                                    rhs=equations, rtol=rtol, atol=atol, max_steps=max_steps)
+        final, stm, _ = equations.unpack(result.y_final)
+        ok = result.status == SUCCESS
+        error = final - states[active]
+        residuals[active] = np.where(ok, np.linalg.norm(error, axis=1)
+                                     / (1 + np.linalg.norm(states[active], axis=1)), np.inf)
+        monodromy[active] = stm
+
+        # Orbits that converged or whose integration failed stop here
+        done = residuals[active] < tolerance
+        converged[active[done]] = True
+        keep = ~done & ok & (iterations[active] < max_iterations)
+        active, error, final, stm = active[keep], error[keep], final[keep], stm[keep]
+        if not len(active):
+            break
+
+        # Least-squares Newton step on [dy0, dT]
+        velocity = equations.kernel.derivatives(0.0, final)
+        jacobian = np.concatenate([stm - identity, velocity[:, :, np.newaxis]], axis=2)
+        step = -np.einsum('bij,bj->bi', np.linalg.pinv(jacobian, rcond=rcond), error)
+        # Never let a step more than halve the period, which would head for the trivial T = 0 solution
+        shrink = -step[:, size] / (0.5 * periods[active])
+        step /= np.maximum(shrink, 1.0)[:, np.newaxis]
+        states[active] += step[:, :size]
+        periods[active] += step[:, size]
+        iterations[active] += 1
+
+    return ShootingResult(states, periods, residuals, converged, iterations, monodromy)
+
+
+def refine_periodic_orbit(initial_state, period: float, **options) -> ShootingResult:
+    """
+    Converges one approximate periodic orbit; see refine_periodic_orbits for the options.
+    """
+    return refine_periodic_orbits(np.asarray(initial_state)[np.newaxis], [period], **options)
+
+
+def refine_preset(preset_id: str, period: float = None, **options) -> ShootingResult:
+    """
+    Converges the orbit of a preset, starting from its initial conditions.
+
+    Parameters:
+    preset_id (str): Key of the preset in PRESETS.
+    period (float): Period guess; defaults to the preset's total time.
+    **options: Passed to refine_periodic_orbits (tolerance, max_iterations, ...).
+
+    Returns:
+    ShootingResult: The refined orbit.
+    """
+    preset = get_preset(preset_id)
+    initial_state, total_time = preset.initial_conditions()
+    system = preset.system
+    return refine_periodic_orbit(initial_state, total_time if period is None else period,
+                                 masses=system['masses'], ndim=system['ndim'], G=system['G'],
+                                 softening=system['softening'], **options)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Refine the periodic orbit of a preset by Newton shooting.")
+    parser.add_argument('--preset', default='figure_eight', choices=sorted(PRESETS))
+    parser.add_argument('--period', type=float, default=None, help="period guess (default: the preset's time)")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--max-iterations', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    result = refine_preset(args.preset, period=args.period, tolerance=args.tolerance,
+                           max_iterations=args.max_iterations)
+    status = 'converged' if result.converged[0] else 'did not converge'
+    print(f"{args.preset}: {status} after {result.iterations[0]} iterations, "
+          f"residual {result.residuals[0]:.2e}")
+    print(f"period = {result.periods[0]:.15g}")
+    print("initial_state = " + np.array2string(result.initial_states[0], precision=15, separator=', '))
+    return 0 if result.converged[0] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+# three_body_simulation/playback.py
+
+import numpy as np
+
+
+class HermiteTrajectory:
+    """
+    Smooth positions at any time from a sparsely sampled trajectory.
+
+    The flat states already carry the velocities, which are the time
+    derivatives of the positions, so cubic Hermite interpolation between
+    neighbouring samples is third-order accurate and C1 continuous without
+    storing extra data. A few hundred samples per orbit are enough for
+    smooth animation at any playback speed.
+    """
+
+    def __init__(self, t, y):
+        """
+        Parameters:
+        t (array_like): Increasing sample times, shape (k,).
+        y (np.ndarray): Flat states (positions followed by velocities), shape (S, k).
+        """
+        self.t = np.asarray(t, dtype=float)
+        y = np.asarray(y, dtype=float)
+        half = y.shape[0] // 2
+        self.x = y[:half]
+        self.v = y[half:]
+
+    @property
+    def start(self) -> float:
+        return self.t[0]
+
+    @property
+    def end(self) -> float:
+        return self.t[-1]
+
+    def positions(self, time) -> np.ndarray:
+        """
+        Returns the interpolated flat positions.
+
+        Parameters:
+        time (float or array_like): Time or times within [start, end]; values outside are clamped.
+
+        Returns:
+        np.ndarray: Positions of shape (S/2,) for a scalar time or (S/2, m) for m times.
+        """
+        time = np.clip(np.asarray(time, dtype=float), self.start, self.end)
+        if len(self.t) == 1:
+            # A single sample: the bodies stand still
+            return self.x[:, 0].copy() if time.ndim == 0 else np.repeat(self.x, time.size, axis=1)
+
+        # Interval [t_i, t_i+1] holding each time
+        i = np.clip(np.searchsorted(self.t, time, side='right') - 1, 0, len(self.t) - 2)
+        h = self.t[i + 1] - self.t[i]
+        theta = (time - self.t[i]) / h
+        return (
+            (1 - theta) ** 2 * (1 + 2 * theta) * self.x[:, i]
+            + theta ** 2 * (3 - 2 * theta) * self.x[:, i + 1]
+            + theta * (1 - theta) ** 2 * h * self.v[:, i]
+            - theta ** 2 * (1 - theta) * h * self.v[:, i + 1]
+        )
+
+
+class Playback:
+    """
+    Plays a trajectory back in simulation time, driven by wall-clock time.
+
+    The playback position is a continuous time, so any speed (including
+    speeds below 1) moves the bodies smoothly instead of stepping through
+    sample indices.
+    """
+
+    def __init__(self, trajectory: HermiteTrajectory = None, rate: float = 1.0, loop: bool = True):
+        """
+        Parameters:
+        trajectory (HermiteTrajectory): Trajectory to play, or None until one is available.
+        rate (float): Simulation time per wall-clock second at speed 1.
+        loop (bool): Restart from the beginning after the end, otherwise stop there.
+        """
+        self.trajectory = trajectory
+        self.rate = rate
+        self.loop = loop
+        self.time = trajectory.start if trajectory is not None else 0.0
+
+    def reset(self, trajectory: HermiteTrajectory = None) -> None:
+        """
+        Starts playing a new trajectory from its beginning.
+        """
+        self.trajectory = trajectory
+        self.time = trajectory.start if trajectory is not None else 0.0
+
+    def extend(self, trajectory: HermiteTrajectory) -> None:
+        """
+        Swaps in a longer version of the current trajectory, keeping the playback time.
+        """
+        self.trajectory = trajectory
+
+    def advance(self, wall_seconds: float, speed: float = 1.0) -> np.ndarray:
+        """
+        Moves the playback time forward and returns the positions there.
+
+        Parameters:
+        wall_seconds (float): Wall-clock time since the previous frame.
+        speed (float): Speed multiplier.
+
+        Returns:
+        np.ndarray: Flat positions, or None if there is no trajectory yet.
+        """
+        if self.trajectory is None:
+            return None
+        start, end = self.trajectory.start, self.trajectory.end
+        self.time += wall_seconds * speed * self.rate
+        if self.time > end:
+            if self.loop and end > start:
+                self.time = start + (self.time - start) % (end - start)
+            else:
+                self.time = end
+        return self.trajectory.positions(self.time)
@@ -0,0 +1,366 @@
+# three_body_simulation/presets.py
+
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+from three_body_simulation.state import pack_state
+
+# Gravitational constant (set to 1 for simplicity)
+G = 1.0
+
+# Masses of the three bodies (all equal)
+m1 = m2 = m3 = 1.0
+
+def get_figure_eight_initial_conditions():
+    """
+    Returns the initial conditions for the Figure-Eight Solution.
+    """
+    # Positions
+    x1 = 0.97000436
+    y1 = -0.24308753
+    x2 = -x1
+    y2 = -y1
+    x3 = 0.0
+    y3 = 0.0
+
+    # Velocities
+    vx1 = 0.4662036850
+    vy1 = 0.4323657300
+    vx2 = vx1
+    vy2 = vy1
+    vx3 = -2 * vx1
+    vy3 = -2 * vy1
+
+    initial_state = np.array([
+        x1, y1, x2, y2, x3, y3,
+        vx1, vy1, vx2, vy2, vx3, vy3
+    ])
+
+    total_time = 6.3259  # Period of the figure-eight orbit
+
+    return initial_state, total_time
+
+def get_lagrange_initial_conditions():
+    """
+    Returns the initial conditions for Lagrange's Equilateral Triangle Solution.
+    """
+    # Equilateral triangle positions
+    angle = np.radians(0)
+    r = 0.2  # Distance from center
+    x1 = r * np.cos(angle)
+    y1 = r * np.sin(angle)
+    x2 = r * np.cos(angle + 2 * np.pi / 3)
+    y2 = r * np.sin(angle + 2 * np.pi / 3)
+    x3 = r * np.cos(angle + 4 * np.pi / 3)
+    y3 = r * np.sin(angle + 4 * np.pi / 3)
+
+    # Velocities for circular motion
+    omega = np.sqrt(G * (m1 + m2 + m3) / r**3)
+    vx1 = -omega * y1
+    vy1 = omega * x1
+    vx2 = -omega * y2
+    vy2 = omega * x2
+    vx3 = -omega * y3
+    vy3 = omega * x3
+
+    initial_state = np.array([
+        x1, y1, x2, y2, x3, y3,
+        vx1, vy1, vx2, vy2, vx3, vy3
+    ])
+
+    total_time = 2 * np.pi / omega  # Period of the circular orbit // was 2 *
+
+    return initial_state, total_time
+def get_euler_colinear_initial_conditions():
+    """
+    Returns the initial conditions for Euler's Colinear Solution.
+    """
+    # Positions along x-axis
+    x1 = -1.0
+    y1 = 0.0
+    x2 = 0.0
+    y2 = 0.0
+    x3 = 1.0
+    y3 = 0.0
+
+    # Velocities
+    vx1 = 0.0
+    vy1 = 0.5
+    vx2 = 0.0
+    vy2 = 0.0
+    vx3 = 0.0
+    vy3 = -0.5
+
+    initial_state = np.array([
+        x1, y1, x2, y2, x3, y3,
+        vx1, vy1, vx2, vy2, vx3, vy3
+    ])
+
+    total_time = 10.0  # Adjust as necessary for full orbit
+
+    return initial_state, total_time
+
+
+def get_broucke_henon_initial_conditions():
+    """
+    Returns the initial conditions for a Broucke-Hénon Retrograde Orbit.
+    """
+    # Approximate initial conditions from numerical simulations
+    x1 = 0.0
+    y1 = 0.0
+    x2 = 1.0
+    y2 = 0.0
+    x3 = -1.0
+    y3 = 0.0
+
+    vx1 = 0.347111
+    vy1 = 0.532728
+    vx2 = -0.694222
+    vy2 = 0.0
+    vx3 = 0.347111
+    vy3 = -0.532728
+
+    initial_state = np.array([
+        x1, y1, x2, y2, x3, y3,
+        vx1, vy1, vx2, vy2, vx3, vy3
+    ])
+
+    total_time = 20.0  # Adjust as necessary
+
+    return initial_state, total_time
+
+
+def get_butterfly_initial_conditions():
+    """
+    Returns the initial conditions for the Butterfly Orbit.
+    """
+    # Approximate initial conditions from simulations
+    x1 = 0.0
+    y1 = 0.0
+    x2 = 1.0
+    y2 = 0.0
+    x3 = -1.0
+    y3 = 0.0
+
+    vx1 = 0.0
+    vy1 = 0.3
+    vx2 = -0.25
+    vy2 = -0.15
+    vx3 = 0.25
+    vy3 = -0.15
+
+    initial_state = np.array([
+        x1, y1, x2, y2, x3, y3,
+        vx1, vy1, vx2, vy2, vx3, vy3
+    ])
+
+    total_time = 20.0
+
+    return initial_state, total_time
+
+
+def get_yin_yang_initial_conditions():
+    """
+    Returns the initial conditions for the Yin-Yang Orbit.
+    """
+    # Approximate initial conditions
+    x1 = 0.0
+    y1 = 1.0
+    x2 = 0.0
+    y2 = -1.0
+    x3 = 0.0
+    y3 = 0.0
+
+    vx1 = 0.6
+    vy1 = 0.0
+    vx2 = -0.6
+    vy2 = 0.0
+    vx3 = 0.0
+    vy3 = 0.0
+
+    initial_state = np.array([
+        x1, y1, x2, y2, x3, y3,
+        vx1, vy1, vx2, vy2, vx3, vy3
+    ])
+
+    total_time = 20.0
+
+    return initial_state, total_time
+
+
+def get_dragonfly_initial_conditions():
+    """
+    Returns the initial conditions for the Dragonfly Orbit.
+    """
+    # Approximate initial conditions
+    x1 = -0.5
+    y1 = 0.0
+    x2 = 0.5
+    y2 = 0.0
+    x3 = 0.0
+    y3 = 0.0
+
+    vx1 = 0.0
+    vy1 = 0.5
+    vx2 = 0.0
+    vy2 = -0.5
+    vx3 = 0.0
+    vy3 = 0.0
+
+    initial_state = np.array([
+        x1, y1, x2, y2, x3, y3,
+        vx1, vy1, vx2, vy2, vx3, vy3
+    ])
+
+    total_time = 20.0
+
+    return initial_state, total_time
+
+
+def get_mobius_initial_conditions():
+    """
+    Returns the initial conditions for the Möbius Solution.
+    """
+    # Approximate initial conditions
+    x1 = 1.0
+    y1 = 0.0
+    x2 = -0.5
+    y2 = np.sqrt(3)/2
+    x3 = -0.5
+    y3 = -np.sqrt(3)/2
+
+    # Velocities
+    vx1 = 0.0
+    vy1 = -0.5
+    vx2 = 0.433
+    vy2 = 0.25
+    vx3 = -0.433
+    vy3 = 0.25
+
+    initial_state = np.array([
+        x1, y1, x2, y2, x3, y3,
+        vx1, vy1, vx2, vy2, vx3, vy3
+    ])
+
+    total_time = 20.0
+
+    return initial_state, total_time
+
+
+# Sizes of the N-body presets
+RING_BODIES = 8
+CLUSTER_BODIES = 64
+
+def get_ring_initial_conditions(n_bodies: int = RING_BODIES):
+    """
+    Returns the initial conditions for a ring of equal unit masses.
+
+    The bodies sit on the unit circle and rotate rigidly at the angular
+    velocity that balances their mutual attraction (a relative equilibrium).
+    """
+    angles = 2 * np.pi * np.arange(n_bodies) / n_bodies
+    positions = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+
+    # Circular speed: v^2 = G m / R * sum_k 1 / (4 sin(pi k / N)), k = 1..N-1
+    k = np.arange(1, n_bodies)
+    speed = np.sqrt(G * np.sum(1 / (4 * np.sin(np.pi * k / n_bodies))))
+    velocities = speed * np.stack([-np.sin(angles), np.cos(angles)], axis=1)
+
+    initial_state = pack_state(positions, velocities)
+
+    total_time = 2 * 2 * np.pi / speed  # Two revolutions
+
+    return initial_state, total_time
+
+
+def get_cluster_initial_conditions(n_bodies: int = CLUSTER_BODIES, seed: int = 1):
+    """
+    Returns the initial conditions for a 3D cluster of total mass 1.
+
+    Bodies are spread uniformly in the unit sphere with random velocities of
+    the virial dispersion (sigma^2 = G M / 5R per component), in the
+    center-of-mass frame.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Uniform in the unit ball: random direction, radius ~ u^(1/3)
+    directions = rng.normal(size=(n_bodies, 3))
+    directions /= np.linalg.norm(directions, axis=1, keepdims=True)
+    positions = directions * rng.uniform(size=(n_bodies, 1)) ** (1 / 3)
+    velocities = rng.normal(scale=np.sqrt(G / 5), size=(n_bodies, 3))
+
+    # Equal masses, so the center of mass is the plain mean
+    positions -= positions.mean(axis=0)
+    velocities -= velocities.mean(axis=0)
+
+    initial_state = pack_state(positions, velocities)
+
+    total_time = 10.0
+
+    return initial_state, total_time
+
+
+@dataclass(frozen=True)
+class Preset:
+    """
+    A named solution that can be selected in the simulation.
+
+    name: Display name.
+    key: Keyboard key that selects the preset.
+    initial_conditions: Function returning (initial_state, total_time).
+    masses: Mass of each body.
+    ndim: Number of spatial dimensions (2 or 3).
+    softening: Plummer softening length, for presets with close encounters.
+    """
+    name: str
+    key: str
+    initial_conditions: Callable[[], tuple]
+    masses: tuple = (m1, m2, m3)
+    ndim: int = 2
+    softening: float = 0.0
+
+    @property
+    def n_bodies(self) -> int:
+        return len(self.masses)
+
+    @property
+    def system(self) -> dict:
+        """
+        Physical parameters as keyword arguments for integrate() and make_kernel().
+        """
+        return {'masses': self.masses, 'ndim': self.ndim, 'G': G, 'softening': self.softening}
+
+
+# Registry of the preset solutions, in menu order
+PRESETS = {
+    'figure_eight': Preset('Figure-Eight Solution', 'f', get_figure_eight_initial_conditions),
+    'lagrange': Preset("Lagrange's Solution", 'l', get_lagrange_initial_conditions),
+    'euler_colinear': Preset("Euler's Colinear Solution", 'e', get_euler_colinear_initial_conditions),
+    'broucke_henon': Preset('Broucke-Hénon Retrograde Orbit', 'b', get_broucke_henon_initial_conditions),
+    'butterfly': Preset('Butterfly Orbit', 'y', get_butterfly_initial_conditions),
+    'yin_yang': Preset('Yin-Yang Orbit', 'u', get_yin_yang_initial_conditions),
+    'dragonfly': Preset('Dragonfly Orbit', 'd', get_dragonfly_initial_conditions),
+    'mobius': Preset('Möbius Solution', 'm', get_mobius_initial_conditions),
+    'ring': Preset(f'{RING_BODIES}-Body Ring', 'r', get_ring_initial_conditions,
+                   masses=(1.0,) * RING_BODIES),
+    'cluster': Preset(f'{CLUSTER_BODIES}-Body 3D Cluster', 'c', get_cluster_initial_conditions,
+                      masses=(1.0 / CLUSTER_BODIES,) * CLUSTER_BODIES, ndim=3, softening=0.05),
+}
+
+
+def get_preset(preset_id: str) -> Preset:
+    """
+    Looks up a preset by its registry id.
+
+    Parameters:
+    preset_id (str): Registry id, e.g. 'figure_eight'.
+
+    Returns:
+    Preset: The registered preset.
+    """
+    try:
+        return PRESETS[preset_id]
+    except KeyError:
+        raise KeyError(f"Unknown preset '{preset_id}', expected one of {list(PRESETS)}") from None
@@ -0,0 +1,303 @@
+# three_body_simulation/rendering.py
+#
+# Drawing helpers. The color, size and projection helpers are plain NumPy;
+# pygame is imported only when something is drawn, so importing this module
+# (e.g. from a worker process) does not load pygame.
+
+import colorsys
+
+import numpy as np
+
+# Colors of the first three bodies: Red, Green, Blue
+PRIMARY_COLORS = [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
+
+
+def body_colors(n_bodies: int) -> list:
+    """
+    Returns a distinct RGB color per body.
+
+    Three bodies keep the classic red, green and blue; larger systems get
+    hues spread evenly around the color wheel.
+    """
+    if n_bodies <= len(PRIMARY_COLORS):
+        return PRIMARY_COLORS[:n_bodies]
+    return [
+        tuple(int(255 * c) for c in colorsys.hsv_to_rgb(i / n_bodies, 0.8, 1.0))
+        for i in range(n_bodies)
+    ]
+
+
+def body_radius(n_bodies: int) -> int:
+    """
+    Returns the drawn radius of a body in pixels: 8 for three bodies, smaller for crowded systems.
+    """
+    return max(2, round(8 / max(1.0, n_bodies / 3) ** 0.25))
+
+
+def project(positions, ndim: int) -> np.ndarray:
+    """
+    Returns the (x, y) plane coordinates of flat positions; 3D systems are viewed along z.
+
+    Parameters:
+    positions (np.ndarray): Flat positions (n_bodies * ndim, ...).
+    ndim (int): Number of spatial dimensions.
+
+    Returns:
+    np.ndarray: Plane coordinates of shape (n_bodies, 2, ...).
+    """
+    positions = np.asarray(positions)
+    return positions.reshape((-1, ndim) + positions.shape[1:])[:, :2]
+
+
+def screen_coordinates(points, size, scale: float) -> np.ndarray:
+    """
+    Converts plane coordinates to integer pixel coordinates in one pass.
+
+    Parameters:
+    points (array_like): Plane coordinates of shape (..., 2), e.g. every body in every frame.
+    size (tuple): (width, height) of the view in pixels; the origin is at its center.
+    scale (float): Pixels per unit, e.g. from fit_scale().
+
+    Returns:
+    np.ndarray: Pixel coordinates (x right, y down) of shape (..., 2), dtype int.
+    """
+    points = np.asarray(points, dtype=float)
+    pixels = np.empty(points.shape, dtype=int)
+    pixels[..., 0] = (size[0] // 2 + points[..., 0] * scale).astype(int)
+    pixels[..., 1] = (size[1] // 2 - points[..., 1] * scale).astype(int)
+    return pixels
+
+
+def fit_scale(positions, size, margin: int = 50) -> float:
+    """
+    Returns the pixels-per-unit scale that fits the positions in a view.
+
+    Parameters:
+    positions (np.ndarray): Coordinates to fit, any shape.
+    size (tuple): (width, height) of the view in pixels.
+    margin (int): Margin in pixels left around the orbit.
+
+    Returns:
+    float: The scale, or 1.0 if there is nothing to fit.
+    """
+    max_coord = np.max(np.abs(positions)) if np.size(positions) else 0.0
+    if max_coord == 0.0:
+        return 1.0
+    return (min(size) // 2 - margin) / max_coord
+
+
+class TrailRenderer:
+    """
+    Fading body trails drawn on one persistent transparent layer.
+
+    Each frame the trails lose a fixed amount of alpha and one new dot per
+    body is drawn at full opacity, so a dot fades out over trail_length
+    frames. The per-frame cost is one fade and one blit, whatever the trail
+    length.
+
+    The layer is split into square tiles, each with the frame in which its
+    last dot fades out. Only the tiles that still hold a visible dot are
+    faded, as one NumPy subtraction on the alpha channel per run of tiles,
+    so the fade covers the trails rather than the whole layer. The same
+    runs are the regions a frame has to redraw (dirty_rects and
+    draw(rects=...)).
+    """
+
+    def __init__(self, size, trail_length: int = 100, radius: int = 4, tile_size: int = 32):
+        """
+        Parameters:
+        size (tuple): (width, height) of the layer in pixels.
+        trail_length (int): Number of frames a trail dot stays visible.
+        radius (int): Radius of a trail dot in pixels.
+        tile_size (int): Edge of the tiles that are faded and redrawn, in pixels.
+        """
+        import pygame
+
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        self.radius = radius
+        self.trail_length = trail_length
+        self.tile_size = tile_size
+        # Same linear fade as drawing trail_length dots with decreasing alpha
+        self.fade_step = max(1, 255 // trail_length)
+        # Updates until a dot is fully transparent
+        self._lifetime = -(-255 // self.fade_step)
+        # Per tile (row, column): the update in which its last dot fades to zero
+        self._expires = np.full((-(-size[1] // tile_size), -(-size[0] // tile_size)), -1)
+        self._frame = 0
+        self._dirty = None
+
+    def clear(self) -> None:
+        """
+        Removes all trails, e.g. when a new orbit is loaded.
+        """
+        self.surface.fill((0, 0, 0, 0))
+        self._expires.fill(-1)
+        self._dirty = None
+
+    def set_trail_length(self, trail_length: int) -> None:
+        """
+        Changes the number of frames a dot stays visible; dots already drawn fade at the new rate.
+        """
+        self.trail_length = trail_length
+        self.fade_step = max(1, 255 // trail_length)
+        lifetime = -(-255 // self.fade_step)
+        if lifetime > self._lifetime:
+            # Visible dots may now outlive their tiles' expiry
+            self._expires[self._expires >= self._frame] = self._frame + lifetime
+        self._lifetime = lifetime
+
+    def update(self, points, colors) -> None:
+        """
+        Fades the existing trails and adds a dot at each body's position.
+
+        Parameters:
+        points (array_like): Screen positions (x, y), one per body, e.g. from screen_coordinates().
+        colors (iterable): RGB color of each body.
+        """
+        import pygame
+
+        self._frame += 1
+        alpha = pygame.surfarray.pixels_alpha(self.surface)
+        for rect in self._runs(self._expires >= self._frame):
+            tile = alpha[rect.left:rect.right, rect.top:rect.bottom]
+            np.subtract(tile, np.minimum(tile, self.fade_step), out=tile)
+        del alpha  # Unlocks the surface
+
+        points = np.asarray(points, dtype=int).reshape(-1, 2)
+        for point, color in zip(points.tolist(), colors):
+            pygame.draw.circle(self.surface, (*color, 255), point, self.radius)
+        self._mark(points)
+        self._dirty = None
+
+    def _mark(self, points: np.ndarray) -> None:
+        # Sets the expiry of every tile a dot at the points overlaps
+        ny, nx = self._expires.shape
+        x0, y0, x1, y1 = (np.hstack([points - self.radius, points + self.radius]) // self.tile_size).T
+        visible = (x1 >= 0) & (y1 >= 0) & (x0 < nx) & (y0 < ny)
+        x0, x1 = np.clip(x0[visible], 0, nx - 1), np.clip(x1[visible], 0, nx - 1)
+        y0, y1 = np.clip(y0[visible], 0, ny - 1), np.clip(y1[visible], 0, ny - 1)
+        if not len(x0):
+            return
+        # A dot spans at most a few tiles, so loop over the offsets rather than the dots
+        for dy in range(int(np.max(y1 - y0)) + 1):
+            for dx in range(int(np.max(x1 - x0)) + 1):
+                self._expires[np.minimum(y0 + dy, y1), np.minimum(x0 + dx, x1)] = self._frame + self._lifetime
+
+    def _runs(self, covered: np.ndarray) -> list:
+        # Rectangles of the runs of covered tiles along each row
+        import pygame
+
+        edges = np.diff(covered.astype(np.int8), axis=1, prepend=0, append=0)
+        rows, starts = np.nonzero(edges == 1)
+        _, stops = np.nonzero(edges == -1)
+        size = self.tile_size
+        clip = self.surface.get_rect()
+        return [pygame.Rect(start * size, row * size, (stop - start) * size, size).clip(clip)
+                for row, start, stop in zip(rows.tolist(), starts.tolist(), stops.tolist())]
+
+    def dirty_rects(self) -> list:
+        """
+        Returns the non-overlapping rectangles of the layer that hold visible dots (or dots that just faded out).
+        """
+        if self._dirty is None:
+            self._dirty = self._runs(self._expires >= self._frame)
+        return self._dirty
+
+    def draw(self, target, rects=None, background=None) -> None:
+        """
+        Blits the trail layer onto the target surface.
+
+        Parameters:
+        target (pygame.Surface): Surface to draw on.
+        rects (list): Only redraw these rectangles; the whole layer if None.
+        background (tuple): Color each rectangle is cleared to first, so
+            redrawn or overlapping rectangles do not blend the trails twice.
+        """
+        if rects is None:
+            target.blit(self.surface, (0, 0))
+            return
+        for rect in rects:
+            if background is not None:
+                target.fill(background, rect)
+            target.blit(self.surface, rect, rect)
+
+
+class TextCache:
+    """
+    Rendered text surfaces keyed by (text, color), so unchanged text is rendered only once.
+    """
+
+    def __init__(self, font, max_size: int = 256):
+        """
+        Parameters:
+        font (pygame.font.Font): Font to render with.
+        max_size (int): Surfaces kept before the cache is emptied.
+        """
+        self.font = font
+        self.max_size = max_size
+        self._surfaces = {}
+
+    def render(self, text: str, color) -> object:
+        """
+        Returns the antialiased surface of a text in a color, rendering it on first use.
+        """
+        key = (text, tuple(color))
+        surface = self._surfaces.get(key)
+        if surface is None:
+            if len(self._surfaces) >= self.max_size:
+                self._surfaces.clear()
+            surface = self._surfaces[key] = self.font.render(text, True, color)
+        return surface
+
+
+def draw_frame(target, trails: TrailRenderer, points, colors, radius: int, previous_rects, overlay=(),
+               background=(0, 0, 0), full: bool = False, max_rects: int = 1000) -> tuple:
+    """
+    Draws bodies over their trails, clearing and redrawing only the regions that changed.
+
+    The changed regions are the trail layer's dirty rectangles and the
+    bodies' old and new positions; overlay lines touched by them are cleared
+    and redrawn whole.
+
+    Parameters:
+    target (pygame.Surface): Surface (or subsurface) to draw on.
+    trails (TrailRenderer): Trail layer, already updated for this frame.
+    points (list): Pixel positions (x, y) of the bodies.
+    colors (list): RGB color of each body.
+    radius (int): Body radius in pixels.
+    previous_rects (list): Body rectangles returned for the previous frame.
+    overlay (list): (surface, rect) pairs blitted on top, e.g. text from a TextCache.
+    background (tuple): Background color.
+    full (bool): Redraw everything, e.g. after the trails were cleared.
+    max_rects (int): Above this many changed rectangles the frame is redrawn in full.
+
+    Returns:
+    tuple: (rects, body_rects) - the changed rectangles of target, or None
+    after a full redraw, and the body rectangles to pass as previous_rects
+    with the next frame.
+    """
+    import pygame
+
+    body_rects = [pygame.Rect(x - radius - 1, y - radius - 1, 2 * radius + 2, 2 * radius + 2) for x, y in points]
+    rects = None
+    if not full:
+        rects = trails.dirty_rects() + list(previous_rects) + body_rects
+        rects += [rect for _, rect in overlay if rect.collidelist(rects) != -1]
+        if len(rects) > max_rects:
+            rects = None
+
+    # Clear the surface (or the changed regions) and draw the trails
+    if rects is None:
+        target.fill(background)
+        trails.draw(target)
+    else:
+        trails.draw(target, rects, background=background)
+
+    for point, color in zip(points, colors):
+        pygame.draw.circle(target, color, point, radius)
+
+    # Overlay where it was cleared
+    for surface, rect in overlay:
+        if rects is None or rect in rects:
+            target.blit(surface, rect)
+    return rects, body_rects
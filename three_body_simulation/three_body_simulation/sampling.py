@@ -0,0 +1,65 @@
+# three_body_simulation/sampling.py
+
+import numpy as np
+
+from three_body_simulation.playback import HermiteTrajectory
+
+# Default geometric error of adaptively sampled trajectories, in position units
+DEFAULT_SAMPLE_TOLERANCE = 1e-4
+
+
+def interpolation_error(t, y, start: int, stop: int) -> np.ndarray:
+    """
+    Returns the error of Hermite interpolation between two samples.
+
+    Parameters:
+    t (np.ndarray): Sample times, shape (k,).
+    y (np.ndarray): Flat states, shape (S, k).
+    start (int): Index of the first endpoint.
+    stop (int): Index of the second endpoint.
+
+    Returns:
+    np.ndarray: Largest coordinate error at each sample strictly between the endpoints.
+    """
+    ends = [start, stop]
+    interpolated = HermiteTrajectory(t[ends], y[:, ends]).positions(t[start + 1:stop])
+    half = y.shape[0] // 2
+    return np.max(np.abs(interpolated - y[:half, start + 1:stop]), axis=0)
+
+
+def thin_trajectory(t, y, tolerance: float = DEFAULT_SAMPLE_TOLERANCE) -> tuple:
+    """
+    Drops samples that Hermite interpolation of their neighbours reproduces.
+
+    Works like Douglas-Peucker line simplification with cubic Hermite segments:
+    an interval is split at its worst-reproduced sample until every dropped
+    sample lies within tolerance of the interpolated curve. Slow, smooth parts
+    of an orbit keep few samples while close encounters keep many.
+
+    Parameters:
+    t (array_like): Sample times, shape (k,).
+    y (np.ndarray): Flat states (positions followed by velocities), shape (S, k).
+    tolerance (float): Largest allowed position error of any dropped sample.
+
+    Returns:
+    tuple: (t, y) restricted to the kept samples; the first and last are always kept.
+    """
+    t = np.asarray(t, dtype=float)
+    y = np.asarray(y, dtype=float)
+    keep = np.zeros(len(t), dtype=bool)
+    keep[[0, -1]] = True
+
+    intervals = [(0, len(t) - 1)]
+    while intervals:
+        start, stop = intervals.pop()
+        if stop - start < 2:
+            continue
+        error = interpolation_error(t, y, start, stop)
+        worst = np.argmax(error)
+        if error[worst] > tolerance:
+            split = start + 1 + worst
+            keep[split] = True
+            intervals.append((start, split))
+            intervals.append((split, stop))
+
+    return t[keep], y[:, keep]
@@ -0,0 +1,224 @@
+# three_body_simulation/shared.py
+# Shared-memory result arrays for process-pool runs.
+#
+# The parent preallocates one shared_memory block per batch of jobs and hands
+# worker processes a small picklable spec. Workers attach to the block and
+# write their results in place, and the parent reads them through zero-copy
+# NumPy views, so trajectories are never pickled back to the parent.
+
+import multiprocessing
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from three_body_simulation.integrators import integrate
+
+
+@dataclass(frozen=True)
+class SharedArraySpec:
+    """
+    Picklable description of a SharedArray, used to attach to it from another process.
+
+    name: Name of the shared memory block.
+    shape: Array shape.
+    dtype: Array dtype string.
+    """
+    name: str
+    shape: tuple
+    dtype: str
+
+
+class SharedArray:
+    """
+    NumPy array backed by a multiprocessing shared memory block.
+
+    The process that creates the array owns the block and unlinks it on
+    close(); other processes attach with SharedArray.attach(spec). Views of
+    .array are only valid until close().
+    """
+
+    def __init__(self, shape, dtype='float64', fill=None, _spec: SharedArraySpec = None):
+        """
+        Parameters:
+        shape (tuple): Array shape.
+        dtype (str): Array dtype.
+        fill (scalar): Initial value of every element, or None to leave the memory as allocated.
+        """
+        if _spec is None:
+            dtype = np.dtype(dtype)
+            nbytes = max(1, int(np.prod(shape)) * dtype.itemsize)
+            self._memory = shared_memory.SharedMemory(create=True, size=nbytes)
+            self.spec = SharedArraySpec(self._memory.name, tuple(shape), dtype.str)
+            self.owner = True
+        else:
+            self._memory = shared_memory.SharedMemory(name=_spec.name)
+            self.spec = _spec
+            self.owner = False
+        self.array = np.ndarray(self.spec.shape, dtype=self.spec.dtype, buffer=self._memory.buf)
+        if fill is not None:
+            self.array.fill(fill)
+
+    @classmethod
+    def attach(cls, spec: SharedArraySpec) -> 'SharedArray':
+        """
+        Attaches to an array created in another process.
+        """
+        return cls(spec.shape, spec.dtype, _spec=spec)
+
+    def close(self) -> None:
+        """
+        Detaches from the block; the owner also frees it.
+        """
+        if self._memory is None:
+            return
+        self.array = None
+        self._memory.close()
+        if self.owner:
+            self._memory.unlink()
+        self._memory = None
+
+    def __enter__(self) -> 'SharedArray':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class TrajectorySink:
+    """
+    Preallocated shared-memory output for a batch of trajectories.
+
+    Holds y (n_jobs, S, n_samples), the common sample times t, and per-job
+    n_valid (samples actually computed, less than n_samples if a solver gave
+    up) and nfev. Workers attach with TrajectorySink.attach(sink.spec) and
+    fill their job's slot with write() or by integrating straight into
+    out(job).
+    """
+
+    def __init__(self, n_jobs: int, state_size: int, n_samples: int, _specs: dict = None):
+        """
+        Parameters:
+        n_jobs (int): Number of trajectories in the batch.
+        state_size (int): Length of the flat state.
+        n_samples (int): Samples per trajectory.
+        """
+        if _specs is None:
+            self._arrays = {
+                'y': SharedArray((n_jobs, state_size, n_samples), fill=np.nan),
+                't': SharedArray((n_samples,), fill=np.nan),
+                'n_valid': SharedArray((n_jobs,), dtype='int64', fill=0),
+                'nfev': SharedArray((n_jobs,), dtype='int64', fill=0),
+            }
+        else:
+            self._arrays = {field: SharedArray.attach(spec) for field, spec in _specs.items()}
+        self.y = self._arrays['y'].array
+        self.t = self._arrays['t'].array
+        self.n_valid = self._arrays['n_valid'].array
+        self.nfev = self._arrays['nfev'].array
+
+    @property
+    def spec(self) -> dict:
+        """
+        Picklable handle for TrajectorySink.attach().
+        """
+        return {field: array.spec for field, array in self._arrays.items()}
+
+    @classmethod
+    def attach(cls, spec: dict) -> 'TrajectorySink':
+        """
+        Attaches to a sink created in another process.
+        """
+        n_jobs, state_size, n_samples = spec['y'].shape
+        return cls(n_jobs, state_size, n_samples, _specs=spec)
+
+    def out(self, job: int) -> np.ndarray:
+        """
+        Returns the (S, n_samples) slot of a job, to integrate into in place.
+        """
+        return self.y[job]
+
+    def write(self, job: int, result) -> None:
+        """
+        Copies an IntegrationResult into a job's slot (a no-op copy if it was computed in place).
+        """
+        n = len(result.t)
+        if not np.may_share_memory(result.y, self.y[job]):
+            self.y[job, :, :n] = result.y
+        self.t[:n] = result.t
+        self.n_valid[job] = n
+        self.nfev[job] = result.nfev
+
+    def close(self) -> None:
+        """
+        Detaches (and, in the creating process, frees) the shared memory; views become invalid.
+        """
+        self.y = self.t = self.n_valid = self.nfev = None
+        for array in self._arrays.values():
+            array.close()
+
+    def __enter__(self) -> 'TrajectorySink':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# Worker-process globals, set once per process by _init_worker
+_worker = {}
+
+
+def _init_worker(sink_spec, states_spec, total_time, n_samples, integrate_kwargs):
+    _worker['sink'] = TrajectorySink.attach(sink_spec)
+    _worker['states'] = SharedArray.attach(states_spec)
+    _worker['args'] = (total_time, n_samples, integrate_kwargs)
+
+
+def _run_job(job: int) -> int:
+    # Integrate one trajectory straight into its slot of the sink
+    sink, states = _worker['sink'], _worker['states'].array
+    total_time, n_samples, integrate_kwargs = _worker['args']
+    result = integrate(states[job], total_time, n_samples=n_samples, out=sink.out(job), **integrate_kwargs)
+    sink.write(job, result)
+    return job
+
+
+def run_batch(initial_states, total_time: float, n_samples: int, processes: int = None,
+              **integrate_kwargs) -> TrajectorySink:
+    """
+    Integrates a batch of trajectories in a process pool into a shared-memory sink.
+
+    Parameters:
+    initial_states (array_like): Flat initial states, shape (n_jobs, S).
+    total_time (float): Integration end time.
+    n_samples (int): Uniformly spaced samples per trajectory.
+    processes (int): Worker processes; None for one per CPU, 1 to run in this process.
+    **integrate_kwargs: Passed to integrate() (method, rtol, atol, masses, ndim, ...).
+
+    Returns:
+    TrajectorySink: The trajectories; close it once its views are no longer needed.
+    """
+    initial_states = np.asarray(initial_states, dtype=float)
+    n_jobs, state_size = initial_states.shape
+    sink = TrajectorySink(n_jobs, state_size, n_samples)
+    with SharedArray(initial_states.shape) as states:
+        states.array[:] = initial_states
+        init_args = (sink.spec, states.spec, total_time, n_samples, integrate_kwargs)
+        try:
+            if processes == 1:
+                _init_worker(*init_args)
+                for job in range(n_jobs):
+                    _run_job(job)
+            else:
+                with multiprocessing.Pool(processes, initializer=_init_worker, initargs=init_args) as pool:
+                    for _ in pool.imap_unordered(_run_job, range(n_jobs)):
+                        pass
+        except BaseException:
+            sink.close()
+            raise
+        finally:
+            for attached in _worker.values():
+                if hasattr(attached, 'close'):
+                    attached.close()
+            _worker.clear()
+    return sink
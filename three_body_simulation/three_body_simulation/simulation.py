@@ -1,345 +1,276 @@
 # three_body_simulation/simulation.py
+#
+# Interactive viewer. Importing this module has no side effects: pygame is
+# loaded and the window opened only when main() starts, so the physics and
+# preset layer can be imported cheaply, e.g. from pool worker processes.
 
+import argparse
 import numpy as np
-from scipy.integrate import solve_ivp
-import pygame
 import sys
-
-# Initialize Pygame
-pygame.init()
+from importlib.util import find_spec
+
+from three_body_simulation.cache import OrbitCache
+from three_body_simulation.kernel import make_equations_of_motion
+from three_body_simulation.playback import HermiteTrajectory, Playback
+from three_body_simulation.rendering import (
+    TextCache, TrailRenderer, body_colors, body_radius, draw_frame, fit_scale, project, screen_coordinates,
+)
+from three_body_simulation.viewports import SCHEDULERS, OrbitSource, Viewport, print_report, tile_layout
+from three_body_simulation.worker import IntegrationQueue, IntegrationWorker
+from three_body_simulation.presets import (
+    G, m1, m2, m3, PRESETS,
+    get_figure_eight_initial_conditions,
+    get_lagrange_initial_conditions,
+    get_euler_colinear_initial_conditions,
+    get_broucke_henon_initial_conditions,
+    get_butterfly_initial_conditions,
+    get_yin_yang_initial_conditions,
+    get_dragonfly_initial_conditions,
+    get_mobius_initial_conditions,
+)
 
 # Screen dimensions
 WIDTH, HEIGHT = 800, 800
-SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Three-Body Simulation")
 
-# Colors
+# Colors (bodies get theirs from rendering.body_colors)
 BLACK = (0, 0, 0)
-BODY_COLORS = [(255, 0, 0), (0, 255, 0), (0, 0, 255)]  # Red, Green, Blue
 
-# Font for displaying text
-FONT = pygame.font.SysFont(None, 18)
+# Font size for displaying text
+FONT_SIZE = 18
 
-# Gravitational constant (set to 1 for simplicity)
-G = 1.0
+# Above this many changed rectangles a frame is redrawn in full instead
+MAX_DIRTY_RECTS = 1000
 
-# Masses of the three bodies (all equal)
-m1 = m2 = m3 = 1.0
+# Frames between refreshes of the tiles' render-time labels
+LABEL_FRAMES = 30
 
-def equations_of_motion(t, state):
-    """
-    Computes the derivatives of the state vector.
-    """
-    # Unpack the state vector
-    x1, y1, x2, y2, x3, y3, vx1, vy1, vx2, vy2, vx3, vy3 = state
-
-    # Positions
-    r1 = np.array([x1, y1])
-    r2 = np.array([x2, y2])
-    r3 = np.array([x3, y3])
-
-    # Compute pairwise distance vectors
-    r12 = r2 - r1
-    r13 = r3 - r1
-    r23 = r3 - r2
-
-    # Compute magnitudes of distance vectors
-    r12_norm = np.linalg.norm(r12)
-    r13_norm = np.linalg.norm(r13)
-    r23_norm = np.linalg.norm(r23)
-
-    # Compute accelerations
-    a1 = G * m2 * r12 / r12_norm**3 + G * m3 * r13 / r13_norm**3
-    a2 = G * m1 * -r12 / r12_norm**3 + G * m3 * r23 / r23_norm**3
-    a3 = G * m1 * -r13 / r13_norm**3 + G * m2 * -r23 / r23_norm**3
-
-    # Flatten the derivatives
-    derivatives = np.array([
-        vx1, vy1,
-        vx2, vy2,
-        vx3, vy3,
-        a1[0], a1[1],
-        a2[0], a2[1],
-        a3[0], a3[1]
-    ])
-
-    return derivatives
-
-def get_figure_eight_initial_conditions():
-    """
-    Returns the initial conditions for the Figure-Eight Solution.
-    """
-    # Positions
-    x1 = 0.97000436
-    y1 = -0.24308753
-    x2 = -x1
-    y2 = -y1
-    x3 = 0.0
-    y3 = 0.0
-
-    # Velocities
-    vx1 = 0.4662036850
-    vy1 = 0.4323657300
-    vx2 = vx1
-    vy2 = vy1
-    vx3 = -2 * vx1
-    vy3 = -2 * vy1
-
-    initial_state = np.array([
-        x1, y1, x2, y2, x3, y3,
-        vx1, vy1, vx2, vy2, vx3, vy3
-    ])
-
-    total_time = 6.3259  # Period of the figure-eight orbit
-
-    return initial_state, total_time
-
-def get_lagrange_initial_conditions():
-    """
-    Returns the initial conditions for Lagrange's Equilateral Triangle Solution.
-    """
-    # Equilateral triangle positions
-    angle = np.radians(0)
-    r = 0.2  # Distance from center
-    x1 = r * np.cos(angle)
-    y1 = r * np.sin(angle)
-    x2 = r * np.cos(angle + 2 * np.pi / 3)
-    y2 = r * np.sin(angle + 2 * np.pi / 3)
-    x3 = r * np.cos(angle + 4 * np.pi / 3)
-    y3 = r * np.sin(angle + 4 * np.pi / 3)
-
-    # Velocities for circular motion
-    omega = np.sqrt(G * (m1 + m2 + m3) / r**3)
-    vx1 = -omega * y1
-    vy1 = omega * x1
-    vx2 = -omega * y2
-    vy2 = omega * x2
-    vx3 = -omega * y3
-    vy3 = omega * x3
-
-    initial_state = np.array([
-        x1, y1, x2, y2, x3, y3,
-        vx1, vy1, vx2, vy2, vx3, vy3
-    ])
-
-    total_time = 2 * np.pi / omega  # Period of the circular orbit // was 2 *
-
-    return initial_state, total_time
-def get_euler_colinear_initial_conditions():
-    """
-    Returns the initial conditions for Euler's Colinear Solution.
-    """
-    # Positions along x-axis
-    x1 = -1.0
-    y1 = 0.0
-    x2 = 0.0
-    y2 = 0.0
-    x3 = 1.0
-    y3 = 0.0
+# Integrators selectable with the 'I' key
+INTEGRATORS = ['RK45', 'yoshida4', 'yoshida6', 'leapfrog']
 
-    # Velocities
-    vx1 = 0.0
-    vy1 = 0.5
-    vx2 = 0.0
-    vy2 = 0.0
-    vx3 = 0.0
-    vy3 = -0.5
+# Compiled backend when numba is installed (the 'numba' extra), NumPy otherwise.
+# Checked without importing numba, which compiled.py only loads when an orbit is integrated.
+BACKEND = 'numba' if find_spec('numba') is not None else 'numpy'
 
-    initial_state = np.array([
-        x1, y1, x2, y2, x3, y3,
-        vx1, vy1, vx2, vy2, vx3, vy3
-    ])
+# Integration tolerance (rtol and atol) for the adaptive integrators
+TOLERANCE = 1e-10
 
-    total_time = 10.0  # Adjust as necessary for full orbit
+# Simulation time played per second at speed 1.0
+PLAYBACK_RATE = 1.0
 
-    return initial_state, total_time
+# Samples computed per orbit; playback interpolates between them
+N_SAMPLES = 2000
 
+# Cached orbits keep only the samples needed for this position error (adaptive sampling)
+SAMPLE_TOLERANCE = 1e-4
 
-def get_broucke_henon_initial_conditions():
-    """
-    Returns the initial conditions for a Broucke-Hénon Retrograde Orbit.
-    """
-    # Approximate initial conditions from numerical simulations
-    x1 = 0.0
-    y1 = 0.0
-    x2 = 1.0
-    y2 = 0.0
-    x3 = -1.0
-    y3 = 0.0
-
-    vx1 = 0.347111
-    vy1 = 0.532728
-    vx2 = -0.694222
-    vy2 = 0.0
-    vx3 = 0.347111
-    vy3 = -0.532728
-
-    initial_state = np.array([
-        x1, y1, x2, y2, x3, y3,
-        vx1, vy1, vx2, vy2, vx3, vy3
-    ])
-
-    total_time = 20.0  # Adjust as necessary
-
-    return initial_state, total_time
+# Shared N-body kernel: three bodies in the plane
+equations_of_motion = make_equations_of_motion([m1, m2, m3], ndim=2, G=G)
 
+def request_solution(cache, worker, preset_id, n_samples, integrator):
+    """
+    Returns a preset's trajectory from the cache, or starts computing it in the background.
 
-def get_butterfly_initial_conditions():
+    Returns:
+    tuple: (solution, job) - the cached IntegrationResult and None on a hit,
+    or None and the IntegrationJob streaming the trajectory on a miss.
     """
-    Returns the initial conditions for the Butterfly Orbit.
+    solution = cache.lookup(preset_id, TOLERANCE, n_samples, integrator)
+    if solution is not None:
+        worker.cancel()
+        return solution, None
+
+    preset = PRESETS[preset_id]
+    initial_state, total_time = preset.initial_conditions()
+    job = worker.submit(initial_state, total_time, n_samples, method=integrator,
+                        rtol=TOLERANCE, atol=TOLERANCE, backend=BACKEND, **preset.system)
+    return None, job
+
+def extract_positions(solution, preset):
     """
-    # Approximate initial conditions from simulations
-    x1 = 0.0
-    y1 = 0.0
-    x2 = 1.0
-    y2 = 0.0
-    x3 = -1.0
-    y3 = 0.0
-
-    vx1 = 0.0
-    vy1 = 0.3
-    vx2 = -0.25
-    vy2 = -0.15
-    vx3 = 0.25
-    vy3 = -0.15
-
-    initial_state = np.array([
-        x1, y1, x2, y2, x3, y3,
-        vx1, vy1, vx2, vy2, vx3, vy3
-    ])
-
-    total_time = 20.0
+    Returns the flat positions of a solution (empty until the first streamed chunk arrives).
+    """
+    half = preset.n_bodies * preset.ndim
+    return solution.y[:half] if solution is not None else np.empty((half, 0))
 
-    return initial_state, total_time
+def make_trajectory(solution):
+    """
+    Returns the interpolated trajectory of a solution, or None if there is none yet.
+    """
+    return HermiteTrajectory(solution.t, solution.y) if solution is not None else None
 
+def display_scale(positions):
+    """
+    Returns the pixels-per-unit scale that fits the positions on screen.
+    """
+    return fit_scale(positions, (WIDTH, HEIGHT))  # Leaves a 50 pixel margin
 
-def get_yin_yang_initial_conditions():
+def hud_lines(solution_name, integrator):
+    """
+    Returns the text overlay as (text, color, top-left position) tuples.
     """
-    Returns the initial conditions for the Yin-Yang Orbit.
+    instructions = [
+        f"Press '{preset.key.upper()}' for {preset.name}" for preset in PRESETS.values()
+    ] + [
+        "Press 'I' to Change the Integrator",
+        "Press UP/DOWN to Speed Up/Slow Down",
+        "Press ESC to Quit"
+    ]
+    return [(f"Current Solution: {solution_name} ({integrator})", (255, 255, 255), (20, 20))] + [
+        (instruction, (200, 200, 200), (20, 40 + i * 20)) for i, instruction in enumerate(instructions)
+    ]
+
+def init_display():
     """
-    # Approximate initial conditions
-    x1 = 0.0
-    y1 = 1.0
-    x2 = 0.0
-    y2 = -1.0
-    x3 = 0.0
-    y3 = 0.0
+    Initializes pygame and opens the window.
 
-    vx1 = 0.6
-    vy1 = 0.0
-    vx2 = -0.6
-    vy2 = 0.0
-    vx3 = 0.0
-    vy3 = 0.0
+    Returns:
+    tuple: (screen, font) - the display surface and the font for the text overlay.
+    """
+    import pygame
 
-    initial_state = np.array([
-        x1, y1, x2, y2, x3, y3,
-        vx1, vy1, vx2, vy2, vx3, vy3
-    ])
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Three-Body Simulation")
+    return screen, pygame.font.SysFont(None, FONT_SIZE)
 
-    total_time = 20.0
+def run_tiles(preset_ids, scheduler):
+    """
+    Plays several presets side by side, one viewport per preset, until the window is closed.
 
-    return initial_state, total_time
+    Parameters:
+    preset_ids (list): Keys of the presets in PRESETS, one tile each.
+    scheduler (FrameScheduler): Decides which tiles render each frame and at what trail detail.
+    """
+    import pygame
+
+    screen, font = init_display()
+    texts = TextCache(font)
+    cache = OrbitCache(backend=BACKEND, sample_tolerance=SAMPLE_TOLERANCE)
+
+    # One tile per preset, each with its own trajectory source; missing orbits share one background thread
+    jobs = IntegrationQueue()
+    viewports = []
+    for k, (preset_id, rect) in enumerate(zip(preset_ids, tile_layout(len(preset_ids), (WIDTH, HEIGHT)))):
+        source = OrbitSource(preset_id, cache, integrator=INTEGRATORS[0], n_samples=N_SAMPLES,
+                             tolerance=TOLERANCE, backend=BACKEND, worker=jobs)
+        viewport = Viewport(source, rect, trail_length=100, rate=PLAYBACK_RATE)
+        if preset_ids.count(preset_id) > 1:
+            viewport.name = f"{viewport.name} #{k + 1}"
+        viewport.attach(screen)
+        viewports.append(viewport)
+
+    screen.fill(BLACK)
+    pygame.display.flip()
+    clock = pygame.time.Clock()
+    sim_speed = 1.0  # Simulation speed multiplier
+    frame = 0
+    running = True
 
+    while running:
+        frame_seconds = clock.tick(60) / 1000.0  # Limit to 60 FPS
 
-def get_dragonfly_initial_conditions():
-    """
-    Returns the initial conditions for the Dragonfly Orbit.
-    """
-    # Approximate initial conditions
-    x1 = -0.5
-    y1 = 0.0
-    x2 = 0.5
-    y2 = 0.0
-    x3 = 0.0
-    y3 = 0.0
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                # Speed up simulation
+                elif event.key == pygame.K_UP:
+                    sim_speed *= 1.1
+                # Slow down simulation
+                elif event.key == pygame.K_DOWN:
+                    sim_speed /= 1.1
 
-    vx1 = 0.0
-    vy1 = 0.5
-    vx2 = 0.0
-    vy2 = -0.5
-    vx3 = 0.0
-    vy3 = 0.0
+        for viewport in viewports:
+            viewport.elapse(frame_seconds)
+            if viewport.source.error is not None:
+                print(f"Integration of {viewport.name} failed: {viewport.source.error}", file=sys.stderr)
+                viewport.source.error = None
+
+        # Label each tile with its name and average render time
+        if frame % LABEL_FRAMES == 0:
+            report = scheduler.report()
+            for viewport in viewports:
+                label = viewport.name
+                if viewport.name in report:
+                    label += f"  {report[viewport.name]['render_ms']:.1f} ms"
+                if scheduler.detail < 1:
+                    label += f"  trails {scheduler.detail:.0%}"
+                viewport.set_overlay([texts.render(label, (255, 255, 255))])
+
+        pygame.display.update(scheduler.run_frame(viewports, frame_seconds, sim_speed))
+        frame += 1
+
+    print_report(scheduler)
+    pygame.quit()
+    sys.exit()
 
-    initial_state = np.array([
-        x1, y1, x2, y2, x3, y3,
-        vx1, vy1, vx2, vy2, vx3, vy3
-    ])
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Animate the three-body presets.")
+    parser.add_argument('--tiles', nargs='+', choices=sorted(PRESETS), metavar='PRESET',
+                        help="play several presets side by side, e.g. --tiles figure_eight butterfly mobius")
+    parser.add_argument('--scheduler', default='budget', choices=sorted(SCHEDULERS),
+                        help="how the tiles share the frame budget (default: budget)")
+    args = parser.parse_args(argv)
+    if args.tiles:
+        run_tiles(args.tiles, SCHEDULERS[args.scheduler]())
 
-    total_time = 20.0
+    import pygame
 
-    return initial_state, total_time
+    screen, font = init_display()
 
+    # Trajectories are computed once per (preset, tolerance, samples, integrator)
+    cache = OrbitCache(backend=BACKEND, sample_tolerance=SAMPLE_TOLERANCE)
+
+    # Keyboard shortcuts for the registered presets
+    preset_keys = {pygame.key.key_code(preset.key): preset_id for preset_id, preset in PRESETS.items()}
 
-def get_mobius_initial_conditions():
-    """
-    Returns the initial conditions for the Möbius Solution.
-    """
-    # Approximate initial conditions
-    x1 = 1.0
-    y1 = 0.0
-    x2 = -0.5
-    y2 = np.sqrt(3)/2
-    x3 = -0.5
-    y3 = -np.sqrt(3)/2
-
-    # Velocities
-    vx1 = 0.0
-    vy1 = -0.5
-    vx2 = 0.433
-    vy2 = 0.25
-    vx3 = -0.433
-    vy3 = 0.25
-
-    initial_state = np.array([
-        x1, y1, x2, y2, x3, y3,
-        vx1, vy1, vx2, vy2, vx3, vy3
-    ])
-
-    total_time = 20.0
-
-    return initial_state, total_time
-
-def main():
     # Default to Figure-Eight Solution
-    initial_state, total_time = get_figure_eight_initial_conditions()
-    solution_name = 'Figure-Eight Solution'
+    preset_id = 'figure_eight'
+    solution_name = PRESETS[preset_id].name
 
-    # Time settings
-    t_eval = np.linspace(0, total_time, 500)
+    integrator = INTEGRATORS[0]
+
+    # Orbits missing from the cache are integrated in a background thread
+    worker = IntegrationWorker()
 
     # Integrate the equations of motion
-    solution = solve_ivp(
-        equations_of_motion,
-        (0, total_time),
-        initial_state,
-        t_eval=t_eval,
-        rtol=1e-10,
-        atol=1e-10
-    )
-
-    # Extract positions
-    positions = solution.y[:6]
+    solution, job = request_solution(cache, worker, preset_id, N_SAMPLES, integrator)
 
-    # Scale positions for display
-    max_coord = np.max(np.abs(positions))
-    scale = (WIDTH // 2 - 50) / max_coord  # Leave some margin
+    # Extract positions (empty until the first streamed chunk arrives)
+    preset = PRESETS[preset_id]
+    positions = extract_positions(solution, preset)
+    colors = body_colors(preset.n_bodies)
+    radius = body_radius(preset.n_bodies)
 
-    # Center of the screen
-    center_x = WIDTH // 2
-    center_y = HEIGHT // 2
+    # Scale positions for display
+    scale = display_scale(positions)
 
     # Time settings
     clock = pygame.time.Clock()
     sim_speed = 1.0  # Simulation speed multiplier
 
+    # Playback in simulation time, interpolated between the stored samples
+    playback = Playback(make_trajectory(solution), rate=PLAYBACK_RATE)
+
     # Animation loop variables
     running = True
-    index = 0
-    time_step = t_eval[1] - t_eval[0]
+
+    # Fading trails on one persistent layer
+    trails = TrailRenderer((WIDTH, HEIGHT), trail_length=100, radius=max(1, radius // 2))
+
+    # Text overlay, re-rendered only when its contents change
+    texts = TextCache(font)
+    hud_key = hud = None
+
+    # Frames only redraw the regions around the bodies and visible trails;
+    # reloads, zooms and overlay changes redraw the whole screen
+    body_rects = []
+    full_redraw = True
 
     while running:
-        clock.tick(60)  # Limit to 60 FPS
+        frame_seconds = clock.tick(60) / 1000.0  # Limit to 60 FPS
         reload_solution = False
 
         for event in pygame.event.get():
@@ -356,146 +287,82 @@ def main():
                 # Slow down simulation
                 elif event.key == pygame.K_DOWN:
                     sim_speed /= 1.1
-                # Select Figure-Eight Solution
-                elif event.key == pygame.K_f:
-                    initial_state, total_time = get_figure_eight_initial_conditions()
-                    solution_name = 'Figure-Eight Solution'
-                    reload_solution = True
-                # Select Lagrange's Solution
-                elif event.key == pygame.K_l:
-                    initial_state, total_time = get_lagrange_initial_conditions()
-                    solution_name = "Lagrange's Solution"
-                    reload_solution = True
-                # Select Euler's Colinear Solution
-                elif event.key == pygame.K_e:
-                    initial_state, total_time = get_euler_colinear_initial_conditions()
-                    solution_name = "Euler's Colinear Solution"
-                    reload_solution = True
-                # Select Broucke-Hénon Retrograde Orbit
-                elif event.key == pygame.K_b:
-                    initial_state, total_time = get_broucke_henon_initial_conditions()
-                    solution_name = "Broucke-Hénon Retrograde Orbit"
-                    reload_solution = True
-                # Select Butterfly Orbit
-                elif event.key == pygame.K_y:  # Using 'Y' for Butterfly
-                    initial_state, total_time = get_butterfly_initial_conditions()
-                    solution_name = "Butterfly Orbit"
-                    reload_solution = True
-                # Select Yin-Yang Orbit
-                elif event.key == pygame.K_u:  # Using 'U' for Yin-Yang
-                    initial_state, total_time = get_yin_yang_initial_conditions()
-                    solution_name = "Yin-Yang Orbit"
-                    reload_solution = True
-                # Select Dragonfly Orbit
-                elif event.key == pygame.K_d:
-                    initial_state, total_time = get_dragonfly_initial_conditions()
-                    solution_name = "Dragonfly Orbit"
+                # Cycle through the integrators
+                elif event.key == pygame.K_i:
+                    integrator = INTEGRATORS[(INTEGRATORS.index(integrator) + 1) % len(INTEGRATORS)]
                     reload_solution = True
-                # Select Möbius Solution
-                elif event.key == pygame.K_m:
-                    initial_state, total_time = get_mobius_initial_conditions()
-                    solution_name = "Möbius Solution"
+                # Select a preset solution
+                elif event.key in preset_keys:
+                    preset_id = preset_keys[event.key]
+                    preset = PRESETS[preset_id]
+                    solution_name = preset.name
                     reload_solution = True
 
             # Outside the event loop:
 
             if reload_solution:
-                t_eval = np.linspace(0, total_time, 10000)
-                solution = solve_ivp(
-                    equations_of_motion,
-                    (0, total_time),
-                    initial_state,
-                    t_eval=t_eval,
-                    rtol=1e-10,
-                    atol=1e-10
-                )
-                
-                positions = solution.y[:6]
-                max_coord = np.max(np.abs(positions))
-                scale = (WIDTH // 2 - 50) / max_coord
-                index = 0  # Reset index
-
-        # Clear the screen
-        SCREEN.fill(BLACK)
-
-        # Update index based on simulation speed
-        index += int(sim_speed)
-        if index >= len(t_eval):
-            index = 0  # Loop the animation
-
-        # Get current positions
-        x1 = positions[0, index]
-        y1 = positions[1, index]
-        x2 = positions[2, index]
-        y2 = positions[3, index]
-        x3 = positions[4, index]
-        y3 = positions[5, index]
-
-        # Convert to screen coordinates
-        def to_screen(x, y):
-            return int(center_x + x * scale), int(center_y - y * scale)
-
-        pos1 = to_screen(x1, y1)
-        pos2 = to_screen(x2, y2)
-        pos3 = to_screen(x3, y3)
-
-        # Draw bodies
-        pygame.draw.circle(SCREEN, BODY_COLORS[0], pos1, 8)
-        pygame.draw.circle(SCREEN, BODY_COLORS[1], pos2, 8)
-        pygame.draw.circle(SCREEN, BODY_COLORS[2], pos3, 8)
-
-        # Optional: Draw trails
-        trail_length = 100
-        for i in range(trail_length):
-            idx = index - i * int(sim_speed)
-            if idx < 0:
-                break
-            alpha = max(255 - i * (255 // trail_length), 0)
-            color1 = (*BODY_COLORS[0], alpha)
-            color2 = (*BODY_COLORS[1], alpha)
-            color3 = (*BODY_COLORS[2], alpha)
-
-            x1_trail = positions[0, idx]
-            y1_trail = positions[1, idx]
-            x2_trail = positions[2, idx]
-            y2_trail = positions[3, idx]
-            x3_trail = positions[4, idx]
-            y3_trail = positions[5, idx]
-
-            pos1_trail = to_screen(x1_trail, y1_trail)
-            pos2_trail = to_screen(x2_trail, y2_trail)
-            pos3_trail = to_screen(x3_trail, y3_trail)
-
-            # Draw trail circles with decreasing alpha
-            trail_surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            pygame.draw.circle(trail_surface, color1, pos1_trail, 4)
-            pygame.draw.circle(trail_surface, color2, pos2_trail, 4)
-            pygame.draw.circle(trail_surface, color3, pos3_trail, 4)
-            SCREEN.blit(trail_surface, (0, 0))
-
-        # Display solution name
-        text_surface = FONT.render(f"Current Solution: {solution_name}", True, (255, 255, 255))
-        SCREEN.blit(text_surface, (20, 20))
-
-        # Display instructions
-        instructions = [
-            "Press 'F' for Figure-Eight Solution",
-            "Press 'L' for Lagrange's Solution",
-            "Press 'E' for Euler's Colinear Solution",
-            "Press 'B' for Broucke-Hénon Orbit",
-            "Press 'Y' for Butterfly Orbit",
-            "Press 'U' for Yin-Yang Orbit",
-            "Press 'D' for Dragonfly Orbit",
-            "Press 'M' for Möbius Solution",
-            "Press UP/DOWN to Speed Up/Slow Down",
-            "Press ESC to Quit"
-        ]
-        for i, instruction in enumerate(instructions):
-            instr_surface = FONT.render(instruction, True, (200, 200, 200))
-            SCREEN.blit(instr_surface, (20, 40 + i * 20))
+                solution, job = request_solution(cache, worker, preset_id, N_SAMPLES, integrator)
+                positions = extract_positions(solution, preset)
+                scale = display_scale(positions)
+                playback.reset(make_trajectory(solution))  # Restart from t = 0
+                colors = body_colors(preset.n_bodies)
+                radius = body_radius(preset.n_bodies)
+                trails.radius = max(1, radius // 2)
+                trails.clear()
+                full_redraw = True
+
+        # Append trajectory chunks streamed by the background worker
+        if job is not None:
+            if job.poll():
+                first_chunk = positions.shape[1] == 0
+                partial = job.result()
+                positions = extract_positions(partial, preset)
+                if first_chunk:
+                    playback.reset(make_trajectory(partial))
+                else:
+                    playback.extend(make_trajectory(partial))
+                # Only ever zoom out, so the view does not jump while the orbit grows
+                new_scale = display_scale(positions) if first_chunk else min(scale, display_scale(positions))
+                if new_scale != scale:
+                    trails.clear()
+                    full_redraw = True
+                scale = new_scale
+            if job.error is not None:
+                print(f"Integration failed: {job.error}", file=sys.stderr)
+                job = None
+            elif job.done:
+                cache.put(preset_id, TOLERANCE, N_SAMPLES, integrator, job.result())
+                job = None
+
+        # Render the overlay text when it changes
+        if (solution_name, integrator) != hud_key:
+            hud_key = (solution_name, integrator)
+            hud = []
+            for text, color, position in hud_lines(solution_name, integrator):
+                surface = texts.render(text, color)
+                hud.append((surface, surface.get_rect(topleft=position)))
+            full_redraw = True
+
+        # Advance the playback time (loops the animation at the end of the orbit)
+        current = playback.advance(frame_seconds, sim_speed)
+
+        # Nothing to draw until the first chunk of a new orbit has arrived
+        points = []
+        if current is not None:
+            # Convert to screen coordinates in one pass (3D systems are viewed along z)
+            points = screen_coordinates(project(current, preset.ndim), (WIDTH, HEIGHT), scale).tolist()
+            trails.update(points, colors)
+
+        # Draw the bodies over their trails, redrawing only the regions that changed
+        dirty, body_rects = draw_frame(screen, trails, points, colors, radius, body_rects, hud,
+                                       background=BLACK, full=full_redraw, max_rects=MAX_DIRTY_RECTS)
 
         # Update the display
-        pygame.display.flip()
+        if dirty is None:
+            pygame.display.flip()
+            full_redraw = False
+        else:
+            pygame.display.update(dirty)
 
     pygame.quit()
     sys.exit()
@@ -0,0 +1,56 @@
+# three_body_simulation/state.py
+#
+# Flat state layout shared by every integrator: all positions (body-major,
+# x, y[, z] per body) followed by all velocities in the same order. The
+# helpers here give named (n_bodies, ndim) views of that layout so callers
+# never unpack state elements by position.
+
+import numpy as np
+
+
+def state_size(n_bodies: int, ndim: int) -> int:
+    """
+    Returns the length of the flat state of n_bodies bodies in ndim dimensions.
+    """
+    return 2 * n_bodies * ndim
+
+
+def split_state(y, n_bodies: int, ndim: int) -> tuple:
+    """
+    Returns views of the positions and velocities in a flat state or trajectory.
+
+    Parameters:
+    y (np.ndarray): Flat state of shape (S,) or trajectory of shape (S, T).
+    n_bodies (int): Number of bodies.
+    ndim (int): Number of spatial dimensions.
+
+    Returns:
+    tuple: (positions, velocities), each of shape (n_bodies, ndim) for a state
+    or (n_bodies, ndim, T) for a trajectory. Writing to them writes to y.
+    """
+    y = np.asarray(y)
+    if y.shape[0] != state_size(n_bodies, ndim):
+        raise ValueError(f"State has {y.shape[0]} elements, expected {state_size(n_bodies, ndim)} "
+                         f"for {n_bodies} bodies in {ndim}D")
+    half = n_bodies * ndim
+    shape = (n_bodies, ndim) + y.shape[1:]
+    return y[:half].reshape(shape), y[half:].reshape(shape)
+
+
+def pack_state(positions, velocities) -> np.ndarray:
+    """
+    Builds a flat state from (n_bodies, ndim) positions and velocities.
+
+    Parameters:
+    positions (array_like): Body positions, shape (n_bodies, ndim).
+    velocities (array_like): Body velocities, shape (n_bodies, ndim).
+
+    Returns:
+    np.ndarray: Flat state of shape (2 * n_bodies * ndim,).
+    """
+    positions = np.asarray(positions, dtype=float)
+    velocities = np.asarray(velocities, dtype=float)
+    if positions.shape != velocities.shape or positions.ndim != 2:
+        raise ValueError(f"positions and velocities must both have shape (n_bodies, ndim), "
+                         f"got {positions.shape} and {velocities.shape}")
+    return np.concatenate([positions.ravel(), velocities.ravel()])
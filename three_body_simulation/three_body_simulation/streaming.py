@@ -0,0 +1,145 @@
+# three_body_simulation/streaming.py
+
+import numpy as np
+
+from three_body_simulation.integrators import integrate
+
+
+class TrajectoryStream:
+    """
+    Resumable integrator that produces a trajectory in fixed-size blocks.
+
+    Samples lie on a uniform grid t_k = t0 + k * sample_interval. Only the
+    current state is kept between blocks, so memory stays bounded by the block
+    size however long the simulation runs. checkpoint() and from_checkpoint()
+    let a run be stopped and resumed later, e.g. in another process.
+    """
+
+    def __init__(self, initial_state, sample_interval: float, t0: float = 0.0, **integrate_kwargs):
+        """
+        Parameters:
+        initial_state (array_like): Flat state (positions followed by velocities).
+        sample_interval (float): Time between consecutive samples.
+        t0 (float): Time of the initial state.
+        **integrate_kwargs: Passed to integrate() (method, rtol, atol, dt, masses, ndim, G, softening, backend).
+        """
+        if sample_interval <= 0:
+            raise ValueError(f"sample_interval must be positive, got {sample_interval}")
+        self.state = np.array(initial_state, dtype=float)
+        self.sample_interval = sample_interval
+        self.t0 = t0
+        self.integrate_kwargs = integrate_kwargs
+        # Number of samples already emitted; the next one is sample index n_emitted
+        self.n_emitted = 0
+        # Set when the integration stopped early, e.g. at a collision
+        self.stopped = False
+
+    @property
+    def t(self) -> float:
+        """
+        Time of the current state.
+        """
+        return self.t0 + max(self.n_emitted - 1, 0) * self.sample_interval
+
+    def next_block(self, block_samples: int) -> tuple:
+        """
+        Integrates and returns the next block of samples.
+
+        The first block starts with the initial state itself; every later block
+        starts one sample interval after the end of the previous one.
+
+        Parameters:
+        block_samples (int): Number of samples in the block.
+
+        Returns:
+        tuple: (t, y) with t of shape (block_samples,) and y of shape (S, block_samples),
+        or fewer samples if the integration stopped early, which sets self.stopped.
+        """
+        if block_samples < 1:
+            raise ValueError("block_samples must be at least 1")
+
+        # The first block includes the initial sample, later blocks continue after it
+        first = 1 if self.n_emitted > 0 else 0
+        n_steps = block_samples - 1 + first
+        start = self.n_emitted - first
+        t = self.t0 + np.arange(start + first, start + first + block_samples) * self.sample_interval
+
+        if n_steps == 0:
+            y = self.state[:, np.newaxis].copy()
+        else:
+            segment = integrate(self.state, n_steps * self.sample_interval, n_samples=n_steps + 1,
+                                **self.integrate_kwargs)
+            y = segment.y[:, first:]
+            self.state = segment.y[:, -1].copy()
+            if segment.y.shape[1] < n_steps + 1:
+                # The integrator gave up partway (solve_ivp returns the samples up to that point)
+                t = t[:y.shape[1]]
+                self.stopped = True
+
+        self.n_emitted += len(t)
+        return t, y
+
+    def blocks(self, block_samples: int, n_samples: int = None):
+        """
+        Yields trajectory blocks lazily, ending early if the integration stops.
+
+        Parameters:
+        block_samples (int): Samples per block (the last block may be shorter).
+        n_samples (int): Total number of samples to emit from now on, or None to run forever.
+
+        Yields:
+        tuple: (t, y) blocks as returned by next_block().
+        """
+        remaining = n_samples
+        while remaining is None or remaining > 0:
+            size = block_samples if remaining is None else min(block_samples, remaining)
+            yield self.next_block(size)
+            if self.stopped:
+                return
+            if remaining is not None:
+                remaining -= size
+
+    def checkpoint(self) -> dict:
+        """
+        Returns everything needed to resume the stream.
+        """
+        return {
+            'state': self.state.copy(),
+            'sample_interval': self.sample_interval,
+            't0': self.t0,
+            'n_emitted': self.n_emitted,
+            'stopped': self.stopped,
+            'integrate_kwargs': dict(self.integrate_kwargs),
+        }
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint: dict) -> 'TrajectoryStream':
+        """
+        Rebuilds a stream from checkpoint(), continuing exactly where it stopped.
+        """
+        stream = cls(checkpoint['state'], checkpoint['sample_interval'], checkpoint['t0'],
+                     **checkpoint['integrate_kwargs'])
+        stream.n_emitted = checkpoint['n_emitted']
+        stream.stopped = checkpoint.get('stopped', False)
+        return stream
+
+
+def stream_trajectory(initial_state, total_time: float, n_samples: int, block_samples: int = 500,
+                      **integrate_kwargs):
+    """
+    Yields the uniformly sampled trajectory on [0, total_time] in blocks.
+
+    Parameters:
+    initial_state (array_like): Flat initial state.
+    total_time (float): Integration end time.
+    n_samples (int): Total number of samples, including t = 0 and t = total_time.
+    block_samples (int): Samples per block.
+    **integrate_kwargs: Passed to integrate().
+
+    Yields:
+    tuple: (t, y) blocks with y of shape (S, block length).
+    """
+    if n_samples < 2:
+        raise ValueError("n_samples must be at least 2")
+    stream = TrajectoryStream(initial_state, total_time / (n_samples - 1), **integrate_kwargs)
+    yield from stream.blocks(block_samples, n_samples)
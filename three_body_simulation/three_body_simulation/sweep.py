@@ -0,0 +1,275 @@
+# three_body_simulation/sweep.py
+# Parameter sweeps for stability maps, spread over a process pool.
+#
+# The grid of initial states and the per-cell results live in shared memory:
+# workers read their cells and write their metrics in place, so nothing but
+# chunk indices is pickled. Completed chunks are checkpointed to disk, so an
+# interrupted sweep resumes where it stopped. Example:
+#
+#   python -m three_body_simulation.sweep --size 64 --span 0.05 --checkpoint map.npz
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from three_body_simulation.events import CloseApproach, Escape
+from three_body_simulation.integrators import integrate
+from three_body_simulation.presets import get_figure_eight_initial_conditions
+from three_body_simulation.shared import SharedArray
+from three_body_simulation.state import split_state
+
+# Per-cell results, in column order
+METRICS = ('return_distance', 'max_radius', 'nfev')
+
+
+@dataclass
+class SweepProgress:
+    """
+    Progress report passed to the progress callback after every chunk.
+
+    done: Cells finished so far (including resumed ones).
+    total: Cells in the sweep.
+    elapsed: Seconds since this run started.
+    cells_per_second: Throughput of this run.
+    """
+    done: int
+    total: int
+    elapsed: float
+    cells_per_second: float
+
+
+@dataclass
+class SweepResult:
+    """
+    Stability map.
+
+    metrics: One array per name in METRICS, with the grid's shape.
+    n_computed: Cells integrated by this run (the rest came from the checkpoint).
+    elapsed: Wall-clock seconds of this run.
+    cells_per_second: Throughput of this run.
+    """
+    metrics: dict
+    n_computed: int
+    elapsed: float
+    cells_per_second: float
+
+
+def perturbation_grid(initial_state, index_a: int, offsets_a, index_b: int, offsets_b) -> np.ndarray:
+    """
+    Builds a 2D grid of initial states around a reference state.
+
+    Parameters:
+    initial_state (array_like): Reference flat state.
+    index_a (int): State component varied along the first grid axis.
+    offsets_a (array_like): Offsets added to that component.
+    index_b (int): State component varied along the second grid axis.
+    offsets_b (array_like): Offsets added to that component.
+
+    Returns:
+    np.ndarray: States of shape (len(offsets_a), len(offsets_b), S).
+    """
+    offsets_a = np.asarray(offsets_a, dtype=float)
+    offsets_b = np.asarray(offsets_b, dtype=float)
+    states = np.tile(np.asarray(initial_state, dtype=float), (len(offsets_a), len(offsets_b), 1))
+    states[:, :, index_a] += offsets_a[:, np.newaxis]
+    states[:, :, index_b] += offsets_b[np.newaxis, :]
+    return states
+
+
+def cell_metrics(state, total_time: float, integrate_kwargs: dict) -> np.ndarray:
+    """
+    Integrates one cell and returns its METRICS.
+
+    return_distance is the distance in state space between the final and
+    initial states (0 for an exactly periodic orbit), max_radius is the
+    largest distance of a body from the center of mass at the end (large for
+    escapes), nfev the number of force evaluations. Cells stopped early by a
+    terminal event (see events.py) are flagged like solver failures.
+    """
+    result = integrate(state, total_time, n_samples=2, **integrate_kwargs)
+    final = result.y[:, -1]
+    ndim = integrate_kwargs.get('ndim', 2)
+    masses = np.asarray(integrate_kwargs.get('masses', (1.0, 1.0, 1.0)))
+    positions, _ = split_state(final, len(masses), ndim)
+    center = masses @ positions / masses.sum()
+    if result.t[-1] < total_time:
+        # The solver gave up or a terminal event fired (e.g. at a collision): flag the cell as unstable
+        return np.array([np.inf, np.inf, result.nfev])
+    return np.array([
+        np.linalg.norm(final - state),
+        np.max(np.linalg.norm(positions - center, axis=1)),
+        result.nfev,
+    ])
+
+
+def _fingerprint(states, total_time, integrate_kwargs) -> str:
+    # Identifies a sweep, so a checkpoint is never resumed for different inputs
+    digest = hashlib.sha1(np.ascontiguousarray(states).tobytes())
+    digest.update(json.dumps([total_time, integrate_kwargs], sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+# Worker-process globals, set once per process by _init_worker
+_worker = {}
+
+
+def _init_worker(states_spec, results_spec, total_time, integrate_kwargs):
+    _worker['shared'] = (SharedArray.attach(states_spec), SharedArray.attach(results_spec))
+    _worker['states'], _worker['results'] = (shared.array for shared in _worker['shared'])
+    _worker['total_time'] = total_time
+    _worker['integrate_kwargs'] = integrate_kwargs
+
+
+def _run_chunk(chunk: tuple) -> tuple:
+    # Integrate cells [start, stop) and write their metrics in place
+    start, stop = chunk
+    states, results = _worker['states'], _worker['results']
+    for cell in range(start, stop):
+        results[cell] = cell_metrics(states[cell], _worker['total_time'], _worker['integrate_kwargs'])
+    return chunk
+
+
+def _save_checkpoint(path: Path, fingerprint: str, done, results) -> None:
+    # Write to a temporary file first so an interrupt never leaves a broken checkpoint
+    tmp_path = path.with_suffix('.tmp.npz')
+    np.savez(tmp_path, fingerprint=fingerprint, done=done, results=results)
+    os.replace(tmp_path, path)
+
+
+def run_sweep(states, total_time: float, processes: int = None, chunk_size: int = 16,
+              checkpoint=None, checkpoint_interval: float = 10.0, progress=None,
+              **integrate_kwargs) -> SweepResult:
+    """
+    Integrates every cell of a grid of initial states in a process pool.
+
+    Parameters:
+    states (array_like): Initial states, shape (..., S); the leading shape is the grid.
+    total_time (float): Integration time of every cell.
+    processes (int): Worker processes; None for one per CPU, 1 to run in this process.
+    chunk_size (int): Cells per work unit.
+    checkpoint (str or Path): File recording finished chunks; an existing checkpoint
+        of the same sweep is resumed.
+    checkpoint_interval (float): Seconds between checkpoint writes.
+    progress (callable): Called with a SweepProgress after every chunk.
+    **integrate_kwargs: Passed to integrate() (method, rtol, atol, masses, ndim, ...).
+
+    Returns:
+    SweepResult: The per-cell metrics.
+    """
+    states = np.asarray(states, dtype=float)
+    grid_shape = states.shape[:-1]
+    flat_states = states.reshape(-1, states.shape[-1])
+    n_cells = len(flat_states)
+    chunks = [(start, min(start + chunk_size, n_cells)) for start in range(0, n_cells, chunk_size)]
+
+    with SharedArray(flat_states.shape) as shared_states, \
+            SharedArray((n_cells, len(METRICS)), fill=np.nan) as shared_results:
+        shared_states.array[:] = flat_states
+        results = shared_results.array
+        done = np.zeros(len(chunks), dtype=bool)
+
+        # Resume finished chunks from a checkpoint of the same sweep
+        fingerprint = _fingerprint(flat_states, total_time, integrate_kwargs)
+        checkpoint = Path(checkpoint) if checkpoint is not None else None
+        if checkpoint is not None and checkpoint.exists():
+            with np.load(checkpoint) as saved:
+                if str(saved['fingerprint']) == fingerprint and len(saved['done']) == len(chunks):
+                    done[:] = saved['done']
+                    results[:] = saved['results']
+        chunk_index = {chunk: i for i, chunk in enumerate(chunks)}
+        pending = [chunk for chunk, finished in zip(chunks, done) if not finished]
+        n_resumed = n_cells - sum(stop - start for start, stop in pending)
+
+        init_args = (shared_states.spec, shared_results.spec, total_time, integrate_kwargs)
+        start_time = time.perf_counter()
+        last_save = start_time
+        n_computed = 0
+
+        def finish(chunk):
+            nonlocal n_computed, last_save
+            done[chunk_index[chunk]] = True
+            n_computed += chunk[1] - chunk[0]
+            now = time.perf_counter()
+            if checkpoint is not None and now - last_save >= checkpoint_interval:
+                _save_checkpoint(checkpoint, fingerprint, done, results)
+                last_save = now
+            if progress is not None:
+                elapsed = now - start_time
+                progress(SweepProgress(n_resumed + n_computed, n_cells, elapsed,
+                                       n_computed / elapsed if elapsed > 0 else 0.0))
+
+        try:
+            if processes == 1:
+                _init_worker(*init_args)
+                for chunk in pending:
+                    finish(_run_chunk(chunk))
+            else:
+                with multiprocessing.Pool(processes, initializer=_init_worker, initargs=init_args) as pool:
+                    for chunk in pool.imap_unordered(_run_chunk, pending):
+                        finish(chunk)
+        finally:
+            # Drop the in-process views before detaching from the shared memory
+            attached = _worker.pop('shared', ())
+            _worker.clear()
+            for shared in attached:
+                shared.close()
+            # Record whatever finished, also when interrupted
+            if checkpoint is not None:
+                _save_checkpoint(checkpoint, fingerprint, done, results)
+
+        elapsed = time.perf_counter() - start_time
+        metrics = {name: results[:, k].reshape(grid_shape).copy() for k, name in enumerate(METRICS)}
+        return SweepResult(metrics, n_computed, elapsed, n_computed / elapsed if elapsed > 0 else 0.0)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Stability map around the figure-eight orbit.")
+    parser.add_argument('--size', type=int, default=32, help="grid cells per axis")
+    parser.add_argument('--span', type=float, default=0.05, help="largest perturbation")
+    parser.add_argument('--index-a', type=int, default=0, help="state component on the first axis (x1)")
+    parser.add_argument('--index-b', type=int, default=7, help="state component on the second axis (vy1)")
+    parser.add_argument('--method', default='RK45')
+    parser.add_argument('--tolerance', type=float, default=1e-9)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=16)
+    parser.add_argument('--collision-distance', type=float, default=None,
+                        help="stop a cell when two bodies come closer than this")
+    parser.add_argument('--escape-distance', type=float, default=None,
+                        help="stop a cell when a body escapes beyond this distance")
+    parser.add_argument('--checkpoint', default=None, help="checkpoint file, resumed if present")
+    parser.add_argument('--output', default='stability_map.npz')
+    args = parser.parse_args(argv)
+
+    initial_state, total_time = get_figure_eight_initial_conditions()
+    offsets = np.linspace(-args.span, args.span, args.size)
+    states = perturbation_grid(initial_state, args.index_a, offsets, args.index_b, offsets)
+
+    events = []
+    if args.collision_distance is not None:
+        events.append(CloseApproach(args.collision_distance))
+    if args.escape_distance is not None:
+        events.append(Escape(args.escape_distance))
+
+    def report(p):
+        print(f"\r{p.done}/{p.total} cells, {p.cells_per_second:.1f} cells/s", end='', file=sys.stderr)
+
+    result = run_sweep(states, total_time, processes=args.processes, chunk_size=args.chunk_size,
+                       checkpoint=args.checkpoint, progress=report, method=args.method,
+                       rtol=args.tolerance, atol=args.tolerance, events=events or None)
+    print(file=sys.stderr)
+    np.savez(args.output, offsets_a=offsets, offsets_b=offsets, **result.metrics)
+    print(f"Computed {result.n_computed} cells in {result.elapsed:.1f} s "
+          f"({result.cells_per_second:.1f} cells/s), saved to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,315 @@
+# three_body_simulation/trajfile.py
+#
+# Binary trajectory format:
+#
+#   [header, HEADER_SIZE bytes]
+#       magic      8 bytes   b'TBTRAJ01'
+#       n_samples  uint64    number of valid samples (updated as the file grows)
+#       meta_len   uint32    length of the JSON metadata
+#       metadata   JSON      masses, G, preset, integrator, rtol, atol, dt, ...
+#       zero padding
+#   [block 0][block 1]...
+#       t  (block_samples,)                          sample times
+#       y  (n_bodies, block_samples, 2 * ndim)        per-body x, y[, z], vx, vy[, vz]
+#
+# Blocks have a fixed size, so sample i lives in block i // block_samples at
+# offset i % block_samples and the data region can be memory-mapped as an
+# array of blocks. Within a block each body's samples are contiguous.
+
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b'TBTRAJ01'
+HEADER_SIZE = 4096
+_COUNT_OFFSET = len(MAGIC)
+_PREFIX = struct.Struct('<8sQI')
+
+
+def _block_dtype(n_bodies: int, ndim: int, block_samples: int, dtype) -> np.dtype:
+    return np.dtype([
+        ('t', dtype, (block_samples,)),
+        ('y', dtype, (n_bodies, block_samples, 2 * ndim)),
+    ])
+
+
+def _to_body_major(y: np.ndarray, n_bodies: int, ndim: int) -> np.ndarray:
+    # Flat states (S, k) -> (n_bodies, k, 2 * ndim)
+    half = n_bodies * ndim
+    k = y.shape[1]
+    positions = y[:half].reshape(n_bodies, ndim, k)
+    velocities = y[half:].reshape(n_bodies, ndim, k)
+    return np.concatenate([positions, velocities], axis=1).transpose(0, 2, 1)
+
+
+def _to_flat(body_major: np.ndarray, n_bodies: int, ndim: int) -> np.ndarray:
+    # (n_bodies, k, 2 * ndim) -> flat states (S, k)
+    k = body_major.shape[1]
+    columns = body_major.transpose(0, 2, 1)
+    positions = columns[:, :ndim].reshape(n_bodies * ndim, k)
+    velocities = columns[:, ndim:].reshape(n_bodies * ndim, k)
+    return np.concatenate([positions, velocities])
+
+
+def _read_header(handle) -> tuple:
+    handle.seek(0)
+    prefix = handle.read(_PREFIX.size)
+    if len(prefix) < _PREFIX.size:
+        raise ValueError("Not a trajectory file: header is truncated")
+    magic, n_samples, meta_len = _PREFIX.unpack(prefix)
+    if magic != MAGIC:
+        raise ValueError(f"Not a trajectory file: bad magic {magic!r}")
+    metadata = json.loads(handle.read(meta_len).decode('utf-8'))
+    return n_samples, metadata
+
+
+class TrajectoryWriter:
+    """
+    Appends trajectory chunks to a trajectory file.
+
+    Full blocks are written as soon as they fill up; flush() also writes the
+    current partial block (zero padded) and updates the sample count, so a
+    reader opened afterwards sees every sample appended so far.
+    """
+
+    def __init__(self, path, n_bodies: int = None, ndim: int = None, block_samples: int = 1024,
+                 dtype='float64', mode: str = 'w', **metadata):
+        """
+        Parameters:
+        path (str or Path): File to write.
+        n_bodies (int): Number of bodies (mode 'w' only).
+        ndim (int): Number of spatial dimensions (mode 'w' only).
+        block_samples (int): Samples per block (mode 'w' only).
+        dtype (str): 'float64' or 'float32' (mode 'w' only).
+        mode (str): 'w' to create the file, 'a' to append to an existing one.
+        **metadata: Extra JSON-serialisable header fields, e.g. masses, G, preset,
+            integrator, rtol, atol, dt.
+        """
+        self.path = Path(path)
+        if mode == 'w':
+            if n_bodies is None or ndim is None:
+                raise ValueError("n_bodies and ndim are required to create a trajectory file")
+            if np.dtype(dtype) not in (np.dtype('float64'), np.dtype('float32')):
+                raise ValueError(f"dtype must be float64 or float32, got {dtype}")
+            self.metadata = {
+                'n_bodies': n_bodies,
+                'ndim': ndim,
+                'block_samples': block_samples,
+                'dtype': np.dtype(dtype).name,
+                **metadata,
+            }
+            # NumPy arrays and scalars (e.g. masses) are stored as plain JSON lists/numbers
+            encoded = json.dumps(self.metadata, default=lambda value: np.asarray(value).tolist()).encode('utf-8')
+            if _PREFIX.size + len(encoded) > HEADER_SIZE:
+                raise ValueError("Metadata does not fit in the trajectory header")
+            self._handle = open(self.path, 'w+b')
+            self._handle.write(_PREFIX.pack(MAGIC, 0, len(encoded)) + encoded)
+            self._handle.write(b'\0' * (HEADER_SIZE - _PREFIX.size - len(encoded)))
+            n_samples = 0
+        elif mode == 'a':
+            self._handle = open(self.path, 'r+b')
+            n_samples, self.metadata = _read_header(self._handle)
+        else:
+            raise ValueError(f"mode must be 'w' or 'a', got '{mode}'")
+
+        meta = self.metadata
+        self._n_bodies = meta['n_bodies']
+        self._ndim = meta['ndim']
+        self._block_samples = meta['block_samples']
+        self._block_dtype = _block_dtype(self._n_bodies, self._ndim, self._block_samples, meta['dtype'])
+        self._block = np.zeros((), dtype=self._block_dtype)
+        self._n_full, self._filled = divmod(n_samples, self._block_samples)
+
+        # Resume a partially filled last block
+        if self._filled:
+            self._handle.seek(self._block_offset(self._n_full))
+            raw = self._handle.read(self._block_dtype.itemsize)
+            self._block = np.frombuffer(raw, dtype=self._block_dtype).copy().reshape(())
+
+    @property
+    def n_samples(self) -> int:
+        """
+        Number of samples appended so far.
+        """
+        return self._n_full * self._block_samples + self._filled
+
+    def _block_offset(self, block_index: int) -> int:
+        return HEADER_SIZE + block_index * self._block_dtype.itemsize
+
+    def _write_block(self) -> None:
+        # The block being filled always sits right after the full blocks
+        self._handle.seek(self._block_offset(self._n_full))
+        self._handle.write(self._block.tobytes())
+
+    def append(self, t, y) -> None:
+        """
+        Appends samples.
+
+        Parameters:
+        t (array_like): Sample times, shape (k,).
+        y (np.ndarray): Flat states, shape (S, k), as in solve_ivp's result.
+        """
+        t = np.asarray(t)
+        body_major = _to_body_major(np.asarray(y), self._n_bodies, self._ndim)
+        written = 0
+        while written < len(t):
+            take = min(self._block_samples - self._filled, len(t) - written)
+            self._block['t'][self._filled:self._filled + take] = t[written:written + take]
+            self._block['y'][:, self._filled:self._filled + take] = body_major[:, written:written + take]
+            self._filled += take
+            written += take
+            if self._filled == self._block_samples:
+                self._write_block()
+                self._n_full += 1
+                self._block = np.zeros((), dtype=self._block_dtype)
+                self._filled = 0
+
+    def flush(self) -> None:
+        """
+        Writes the partial block and the sample count to disk.
+        """
+        if self._filled:
+            self._write_block()
+        self._handle.seek(_COUNT_OFFSET)
+        self._handle.write(struct.pack('<Q', self.n_samples))
+        self._handle.flush()
+
+    def close(self) -> None:
+        """
+        Flushes and closes the file.
+        """
+        if not self._handle.closed:
+            self.flush()
+            self._handle.close()
+
+    def __enter__(self) -> 'TrajectoryWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class TrajectoryReader:
+    """
+    Memory-mapped random access to a trajectory file.
+
+    Only the blocks touched by a request are read from disk.
+    """
+
+    def __init__(self, path):
+        """
+        Parameters:
+        path (str or Path): File to read.
+        """
+        self.path = Path(path)
+        with open(self.path, 'rb') as handle:
+            self.n_samples, self.metadata = _read_header(handle)
+        meta = self.metadata
+        self.n_bodies = meta['n_bodies']
+        self.ndim = meta['ndim']
+        self.block_samples = meta['block_samples']
+        n_blocks = -(-self.n_samples // self.block_samples)
+        block_dtype = _block_dtype(self.n_bodies, self.ndim, self.block_samples, meta['dtype'])
+        if n_blocks:
+            self._blocks = np.memmap(self.path, dtype=block_dtype, mode='r', offset=HEADER_SIZE,
+                                     shape=(n_blocks,))
+        else:
+            self._blocks = np.zeros(0, dtype=block_dtype)
+
+    def __len__(self) -> int:
+        return self.n_samples
+
+    def _range(self, start, stop):
+        start, stop, _ = slice(start, stop).indices(self.n_samples)
+        return start, max(stop, start)
+
+    def _gather(self, field, start, stop, body=None):
+        # Concatenate the parts of the blocks covering samples [start, stop)
+        parts = []
+        index = start
+        while index < stop:
+            block, offset = divmod(index, self.block_samples)
+            take = min(self.block_samples - offset, stop - index)
+            data = self._blocks[field][block]
+            if field == 't':
+                parts.append(data[offset:offset + take])
+            elif body is None:
+                parts.append(data[:, offset:offset + take])
+            else:
+                parts.append(data[body, offset:offset + take])
+            index += take
+        if field == 'y' and body is None:
+            if not parts:
+                return np.empty((self.n_bodies, 0, 2 * self.ndim))
+            return np.concatenate(parts, axis=1)
+        if not parts:
+            return np.empty((0,) if field == 't' else (0, 2 * self.ndim))
+        return np.concatenate(parts)
+
+    def times(self, start: int = None, stop: int = None) -> np.ndarray:
+        """
+        Returns the sample times in [start, stop).
+        """
+        return self._gather('t', *self._range(start, stop))
+
+    def states(self, start: int = None, stop: int = None) -> np.ndarray:
+        """
+        Returns flat states (S, k) for the samples in [start, stop).
+        """
+        start, stop = self._range(start, stop)
+        return _to_flat(self._gather('y', start, stop), self.n_bodies, self.ndim)
+
+    def body(self, body: int, start: int = None, stop: int = None) -> np.ndarray:
+        """
+        Returns one body's (k, 2 * ndim) positions and velocities for [start, stop).
+        """
+        return self._gather('y', *self._range(start, stop), body=body)
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        """
+        Returns the flat state at one time index.
+        """
+        if index < 0:
+            index += self.n_samples
+        if not 0 <= index < self.n_samples:
+            raise IndexError(f"Sample {index} out of range for {self.n_samples} samples")
+        return self.states(index, index + 1)[:, 0]
+
+
+def save_trajectory(path, t, y, n_bodies: int = 3, ndim: int = 2, **metadata) -> None:
+    """
+    Writes a whole trajectory to a new file.
+
+    Parameters:
+    path (str or Path): File to write.
+    t (array_like): Sample times, shape (k,).
+    y (np.ndarray): Flat states, shape (S, k).
+    n_bodies (int): Number of bodies.
+    ndim (int): Number of spatial dimensions.
+    **metadata: Header fields and writer options (block_samples, dtype, masses, ...).
+    """
+    with TrajectoryWriter(path, n_bodies, ndim, **metadata) as writer:
+        writer.append(t, y)
+
+
+def write_stream(path, blocks, n_bodies: int = 3, ndim: int = 2, **metadata) -> int:
+    """
+    Writes (t, y) blocks, e.g. from TrajectoryStream.blocks(), flushing after each one.
+
+    Parameters:
+    path (str or Path): File to write.
+    blocks (iterable): (t, y) blocks with y of shape (S, k).
+    n_bodies (int): Number of bodies.
+    ndim (int): Number of spatial dimensions.
+    **metadata: Header fields and writer options.
+
+    Returns:
+    int: Number of samples written.
+    """
+    with TrajectoryWriter(path, n_bodies, ndim, **metadata) as writer:
+        for t, y in blocks:
+            writer.append(t, y)
+            writer.flush()
+        return writer.n_samples
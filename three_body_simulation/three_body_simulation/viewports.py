@@ -0,0 +1,383 @@
+# three_body_simulation/viewports.py
+#
+# Tiled view of several orbits side by side, e.g. Figure-Eight, Butterfly and
+# Moebius at once.
+#
+# Each Viewport owns an OrbitSource (a cached or streamed trajectory) and
+# draws into its own subsurface of the window with the same dirty-rectangle
+# frames as the single view. A frame scheduler decides which viewports
+# render in each frame and with how much trail detail, and keeps per-tile
+# render times. Schedulers are pluggable: subclass FrameScheduler and
+# register the class in SCHEDULERS. Example:
+#
+#   python -m three_body_simulation.simulation --tiles figure_eight butterfly mobius
+
+import math
+import sys
+import time
+
+from three_body_simulation.playback import HermiteTrajectory, Playback
+from three_body_simulation.presets import PRESETS
+from three_body_simulation.rendering import (
+    TrailRenderer, body_colors, body_radius, draw_frame, fit_scale, project, screen_coordinates,
+)
+from three_body_simulation.worker import IntegrationWorker
+
+# Fractions of the full trail length a scheduler can fall back to, most detailed first
+DETAIL_LEVELS = (1.0, 0.5, 0.25, 0.0)
+
+
+class OrbitSource:
+    """
+    Trajectory of one preset: taken from the cache, or streamed in by a background worker.
+    """
+
+    def __init__(self, preset_id: str, cache, integrator: str = 'RK45', n_samples: int = 2000,
+                 tolerance: float = 1e-10, backend: str = 'numpy', worker=None):
+        """
+        Parameters:
+        preset_id (str): Key of the preset in PRESETS.
+        cache (OrbitCache): Cache to look the trajectory up in and store it to once computed.
+        integrator (str): Integration method.
+        n_samples (int): Number of samples.
+        tolerance (float): rtol and atol of the adaptive integrators.
+        backend (str): Force backend of the worker, 'numpy' or 'numba'.
+        worker (IntegrationQueue): Runs the integration of a missing trajectory. Sources can share
+            one IntegrationQueue; by default each gets an IntegrationWorker of its own.
+        """
+        self.preset_id = preset_id
+        self.preset = PRESETS[preset_id]
+        self.cache = cache
+        self.key = (preset_id, tolerance, n_samples, integrator)
+        self.error = None
+        self.job = None
+        self.solution = cache.lookup(*self.key)
+        if self.solution is None:
+            self.worker = worker if worker is not None else IntegrationWorker()
+            initial_state, total_time = self.preset.initial_conditions()
+            self.job = self.worker.submit(initial_state, total_time, n_samples, method=integrator,
+                                          rtol=tolerance, atol=tolerance, backend=backend, **self.preset.system)
+
+    def poll(self) -> bool:
+        """
+        Collects the chunks streamed since the last call, without blocking.
+
+        Returns:
+        bool: True if the trajectory grew.
+        """
+        if self.job is None:
+            return False
+        grew = bool(self.job.poll())
+        if grew:
+            self.solution = self.job.result()
+        if self.job.error is not None:
+            self.error = self.job.error
+            self.job = None
+        elif self.job.done:
+            self.cache.put(*self.key, self.job.result())
+            self.job = None
+        return grew
+
+    @property
+    def trajectory(self) -> HermiteTrajectory:
+        """
+        Interpolated trajectory received so far, or None before the first chunk.
+        """
+        if self.solution is None or not len(self.solution.t):
+            return None
+        return HermiteTrajectory(self.solution.t, self.solution.y)
+
+    def plane_positions(self):
+        """
+        Plane coordinates of the samples received so far, shape (n_bodies, 2, k).
+        """
+        preset = self.preset
+        half = preset.n_bodies * preset.ndim
+        positions = self.solution.y[:half] if self.solution is not None else []
+        return project(positions, preset.ndim) if len(positions) else positions
+
+
+class Viewport:
+    """
+    One tile of the window: an orbit played back into its own subsurface.
+
+    Wall-clock time is added with elapse() every frame, rendered or not, so
+    a viewport the scheduler skips catches up on its next render instead of
+    falling behind the others.
+    """
+
+    def __init__(self, source: OrbitSource, rect, trail_length: int = 100, rate: float = 1.0):
+        """
+        Parameters:
+        source (OrbitSource): Trajectory to show.
+        rect (tuple): (x, y, width, height) of the tile in the window.
+        trail_length (int): Number of frames a trail dot stays visible at full detail.
+        rate (float): Simulation time per wall-clock second at speed 1.
+        """
+        import pygame
+
+        self.source = source
+        # Unique name of the tile, used by the schedulers' statistics
+        self.name = source.preset.name
+        self.rect = pygame.Rect(rect)
+        self.surface = None
+        self.playback = Playback(source.trajectory, rate=rate)
+        self.colors = body_colors(source.preset.n_bodies)
+        self.radius = body_radius(source.preset.n_bodies)
+        self.trail_length = trail_length
+        self.trails = TrailRenderer(self.rect.size, trail_length=trail_length, radius=max(1, self.radius // 2))
+        self.scale = fit_scale(source.plane_positions(), self.rect.size)
+        self.pending = 0.0
+        self.overlay = []
+        self.body_rects = []
+        self.full_redraw = True
+
+    def attach(self, screen) -> None:
+        """
+        Draws into the viewport's region of the window surface from now on.
+        """
+        self.surface = screen.subsurface(self.rect)
+        self.full_redraw = True
+
+    def elapse(self, wall_seconds: float) -> None:
+        """
+        Adds wall-clock time to be played at the next render.
+        """
+        self.pending += wall_seconds
+
+    def set_overlay(self, surfaces) -> None:
+        """
+        Replaces the text shown in the tile's top-left corner, one surface per line.
+        """
+        self.overlay = [(surface, surface.get_rect(topleft=(8, 8 + 18 * i))) for i, surface in enumerate(surfaces)]
+        self.full_redraw = True
+
+    def _follow_source(self) -> None:
+        # Take in newly streamed samples, zooming out only so the view does not jump
+        first_chunk = self.playback.trajectory is None
+        if not self.source.poll():
+            return
+        if first_chunk:
+            self.playback.reset(self.source.trajectory)
+            scale = fit_scale(self.source.plane_positions(), self.rect.size)
+        else:
+            self.playback.extend(self.source.trajectory)
+            scale = min(self.scale, fit_scale(self.source.plane_positions(), self.rect.size))
+        if scale != self.scale:
+            self.scale = scale
+            self.trails.clear()
+            self.full_redraw = True
+
+    def render(self, speed: float = 1.0, detail: float = 1.0) -> list:
+        """
+        Advances the playback by the elapsed time and draws the tile.
+
+        Parameters:
+        speed (float): Speed multiplier.
+        detail (float): Fraction of the full trail length to draw; 0 hides the trails.
+
+        Returns:
+        list: Changed rectangles in window coordinates.
+        """
+        self._follow_source()
+        trail_length = int(self.trail_length * detail)
+        if trail_length < 1:
+            if self.trails.dirty_rects():
+                self.trails.clear()
+                self.full_redraw = True
+        elif trail_length != self.trails.trail_length:
+            self.trails.set_trail_length(trail_length)
+
+        current = self.playback.advance(self.pending, speed)
+        self.pending = 0.0
+        points = []
+        if current is not None:
+            points = screen_coordinates(project(current, self.source.preset.ndim), self.rect.size, self.scale).tolist()
+            if trail_length >= 1:
+                self.trails.update(points, self.colors)
+
+        rects, self.body_rects = draw_frame(self.surface, self.trails, points, self.colors, self.radius,
+                                            self.body_rects, self.overlay, full=self.full_redraw)
+        if rects is None:
+            self.full_redraw = False
+            return [self.rect.copy()]
+        return [rect.move(self.rect.topleft).clip(self.rect) for rect in rects]
+
+
+def tile_layout(n_tiles: int, size, gap: int = 2) -> list:
+    """
+    Splits a window into a grid of equal tiles, filled row by row.
+
+    Parameters:
+    n_tiles (int): Number of tiles.
+    size (tuple): (width, height) of the window in pixels.
+    gap (int): Pixels left between neighbouring tiles.
+
+    Returns:
+    list: (x, y, width, height) of each tile.
+    """
+    columns = math.ceil(math.sqrt(n_tiles))
+    rows = math.ceil(n_tiles / columns)
+    width = (size[0] - gap * (columns - 1)) // columns
+    height = (size[1] - gap * (rows - 1)) // rows
+    return [((k % columns) * (width + gap), (k // columns) * (height + gap), width, height) for k in range(n_tiles)]
+
+
+class FrameScheduler:
+    """
+    Renders every viewport in every frame at full detail, timing each one.
+
+    Subclasses decide which viewports render (schedule) and how much trail
+    detail they draw (adapt); run_frame does the rendering and timing.
+    """
+
+    def __init__(self, budget: float = 1 / 60, smoothing: float = 0.1, timer=time.perf_counter):
+        """
+        Parameters:
+        budget (float): Target frame time in seconds.
+        smoothing (float): Weight of the newest frame in the moving averages.
+        timer (callable): Returns the current time in seconds; render times are measured with it.
+        """
+        self.budget = budget
+        self.smoothing = smoothing
+        self.timer = timer
+        self.detail = DETAIL_LEVELS[0]
+        self.frame_time = budget
+        self.render_time = 0.0
+        self._stats = {}
+
+    def schedule(self, viewports, clock):
+        """
+        Returns (or yields) the viewports to render this frame, in order.
+
+        clock() gives the seconds spent rendering so far in this frame.
+        """
+        return list(viewports)
+
+    def adapt(self) -> None:
+        """
+        Adjusts self.detail from the moving averages of the frame and render times.
+        """
+
+    def _average(self, old: float, new: float) -> float:
+        return old + self.smoothing * (new - old)
+
+    def run_frame(self, viewports, frame_seconds: float, speed: float = 1.0) -> list:
+        """
+        Renders the scheduled viewports of one frame.
+
+        Parameters:
+        viewports (list): All viewports, each with the wall time of this frame already elapsed.
+        frame_seconds (float): Wall-clock time since the previous frame.
+        speed (float): Speed multiplier.
+
+        Returns:
+        list: Changed rectangles in window coordinates.
+        """
+        self.frame_time = self._average(self.frame_time, frame_seconds)
+        start = self.timer()
+        rects = []
+        rendered = set()
+        for viewport in self.schedule(viewports, lambda: self.timer() - start):
+            began = self.timer()
+            rects += viewport.render(speed, self.detail)
+            self._record(viewport, self.timer() - began)
+            rendered.add(viewport.name)
+        for viewport in viewports:
+            if viewport.name not in rendered:
+                self._stats.setdefault(viewport.name, [0.0, 0, 0])[2] += 1
+        self.render_time = self._average(self.render_time, self.timer() - start)
+        self.adapt()
+        return rects
+
+    def _record(self, viewport, seconds: float) -> None:
+        stats = self._stats.setdefault(viewport.name, [seconds, 0, 0])
+        stats[0] = self._average(stats[0], seconds) if stats[1] else seconds
+        stats[1] += 1
+
+    def estimate(self, viewport) -> float:
+        """
+        Returns the moving average of a viewport's render time in seconds (0 before its first render).
+        """
+        stats = self._stats.get(viewport.name)
+        return stats[0] if stats else 0.0
+
+    def report(self) -> dict:
+        """
+        Per-tile statistics: average render time in milliseconds and the number of frames rendered and skipped.
+        """
+        return {name: {'render_ms': 1e3 * seconds, 'rendered': rendered, 'skipped': skipped}
+                for name, (seconds, rendered, skipped) in self._stats.items()}
+
+
+class BudgetScheduler(FrameScheduler):
+    """
+    Shares the frame budget across the viewports.
+
+    Viewports render longest-waiting first. Once the next one's average
+    render time would overrun the share of the budget left for rendering,
+    the rest wait for the next frame (at least one viewport always renders).
+    When the frame rate falls behind the budget, or rendering alone takes
+    up its share, the trail detail drops one of DETAIL_LEVELS; it comes back
+    once rendering takes less than half its share. Detail changes at most
+    once per hold frames.
+    """
+
+    def __init__(self, budget: float = 1 / 60, smoothing: float = 0.1, render_share: float = 0.75,
+                 hold: int = 30, timer=time.perf_counter):
+        """
+        Parameters:
+        budget (float): Target frame time in seconds.
+        smoothing (float): Weight of the newest frame in the moving averages.
+        render_share (float): Part of the budget available for rendering; the rest is left for the display update.
+        hold (int): Frames between detail changes.
+        timer (callable): Returns the current time in seconds; render times are measured with it.
+        """
+        super().__init__(budget, smoothing, timer)
+        self.render_share = render_share
+        self.hold = hold
+        self._waiting = {}
+        self._since_change = 0
+
+    def schedule(self, viewports, clock):
+        # Frames each viewport has waited, counting this one
+        for viewport in viewports:
+            self._waiting[viewport.name] = self._waiting.get(viewport.name, 0) + 1
+        order = sorted(viewports, key=lambda viewport: -self._waiting[viewport.name])
+        # Yielded one at a time, so clock() includes the viewports already rendered
+        for k, viewport in enumerate(order):
+            if k and clock() + self.estimate(viewport) > self.render_share * self.budget:
+                return
+            self._waiting[viewport.name] = 0
+            yield viewport
+
+    def adapt(self) -> None:
+        self._since_change += 1
+        if self._since_change < self.hold:
+            return
+        level = DETAIL_LEVELS.index(self.detail)
+        behind = self.frame_time > 1.1 * self.budget or self.render_time > self.render_share * self.budget
+        # Doubling the trails at most doubles the render time, so this leaves a band where the level holds
+        ahead = self.render_time < 0.5 * self.render_share * self.budget and self.frame_time < 1.05 * self.budget
+        if behind and level < len(DETAIL_LEVELS) - 1:
+            self.detail = DETAIL_LEVELS[level + 1]
+            self._since_change = 0
+        elif ahead and level > 0:
+            self.detail = DETAIL_LEVELS[level - 1]
+            self._since_change = 0
+
+
+# Schedulers selectable with --scheduler
+SCHEDULERS = {
+    'budget': BudgetScheduler,
+    'every_frame': FrameScheduler,
+}
+
+
+def print_report(scheduler: FrameScheduler, stream=sys.stdout) -> None:
+    """
+    Prints the per-tile render times of a scheduler as a table.
+    """
+    print(f"{'tile':<24} {'render ms':>10} {'rendered':>9} {'skipped':>8}", file=stream)
+    for name, stats in scheduler.report().items():
+        print(f"{name:<24} {stats['render_ms']:>10.2f} {stats['rendered']:>9} {stats['skipped']:>8}", file=stream)
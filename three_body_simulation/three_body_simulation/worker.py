@@ -0,0 +1,214 @@
+# three_body_simulation/worker.py
+
+import queue
+import threading
+from collections import deque
+
+import numpy as np
+
+from three_body_simulation.integrators import IntegrationResult
+from three_body_simulation.streaming import stream_trajectory
+
+
+class IntegrationJob:
+    """
+    Handle for one background integration.
+
+    The worker thread puts (t, y) trajectory chunks on a queue as they are
+    computed; the render loop drains it with poll() without ever blocking.
+    """
+
+    def __init__(self, initial_state, total_time: float, n_samples: int, chunk_samples: int,
+                 integrate_kwargs: dict, start: bool = True):
+        """
+        Parameters:
+        initial_state (array_like): Flat initial state.
+        total_time (float): Integration end time.
+        n_samples (int): Total number of uniformly spaced samples.
+        chunk_samples (int): Number of samples per streamed chunk.
+        integrate_kwargs (dict): Passed to integrate().
+        start (bool): Run the job in a thread of its own; otherwise the caller drives it with step().
+        """
+        self.total_time = total_time
+        self.n_samples = n_samples
+        self.method = integrate_kwargs.get('method', 'RK45')
+        self.error = None
+        self._queue = queue.Queue()
+        self._cancelled = threading.Event()
+        self._finished = threading.Event()
+        self._chunks_t = []
+        self._chunks_y = []
+        self._state = np.array(initial_state, dtype=float)
+        self._chunk_samples = chunk_samples
+        self._integrate_kwargs = integrate_kwargs
+        self._blocks = None
+        if start:
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        while self.step():
+            pass
+
+    def step(self) -> bool:
+        """
+        Computes the next chunk in the calling thread.
+
+        Returns:
+        bool: False once the job has finished, failed or been cancelled.
+        """
+        if self._finished.is_set():
+            return False
+        try:
+            if self._blocks is None:
+                self._blocks = stream_trajectory(self._state, self.total_time, self.n_samples,
+                                                 self._chunk_samples, **self._integrate_kwargs)
+            if not self._cancelled.is_set():
+                self._queue.put(next(self._blocks))
+                return True
+        except StopIteration:
+            pass
+        except Exception as error:  # Surfaced to the render loop through self.error
+            self.error = error
+        self._finished.set()
+        return False
+
+    def cancel(self) -> None:
+        """
+        Asks the worker to stop after the chunk it is computing.
+        """
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def done(self) -> bool:
+        """
+        True once every chunk has been computed and received through poll().
+        """
+        return self._finished.is_set() and self._queue.empty()
+
+    def poll(self) -> list:
+        """
+        Returns the chunks that arrived since the last call, without blocking.
+
+        Returns:
+        list: (t, y) tuples with y of shape (S, chunk length).
+        """
+        chunks = []
+        while True:
+            try:
+                chunk = self._queue.get_nowait()
+            except queue.Empty:
+                return chunks
+            self._chunks_t.append(chunk[0])
+            self._chunks_y.append(chunk[1])
+            chunks.append(chunk)
+
+    def result(self) -> IntegrationResult:
+        """
+        Assembles the chunks received so far into one trajectory.
+        """
+        if not self._chunks_t:
+            return IntegrationResult(np.empty(0), np.empty((0, 0)), self.method, 0)
+        return IntegrationResult(np.concatenate(self._chunks_t), np.hstack(self._chunks_y), self.method, 0)
+
+    def join(self, timeout: float = None) -> None:
+        """
+        Waits for the job to finish.
+        """
+        self._finished.wait(timeout)
+
+
+class IntegrationWorker:
+    """
+    Runs one integration at a time in a background thread.
+
+    Submitting a new job cancels the one in flight, so switching presets never
+    waits for an orbit that is no longer wanted.
+    """
+
+    def __init__(self, chunk_samples: int = 500):
+        """
+        Parameters:
+        chunk_samples (int): Number of samples per streamed chunk.
+        """
+        self.chunk_samples = chunk_samples
+        self.job = None
+
+    def submit(self, initial_state, total_time: float, n_samples: int, **integrate_kwargs) -> IntegrationJob:
+        """
+        Starts integrating in the background, cancelling any job in flight.
+
+        Parameters:
+        initial_state (array_like): Flat initial state.
+        total_time (float): Integration end time.
+        n_samples (int): Total number of uniformly spaced samples.
+        **integrate_kwargs: Passed to integrate() (method, rtol, atol, backend, ...).
+
+        Returns:
+        IntegrationJob: Handle to poll for chunks.
+        """
+        self.cancel()
+        self.job = IntegrationJob(initial_state, total_time, n_samples, self.chunk_samples, integrate_kwargs)
+        return self.job
+
+    def cancel(self) -> None:
+        """
+        Cancels the job in flight, if any.
+        """
+        if self.job is not None:
+            self.job.cancel()
+            self.job = None
+
+
+class IntegrationQueue:
+    """
+    Runs any number of integrations in one shared background thread.
+
+    Unlike IntegrationWorker, submitting never cancels the other jobs. Jobs
+    take turns chunk by chunk, so several orbits (e.g. the tiles of the tiled
+    view) fill in together rather than one after another.
+    """
+
+    def __init__(self, chunk_samples: int = 500):
+        """
+        Parameters:
+        chunk_samples (int): Number of samples per streamed chunk.
+        """
+        self.chunk_samples = chunk_samples
+        self._submitted = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, initial_state, total_time: float, n_samples: int, **integrate_kwargs) -> IntegrationJob:
+        """
+        Queues an integration behind the jobs already running.
+
+        Parameters:
+        initial_state (array_like): Flat initial state.
+        total_time (float): Integration end time.
+        n_samples (int): Total number of uniformly spaced samples.
+        **integrate_kwargs: Passed to integrate() (method, rtol, atol, backend, ...).
+
+        Returns:
+        IntegrationJob: Handle to poll for chunks; cancel() drops it from the queue.
+        """
+        job = IntegrationJob(initial_state, total_time, n_samples, self.chunk_samples, integrate_kwargs,
+                             start=False)
+        self._submitted.put(job)
+        return job
+
+    def _run(self):
+        jobs = deque()
+        while True:
+            # Take in new submissions, waiting for one only when there is nothing to compute
+            try:
+                while True:
+                    jobs.append(self._submitted.get(block=not jobs))
+            except queue.Empty:
+                pass
+            job = jobs.popleft()
+            if job.step():
+                jobs.append(job)